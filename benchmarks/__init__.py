@@ -0,0 +1 @@
+"""Terminal221b benchmarks."""
@@ -0,0 +1,208 @@
+"""Agent-layer throughput benchmarks.
+
+Runs single and concurrent BaseAgent workloads against FakeAgent, so the
+numbers reflect framework overhead rather than provider noise.
+
+Usage:
+    python -m benchmarks.agents [--runs 200] [--concurrency 16] [--latency 0.005]
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+if not __package__:
+    # Running as a script: add repository root to path for imports
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.batching import BatchingAgent, BatchStats
+from src.agents.fake import FakeAgent
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class BenchResult:
+    """Latency distribution and throughput for one workload."""
+
+    name: str
+    runs: int
+    elapsed: float
+    latencies: List[float] = field(default_factory=list, repr=False)
+    ttfts: List[float] = field(default_factory=list, repr=False)
+    errors: int = 0
+    batch_stats: Optional[BatchStats] = field(default=None, repr=False)
+
+    @property
+    def runs_per_second(self) -> float:
+        return self.runs / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict:
+        """Headline numbers (latencies in milliseconds)."""
+        row = {
+            "name": self.name,
+            "runs": self.runs,
+            "errors": self.errors,
+            "runs_per_s": round(self.runs_per_second, 1),
+        }
+        for pct in (50, 95, 99):
+            row[f"p{pct}_ms"] = round(percentile(self.latencies, pct) * 1000, 3)
+        if self.ttfts:
+            for pct in (50, 95, 99):
+                row[f"ttft_p{pct}_ms"] = round(percentile(self.ttfts, pct) * 1000, 3)
+        if self.batch_stats is not None:
+            row["mean_batch"] = round(self.batch_stats.mean_batch_size, 1)
+            row["max_batch_wait_ms"] = round(self.batch_stats.max_wait * 1000, 3)
+        return row
+
+
+@contextmanager
+def _no_gc() -> Iterator[None]:
+    """Keep collector pauses out of a measurement, as ``timeit`` does."""
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+async def _timed_execute(agent: FakeAgent, prompt: str, result: BenchResult) -> None:
+    start = time.perf_counter()
+    try:
+        await agent.execute(prompt)
+    except Exception:
+        result.errors += 1
+    result.latencies.append(time.perf_counter() - start)
+
+
+async def _timed_stream(agent: FakeAgent, prompt: str, result: BenchResult) -> None:
+    start = time.perf_counter()
+    first: Optional[float] = None
+    try:
+        async for _ in agent.stream(prompt):
+            if first is None:
+                first = time.perf_counter() - start
+    except Exception:
+        result.errors += 1
+    result.latencies.append(time.perf_counter() - start)
+    if first is not None:
+        result.ttfts.append(first)
+
+
+async def _workload(name: str, runs: int, concurrency: int, stream: bool, **agent_kwargs) -> BenchResult:
+    agents = [FakeAgent(**agent_kwargs) for _ in range(concurrency)]
+    result = BenchResult(name=name, runs=runs, elapsed=0.0)
+    runner = _timed_stream if stream else _timed_execute
+    queue = iter(range(runs))
+
+    async def worker(agent: FakeAgent) -> None:
+        for i in queue:
+            await runner(agent, f"prompt {i}", result)
+
+    with _no_gc():
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(agent) for agent in agents))
+        result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def _batched_workload(name: str, runs: int, concurrency: int, batch_size: int, **agent_kwargs) -> BenchResult:
+    agent = BatchingAgent(FakeAgent(**agent_kwargs), max_batch_size=batch_size, max_delay=0.002)
+    result = BenchResult(name=name, runs=runs, elapsed=0.0)
+    queue = iter(range(runs))
+
+    async def worker() -> None:
+        for i in queue:
+            await _timed_execute(agent, f"prompt {i}", result)
+
+    with _no_gc():
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.elapsed = time.perf_counter() - start
+    result.batch_stats = agent.stats
+    return result
+
+
+async def run_suite(
+    runs: int = 200,
+    concurrency: int = 16,
+    latency: float = 0.0,
+    tokens_per_second: float = 0.0,
+    output_tokens: int = 16,
+    error_rate: float = 0.0,
+    batch_size: int = 16,
+) -> List[BenchResult]:
+    """Run every workload and return their results.
+
+    A ``batch_size`` of 0 skips the micro-batched workload.
+    """
+    kwargs = dict(
+        latency=latency,
+        tokens_per_second=tokens_per_second,
+        output_tokens=output_tokens,
+        error_rate=error_rate,
+    )
+    results = [
+        await _workload("execute/single", runs, 1, False, **kwargs),
+        await _workload(f"execute/concurrent-{concurrency}", runs, concurrency, False, **kwargs),
+        await _workload("stream/single", runs, 1, True, **kwargs),
+        await _workload(f"stream/concurrent-{concurrency}", runs, concurrency, True, **kwargs),
+    ]
+    if batch_size > 0:
+        results.append(await _batched_workload(
+            f"execute/batched-{batch_size}", runs, concurrency, batch_size, **kwargs
+        ))
+    return results
+
+
+def format_table(results: List[BenchResult]) -> str:
+    """Render results as an aligned text table."""
+    rows = [r.summary() for r in results]
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    widths = {c: max(len(c), *(len(str(row.get(c, ""))) for row in rows)) for c in columns}
+    lines = ["  ".join(c.ljust(widths[c]) for c in columns)]
+    for row in rows:
+        lines.append("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=16, help="Micro-batch size (0 to skip)")
+    args = parser.parse_args(argv)
+    results = asyncio.run(run_suite(
+        runs=args.runs,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        batch_size=args.batch_size,
+    ))
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,15 @@
 """Terminal221b agent modules."""
 
 from .base import BaseAgent, AgentCapability
+from .coordinator import AgentCoordinator, AgentTask
+from .registry import AgentPool, AgentRegistry, AgentSpec, get_registry
+from .sessions import SessionLog, SessionStore
+from .shared import Blackboard, CowMessages, PVector
+from .speculative import SpeculationReport, speculate
 
-__all__ = ["BaseAgent", "AgentCapability"]
+__all__ = [
+    "BaseAgent", "AgentCapability", "AgentCoordinator", "AgentTask",
+    "AgentPool", "AgentRegistry", "AgentSpec", "get_registry",
+    "SessionLog", "SessionStore", "Blackboard", "CowMessages", "PVector",
+    "SpeculationReport", "speculate",
+]
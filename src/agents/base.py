@@ -1,11 +1,12 @@
 """Base agent interface for Terminal221b."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 
 class AgentCapability(str, Enum):
@@ -19,12 +20,24 @@ class AgentCapability(str, Enum):
     MULTI_AGENT = "multi_agent"
 
 
+_CAPABILITY_BITS = {cap: 1 << i for i, cap in enumerate(AgentCapability)}
+
+
+def capability_mask(capabilities: Iterable[AgentCapability]) -> int:
+    """Pack capabilities into a bitmask (one bit per AgentCapability)."""
+    mask = 0
+    for cap in capabilities:
+        mask |= _CAPABILITY_BITS[AgentCapability(cap)]
+    return mask
+
+
 class AgentMessage(BaseModel):
     """Message in agent conversation."""
     
     role: str  # "user", "assistant", "system"
     content: str
     metadata: Optional[Dict[str, Any]] = None
+    _token_count: Optional[Tuple[str, str, int]] = PrivateAttr(default=None)  # (encoding, content, count)
 
 
 class AgentContext(BaseModel):
@@ -34,7 +47,18 @@ class AgentContext(BaseModel):
     max_tokens: int = 1000
     temperature: float = 0.7
     capabilities: List[AgentCapability] = []
+    history_budget: Optional[int] = None  # Token budget for history, None for unbounded
     metadata: Optional[Dict[str, Any]] = None
+    _capability_mask: Optional[Tuple[list, int, int]] = PrivateAttr(default=None)  # (capabilities, len, mask)
+    
+    @property
+    def capability_mask(self) -> int:
+        """Bitmask of ``capabilities``, recomputed only when the list is replaced or resized."""
+        caps = self.capabilities
+        cached = self._capability_mask
+        if cached is None or cached[0] is not caps or cached[1] != len(caps):
+            cached = self._capability_mask = (caps, len(caps), capability_mask(caps))
+        return cached[2]
 
 
 @dataclass
@@ -59,6 +83,18 @@ class BaseAgent(ABC):
     name: str = "base"
     description: str = "Base agent interface"
     required_capabilities: List[AgentCapability] = []
+    _required_mask: int = 0
+    
+    def __init_subclass__(cls, **kwargs):
+        """Precompute the capability mask and instrument execute/stream for metrics."""
+        super().__init_subclass__(**kwargs)
+        cls._required_mask = capability_mask(cls.required_capabilities)
+        from .instrumentation import instrument_execute, instrument_stream
+        
+        for name, wrap in (("execute", instrument_execute), ("stream", instrument_stream)):
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "_instrumented", False):
+                setattr(cls, name, wrap(method))
     
     def __init__(self, context: Optional[AgentContext] = None):
         """Initialize agent with optional context.
@@ -67,16 +103,19 @@ class BaseAgent(ABC):
             context: Execution context with capabilities and settings
         """
         self.context = context or AgentContext()
+        self._history = None
+        self._session = None
         self._validate_capabilities()
     
     def _validate_capabilities(self) -> None:
         """Validate that required capabilities are available."""
-        for cap in self.required_capabilities:
-            if cap not in self.context.capabilities:
-                raise PermissionError(
-                    f"Agent '{self.name}' requires capability '{cap.value}' "
-                    "which is not available in current license tier."
-                )
+        missing = self._required_mask & ~self.context.capability_mask
+        if missing:
+            cap = next(c for c in self.required_capabilities if _CAPABILITY_BITS[c] & missing)
+            raise PermissionError(
+                f"Agent '{self.name}' requires capability '{cap.value}' "
+                "which is not available in current license tier."
+            )
     
     @abstractmethod
     async def execute(self, prompt: str) -> AgentResult:
@@ -90,6 +129,25 @@ class BaseAgent(ABC):
         """
         pass
     
+    async def execute_batch(self, prompts: List[str]) -> List[AgentResult]:
+        """Execute several independent prompts.
+        
+        The default runs them concurrently; override when the backend can
+        process a batch in one call. A prompt that raises fails only its
+        own result, never the rest of the batch.
+        
+        Args:
+            prompts: Prompts to process
+            
+        Returns:
+            One AgentResult per prompt, in order
+        """
+        results = await asyncio.gather(*(self.execute(p) for p in prompts), return_exceptions=True)
+        return [
+            AgentResult(success=False, output="", error=str(r)) if isinstance(r, Exception) else r
+            for r in results
+        ]
+    
     @abstractmethod
     async def stream(self, prompt: str):
         """Stream agent output token by token.
@@ -102,18 +160,79 @@ class BaseAgent(ABC):
         """
         pass
     
+    @property
+    def history(self):
+        """Token-budgeted history over ``context.messages``.
+        
+        Rebuilt if ``context.messages`` is replaced with a new list.
+        """
+        from .history import ConversationHistory
+        from .tokens import get_token_counter
+        
+        history = getattr(self, "_history", None)
+        if history is None or history.messages is not self.context.messages:
+            history = ConversationHistory(
+                self.context.messages,
+                budget=self.context.history_budget,
+                system_prompt=self.get_system_prompt,
+                count_tokens=get_token_counter(),
+                summarizer=self.summarize_history,
+            )
+            self._history = history
+        return history
+    
     def add_message(self, role: str, content: str) -> None:
         """Add message to conversation history.
         
+        Oldest turns are evicted (or summarized) once the history exceeds
+        ``context.history_budget``.
+        
         Args:
             role: Message role (user, assistant, system)
             content: Message content
         """
-        self.context.messages.append(AgentMessage(role=role, content=content))
+        message = AgentMessage(role=role, content=content)
+        self.history.append(message)
+        if getattr(self, "_session", None) is not None:
+            self._session.append(message)
     
     def clear_history(self) -> None:
         """Clear conversation history."""
         self.context.messages = []
+        if getattr(self, "_session", None) is not None:
+            self._session.reset()
+    
+    def attach_session(self, session, budget: Optional[int] = None) -> None:
+        """Persist history to a SessionLog, resuming from its tail.
+        
+        Args:
+            session: SessionLog that new messages are appended to
+            budget: Token budget for the resumed tail (default: ``context.history_budget``)
+        """
+        if budget is None:
+            budget = self.context.history_budget
+        self.context.messages = session.tail(budget)
+        self._session = session
+    
+    def detach_session(self):
+        """Stop persisting history; the SessionLog keeps what it has.
+        
+        Returns:
+            The detached SessionLog, or None if none was attached
+        """
+        session, self._session = getattr(self, "_session", None), None
+        return session
+    
+    def summarize_history(self, messages: List[AgentMessage]) -> Optional[str]:
+        """Summarize turns evicted from history.
+        
+        Override in subclasses to keep a running summary; returning None
+        drops evicted turns.
+        
+        Args:
+            messages: Evicted messages, oldest first (including any previous summary)
+        """
+        return None
     
     def get_system_prompt(self) -> str:
         """Get the system prompt for this agent.
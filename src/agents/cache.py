@@ -0,0 +1,263 @@
+"""Content-addressed response cache for agent execution.
+
+Results are keyed on a stable hash of everything that determines the
+output: agent name, system prompt, normalized message history, prompt,
+temperature and max_tokens. Lookups go to an in-memory LRU first and an
+optional on-disk tier second. Sampled calls (temperature > 0) are only
+cached when explicitly allowed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .base import AgentResult
+
+
+def cache_key(agent, prompt: str) -> str:
+    """Stable hash of the inputs that determine an agent's response."""
+    context = agent.context
+    payload = {
+        "agent": agent.name,
+        "system": agent.get_system_prompt(),
+        "messages": [[m.role.strip().lower(), m.content.strip()] for m in context.messages],
+        "prompt": prompt.strip(),
+        "temperature": context.temperature,
+        "max_tokens": context.max_tokens,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a ResponseCache."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MemoryCache:
+    """LRU of cache entries with an optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        stored, entry = item
+        if self.ttl is not None and time.time() - stored > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = (time.time(), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class DiskCache:
+    """Directory of JSON entries with TTL and size-based eviction.
+
+    Entries are sharded into subdirectories by key prefix; when the total
+    size passes ``max_bytes`` the oldest entries are removed first.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._scan())
+
+    @property
+    def size(self) -> int:
+        """Bytes currently stored."""
+        return self._size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for shard in self.directory.iterdir():
+            if shard.is_dir():
+                for item in os.scandir(shard):
+                    if item.name.endswith(".json"):
+                        stat = item.stat()
+                        entries.append((stat.st_mtime, stat.st_size, Path(item.path)))
+        return entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                self._remove(path)
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            self._size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        # Drop down to 90% of the limit so eviction doesn't run on every write
+        target = self.max_bytes * 0.9
+        for _, _, path in sorted(self._scan()):
+            if self._size <= target:
+                break
+            self._remove(path)
+
+
+class ResponseCache:
+    """Two-tier (memory, then optional disk) cache of agent results."""
+
+    def __init__(self, memory: Optional[MemoryCache] = None, disk: Optional[DiskCache] = None):
+        self.memory = memory or MemoryCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.stats.memory_hits += 1
+            return entry
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.stats.disk_hits += 1
+                self.memory.put(key, entry)
+                return entry
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+
+
+class CachedAgent:
+    """Wraps an agent so repeated prompts are served from a ResponseCache.
+
+    Only successful results are cached. Calls with temperature > 0 bypass
+    the cache unless ``cache_sampled`` is set, since their output is not
+    meant to repeat.
+    """
+
+    def __init__(self, agent, cache: Optional[ResponseCache] = None, cache_sampled: bool = False):
+        self.agent = agent
+        self.cache = cache or ResponseCache()
+        self.cache_sampled = cache_sampled
+
+    def __getattr__(self, name: str):
+        return getattr(self.agent, name)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def _key(self, prompt: str) -> Optional[str]:
+        if self.agent.context.temperature > 0 and not self.cache_sampled:
+            self.cache.stats.bypassed += 1
+            return None
+        return cache_key(self.agent, prompt)
+
+    @staticmethod
+    def _result(entry: Dict[str, Any]) -> AgentResult:
+        metadata = dict(entry.get("metadata") or {})
+        metadata["cached"] = True
+        return AgentResult(
+            success=True, output=entry["output"], tokens_used=entry.get("tokens_used", 0), metadata=metadata
+        )
+
+    async def execute(self, prompt: str) -> AgentResult:
+        """Execute, returning a cached result when available."""
+        key = self._key(prompt)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return self._result(entry)
+        result = await self.agent.execute(prompt)
+        if key is not None and result.success:
+            self.cache.put(key, {
+                "output": result.output,
+                "tokens_used": result.tokens_used,
+                "metadata": result.metadata,
+            })
+        return result
+
+    async def stream(self, prompt: str):
+        """Stream output, replaying cached chunks when available."""
+        key = self._key(prompt)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                for chunk in entry.get("chunks") or [entry["output"]]:
+                    yield chunk
+                return
+        chunks = []
+        async for chunk in self.agent.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        if key is not None:
+            self.cache.put(key, {
+                "output": "".join(chunks),
+                "tokens_used": len(chunks),
+                "chunks": chunks,
+            })
+
+    def __repr__(self) -> str:
+        return f"<CachedAgent {self.agent!r}>"
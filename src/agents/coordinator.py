@@ -0,0 +1,180 @@
+"""Multi-agent coordinator for Terminal221b.
+
+Runs a DAG of agent tasks on one event loop. Independent tasks run
+concurrently (bounded by the license tier's ``max_agents``), so a
+multi-agent run takes as long as its critical path rather than the sum of
+every agent's latency.
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from utils import metrics
+
+from .base import AgentResult, BaseAgent
+from .shared import Blackboard
+
+# A prompt is either fixed text or built from the results of the task's dependencies.
+PromptSource = Union[str, Callable[[Dict[str, AgentResult]], str]]
+
+
+@dataclass
+class AgentTask:
+    """A unit of work for the coordinator."""
+
+    name: str
+    agent: BaseAgent
+    prompt: PromptSource
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+
+    def build_prompt(self, upstream: Dict[str, AgentResult]) -> str:
+        """Resolve the prompt, feeding in dependency results if needed."""
+        if callable(self.prompt):
+            return self.prompt(upstream)
+        return self.prompt
+
+
+class AgentCoordinator:
+    """Schedules agent tasks concurrently with dependencies and timeouts.
+
+    Usage:
+        coordinator = AgentCoordinator.from_limits(manager.get_limits())
+        coordinator.add_task("research", analyst, "Summarize the market")
+        coordinator.add_task("draft", writer, lambda r: r["research"].output,
+                             depends_on=["research"])
+        results = await coordinator.run()
+    """
+
+    def __init__(self, max_agents: int = -1, blackboard: Optional[Blackboard] = None):
+        """Initialize coordinator.
+
+        Args:
+            max_agents: Maximum agents executing at once, or -1 for unlimited
+            blackboard: Shared context; each task's agent starts from a fork
+                of it and successful tasks merge their messages back
+        """
+        self.max_agents = max_agents
+        self.blackboard = blackboard
+        self.tasks: Dict[str, AgentTask] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_limits(cls, limits) -> "AgentCoordinator":
+        """Create a coordinator bounded by a tier's LicenseLimits."""
+        return cls(max_agents=limits.max_agents)
+
+    def add_task(
+        self,
+        name: str,
+        agent: BaseAgent,
+        prompt: PromptSource,
+        depends_on: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AgentTask:
+        """Register a task.
+
+        Args:
+            name: Unique task name, used to reference it from dependents
+            agent: Agent that executes the task
+            prompt: Prompt text, or a callable receiving dependency results
+            depends_on: Names of tasks whose results this task needs
+            timeout: Seconds before the task is abandoned
+
+        Returns:
+            The registered AgentTask
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task '{name}' is already registered")
+        task = AgentTask(name, agent, prompt, list(depends_on or []), timeout)
+        self.tasks[name] = task
+        return task
+
+    def _check_graph(self) -> None:
+        """Reject unknown dependencies and cycles."""
+        indegree = {name: 0 for name in self.tasks}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+                indegree[task.name] += 1
+                dependents[dep].append(task.name)
+
+        ready = [name for name, count in indegree.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for child in dependents[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if visited != len(self.tasks):
+            raise ValueError("Task dependencies contain a cycle")
+
+    async def run(self) -> Dict[str, AgentResult]:
+        """Run all registered tasks and collect their results.
+
+        Failed, timed-out or cancelled tasks produce an unsuccessful
+        AgentResult; their dependents are skipped rather than run.
+
+        Returns:
+            Mapping of task name to AgentResult, in registration order
+        """
+        self._check_graph()
+        limit = (
+            asyncio.Semaphore(self.max_agents) if self.max_agents > 0 else contextlib.nullcontext()
+        )
+        self._running = {}
+        for name, task in self.tasks.items():
+            self._running[name] = asyncio.ensure_future(self._run_task(task, limit))
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+        results = {}
+        for name, running in self._running.items():
+            if running.cancelled():
+                results[name] = AgentResult(success=False, output="", error="Cancelled")
+            else:
+                results[name] = running.result()
+        return results
+
+    def cancel(self) -> None:
+        """Cancel every task that has not finished yet."""
+        for running in self._running.values():
+            running.cancel()
+
+    async def _run_task(self, task: AgentTask, limit) -> AgentResult:
+        upstream: Dict[str, AgentResult] = {}
+        for dep in task.depends_on:
+            try:
+                result = await asyncio.shield(self._running[dep])
+            except asyncio.CancelledError:
+                if not self._running[dep].cancelled():
+                    raise
+                result = AgentResult(success=False, output="", error="Cancelled")
+            if not result.success:
+                return AgentResult(
+                    success=False, output="", error=f"Skipped: dependency '{dep}' failed"
+                )
+            upstream[dep] = result
+
+        queued = time.perf_counter()
+        async with limit:
+            metrics.observe("agent_queue_wait_seconds", time.perf_counter() - queued, agent=task.agent.name)
+            try:
+                prompt = task.build_prompt(upstream)
+                fork = self.blackboard.attach(task.agent) if self.blackboard is not None else None
+                result = await asyncio.wait_for(task.agent.execute(prompt), task.timeout)
+                if fork is not None and result.success:
+                    self.blackboard.merge(fork, agent=task.name)
+                return result
+            except asyncio.TimeoutError:
+                return AgentResult(
+                    success=False, output="", error=f"Timed out after {task.timeout}s"
+                )
+            except Exception as e:
+                return AgentResult(success=False, output="", error=str(e))
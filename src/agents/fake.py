@@ -0,0 +1,106 @@
+"""Deterministic local stand-in for an LLM provider.
+
+FakeAgent produces repeatable output with configurable latency, token
+rate and error injection, entirely in-process. It lets tests and
+benchmarks exercise the agent layer offline, without provider noise.
+"""
+
+import asyncio
+import hashlib
+import random
+from typing import AsyncIterator, List, Optional
+
+from .base import AgentContext, AgentResult, BaseAgent
+
+_WORDS = (
+    "the game is afoot data suggests a pattern elementary observation deduce "
+    "evidence analysis clue network agent result signal model token inference"
+).split()
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure."""
+
+
+class FakeAgent(BaseAgent):
+    """Agent backed by a deterministic fake provider."""
+
+    name = "fake"
+    description = "a deterministic local stand-in for an LLM provider"
+
+    def __init__(
+        self,
+        context: Optional[AgentContext] = None,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        output_tokens: int = 16,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """Initialize fake agent.
+
+        Args:
+            context: Execution context
+            latency: Seconds before the first token (simulated prefill/network)
+            tokens_per_second: Generation rate; 0 generates instantly
+            output_tokens: Tokens generated per call
+            error_rate: Probability in [0, 1] that a call raises FakeProviderError
+            seed: Seed for error injection, so failures are repeatable
+        """
+        super().__init__(context)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.batches = 0
+
+    def tokens_for(self, prompt: str) -> List[str]:
+        """Deterministic output tokens for a prompt."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return [
+            _WORDS[digest[i % len(digest)] % len(_WORDS)] + " " for i in range(self.output_tokens)
+        ]
+
+    def _maybe_fail(self) -> None:
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeProviderError(f"Injected provider error (call {self.calls})")
+
+    async def execute(self, prompt: str) -> AgentResult:
+        """Return the full deterministic response after simulated latency."""
+        self._maybe_fail()
+        tokens = self.tokens_for(prompt)
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += len(tokens) / self.tokens_per_second
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return AgentResult(success=True, output="".join(tokens), tokens_used=len(tokens))
+
+    async def execute_batch(self, prompts: List[str]) -> List[AgentResult]:
+        """Simulate batched inference: one latency for the whole batch."""
+        self._maybe_fail()
+        self.batches += 1
+        outputs = [self.tokens_for(prompt) for prompt in prompts]
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += max(len(tokens) for tokens in outputs) / self.tokens_per_second
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return [
+            AgentResult(success=True, output="".join(tokens), tokens_used=len(tokens))
+            for tokens in outputs
+        ]
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield deterministic tokens at the configured rate."""
+        self._maybe_fail()
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for i, token in enumerate(self.tokens_for(prompt)):
+            if interval and i:
+                await asyncio.sleep(interval)
+            yield token
@@ -0,0 +1,162 @@
+"""Token-budgeted conversation history for Terminal221b agents.
+
+Keeps ``AgentContext.messages`` within a token budget by evicting the
+oldest turns in chunks. Eviction runs only when the budget is exceeded and
+then drops history down to a low watermark, so appends stay O(1)
+amortized. Evicted turns can be folded into a single pinned summary
+message through a pluggable summarizer.
+"""
+
+from typing import Callable, List, Optional, Union
+
+from .base import AgentMessage
+from .tokens import TokenCounter, estimate_tokens
+
+Summarizer = Callable[[List[AgentMessage]], Optional[str]]
+
+SUMMARY_KEY = "history_summary"
+
+
+def history_budget(max_tokens_per_run: int, max_tokens: int) -> Optional[int]:
+    """Prompt budget left for history once the completion is reserved.
+
+    Args:
+        max_tokens_per_run: Tier limit from LicenseLimits (-1 for unlimited)
+        max_tokens: Completion size from AgentContext
+
+    Returns:
+        Token budget for history, or None if unlimited
+    """
+    if max_tokens_per_run < 0:
+        return None
+    return max(0, max_tokens_per_run - max_tokens)
+
+
+class ConversationHistory:
+    """Bounded view over a message list with a pinned system prompt.
+
+    The wrapped list is edited in place, so it can be the same list object
+    as ``AgentContext.messages``.
+    """
+
+    def __init__(
+        self,
+        messages: Optional[List[AgentMessage]] = None,
+        budget: Optional[int] = None,
+        system_prompt: Union[str, Callable[[], str]] = "",
+        count_tokens: Union[TokenCounter, Callable[[str], int]] = estimate_tokens,
+        summarizer: Optional[Summarizer] = None,
+        low_watermark: float = 0.75,
+    ):
+        """Initialize history.
+
+        Args:
+            messages: Existing message list to manage (edited in place)
+            budget: Maximum tokens for system prompt plus history, None for unbounded
+            system_prompt: System prompt text, or a callable producing it on first use
+            count_tokens: TokenCounter (counts cached per message) or plain text counter
+            summarizer: Called with evicted messages; returns summary text or None
+            low_watermark: Fraction of the budget to compact down to once exceeded
+        """
+        if not 0 < low_watermark <= 1:
+            raise ValueError("low_watermark must be in (0, 1]")
+        self.messages = messages if messages is not None else []
+        self.budget = budget
+        self.count_tokens = count_tokens
+        self.summarizer = summarizer
+        self.low_watermark = low_watermark
+        self.evicted = 0
+        self._system_prompt = system_prompt
+        self._system_tokens: Optional[int] = None
+        if isinstance(count_tokens, TokenCounter):
+            self._counts = count_tokens.count_messages(self.messages)
+        else:
+            self._counts = [count_tokens(m.content) for m in self.messages]
+        self._history_tokens = sum(self._counts)
+        self._enforce()
+
+    @property
+    def system_prompt(self) -> str:
+        if callable(self._system_prompt):
+            self._system_prompt = self._system_prompt()
+        return self._system_prompt
+
+    @property
+    def system_tokens(self) -> int:
+        if self._system_tokens is None:
+            self._system_tokens = self.count_tokens(self.system_prompt) if self.system_prompt else 0
+        return self._system_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens for the system prompt plus retained history."""
+        return self.system_tokens + self._history_tokens
+
+    def _count(self, message: AgentMessage) -> int:
+        if isinstance(self.count_tokens, TokenCounter):
+            return self.count_tokens.count_message(message)
+        return self.count_tokens(message.content)
+
+    def fits(self, max_tokens_per_run: int, completion_tokens: int = 0) -> bool:
+        """O(1) check that the prompt plus completion fits a per-run token limit.
+
+        Args:
+            max_tokens_per_run: Tier limit from LicenseLimits (-1 for unlimited)
+            completion_tokens: Tokens reserved for the response
+        """
+        return max_tokens_per_run < 0 or self.total_tokens + completion_tokens <= max_tokens_per_run
+
+    def append(self, message: AgentMessage) -> None:
+        """Add a message, compacting older turns if over budget."""
+        count = self._count(message)
+        self.messages.append(message)
+        self._counts.append(count)
+        self._history_tokens += count
+        self._enforce()
+
+    def clear(self) -> None:
+        """Drop all history (the system prompt stays pinned)."""
+        self.messages.clear()
+        self._counts.clear()
+        self._history_tokens = 0
+
+    def prompt_messages(self) -> List[AgentMessage]:
+        """Messages to send to a provider: system prompt first, then history."""
+        head = [AgentMessage(role="system", content=self.system_prompt)] if self.system_prompt else []
+        return head + self.messages
+
+    def _has_summary(self) -> bool:
+        return bool(self.messages) and bool((self.messages[0].metadata or {}).get(SUMMARY_KEY))
+
+    def _enforce(self) -> None:
+        if self.budget is None:
+            return
+        # Always keep the newest turn, even if it alone exceeds the budget.
+        while self.total_tokens > self.budget and len(self.messages) - self._has_summary() > 1:
+            self._compact()
+
+    def _compact(self) -> None:
+        target = self.budget * self.low_watermark
+        start = 1 if self._has_summary() else 0
+        end = start
+        remaining = self.total_tokens
+        last = len(self.messages) - 1
+        while end < last and remaining > target:
+            remaining -= self._counts[end]
+            end += 1
+        end = max(end, start + 1)
+
+        evicted = self.messages[:end]
+        freed = sum(self._counts[:end])
+        del self.messages[:end]
+        del self._counts[:end]
+        self._history_tokens -= freed
+        self.evicted += end - start
+
+        summary = self.summarizer(evicted) if self.summarizer else None
+        if summary:
+            message = AgentMessage(role="system", content=summary, metadata={SUMMARY_KEY: True})
+            count = self._count(message)
+            self.messages.insert(0, message)
+            self._counts.insert(0, count)
+            self._history_tokens += count
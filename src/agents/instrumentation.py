@@ -0,0 +1,94 @@
+"""Metrics instrumentation for agent execute/stream.
+
+BaseAgent wraps every subclass's ``execute`` and ``stream`` with these
+helpers. While metrics are disabled the wrappers hand back the original
+coroutine or generator untouched, so the only cost is a flag check.
+"""
+
+import contextvars
+import functools
+import time
+
+from utils import metrics
+
+# Set while an instrumented execute or stream step runs, so super() calls aren't counted twice
+_active: contextvars.ContextVar = contextvars.ContextVar("agent_instrumented", default=False)
+
+
+def _labels(agent) -> dict:
+    return {"agent": agent.name, "tier": (agent.context.metadata or {}).get("tier")}
+
+
+def _record(agent, elapsed: float, tokens: int, ttft=None) -> None:
+    labels = _labels(agent)
+    registry = metrics.registry
+    registry.observe("agent_latency_seconds", elapsed, **labels)
+    if ttft is not None:
+        registry.observe("agent_ttft_seconds", ttft, **labels)
+    if tokens:
+        registry.observe("agent_tokens_used", tokens, **labels)
+        if elapsed > 0:
+            registry.observe("agent_tokens_per_second", tokens / elapsed, **labels)
+
+
+def instrument_execute(fn):
+    """Wrap an ``execute`` implementation with latency and token metrics."""
+
+    @functools.wraps(fn)
+    def execute(self, prompt):
+        if not metrics.enabled() or _active.get():
+            return fn(self, prompt)
+        return _timed_execute(fn, self, prompt)
+
+    execute._instrumented = True
+    return execute
+
+
+async def _timed_execute(fn, agent, prompt):
+    token = _active.set(True)
+    start = time.perf_counter()
+    tokens = 0
+    try:
+        result = await fn(agent, prompt)
+        tokens = result.tokens_used
+    finally:
+        _active.reset(token)
+        _record(agent, time.perf_counter() - start, tokens)
+    return result
+
+
+def instrument_stream(fn):
+    """Wrap a ``stream`` implementation with TTFT, latency and token-rate metrics."""
+
+    @functools.wraps(fn)
+    def stream(self, prompt):
+        if not metrics.enabled() or _active.get():
+            return fn(self, prompt)
+        return _timed_stream(fn, self, prompt)
+
+    stream._instrumented = True
+    return stream
+
+
+async def _timed_stream(fn, agent, prompt):
+    start = time.perf_counter()
+    ttft = None
+    tokens = 0
+    inner = fn(agent, prompt)
+    try:
+        while True:
+            # Flag only the wrapped generator's own steps, not the consumer's code between chunks
+            token = _active.set(True)
+            try:
+                chunk = await inner.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                _active.reset(token)
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            tokens += 1
+            yield chunk
+    finally:
+        await inner.aclose()
+        _record(agent, time.perf_counter() - start, tokens, ttft)
@@ -0,0 +1,200 @@
+"""Compact message storage for long transcripts.
+
+A MessageLog keeps a whole transcript in a few flat buffers instead of one
+pydantic object per message: roles are interned into a small table,
+content lives in one UTF-8 buffer addressed by offsets, and metadata is
+stored only for messages that have it. Indexing returns MessageView
+objects that expose the AgentMessage attributes without materializing a
+model.
+"""
+
+import json
+import sys
+from array import array
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union, overload
+
+from .base import AgentMessage
+
+
+class MessageView:
+    """Read-only, AgentMessage-compatible view of one logged message."""
+
+    __slots__ = ("_log", "_index")
+
+    def __init__(self, log: "MessageLog", index: int):
+        self._log = log
+        self._index = index
+
+    @property
+    def role(self) -> str:
+        return self._log._roles[self._log._role_ids[self._index]]
+
+    @property
+    def content(self) -> str:
+        return self._log._content(self._index)
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self._log._metadata.get(self._index)
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Same shape as ``AgentMessage.model_dump()``."""
+        return {"role": self.role, "content": self.content, "metadata": self.metadata}
+
+    def to_message(self) -> AgentMessage:
+        """Materialize a full AgentMessage."""
+        return AgentMessage(role=self.role, content=self.content, metadata=self.metadata)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MessageView, AgentMessage)):
+            return (self.role, self.content, self.metadata) == (other.role, other.content, other.metadata)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"<MessageView #{self._index} role='{self.role}'>"
+
+
+class MessageLog:
+    """Append-only transcript stored in flat buffers."""
+
+    def __init__(self, messages: Optional[Iterable[Union[AgentMessage, MessageView]]] = None):
+        self._roles: List[str] = []
+        self._role_lookup: Dict[str, int] = {}
+        self._role_ids = array("H")
+        self._buffer = bytearray()
+        self._offsets = array("Q", [0])
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        if messages is not None:
+            self.extend(messages)
+
+    def _intern(self, role: str) -> int:
+        role_id = self._role_lookup.get(role)
+        if role_id is None:
+            role_id = self._role_lookup[role] = len(self._roles)
+            self._roles.append(role)
+        return role_id
+
+    def _content(self, index: int) -> str:
+        return str(memoryview(self._buffer)[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def append(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Append one message."""
+        if metadata:
+            self._metadata[len(self._role_ids)] = metadata
+        self._role_ids.append(self._intern(role))
+        self._buffer += content.encode("utf-8")
+        self._offsets.append(len(self._buffer))
+
+    def append_message(self, message: Union[AgentMessage, MessageView]) -> None:
+        """Append an AgentMessage (or a view from another log)."""
+        self.append(message.role, message.content, message.metadata)
+
+    def extend(self, messages: Iterable[Union[AgentMessage, MessageView]]) -> None:
+        """Append many messages."""
+        for message in messages:
+            self.append(message.role, message.content, message.metadata)
+
+    def __len__(self) -> int:
+        return len(self._role_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> MessageView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[MessageView]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MessageView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return MessageView(self, index)
+
+    def __iter__(self) -> Iterator[MessageView]:
+        for i in range(len(self)):
+            yield MessageView(self, i)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by the log's buffers."""
+        return (
+            len(self._buffer)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._role_ids.itemsize * len(self._role_ids)
+        )
+
+    def to_messages(self) -> List[AgentMessage]:
+        """Materialize every message as an AgentMessage."""
+        return [view.to_message() for view in self]
+
+    def dump_jsonl(self, fp: IO[str]) -> None:
+        """Write one JSON object per message."""
+        for i in range(len(self)):
+            record = {"role": self._roles[self._role_ids[i]], "content": self._content(i)}
+            metadata = self._metadata.get(i)
+            if metadata:
+                record["metadata"] = metadata
+            fp.write(json.dumps(record, ensure_ascii=False))
+            fp.write("\n")
+
+    @classmethod
+    def load_jsonl(cls, fp: IO[str]) -> "MessageLog":
+        """Read messages written by ``dump_jsonl`` without model validation."""
+        log = cls()
+        for line in fp:
+            if line.strip():
+                record = json.loads(line)
+                log.append(record["role"], record["content"], record.get("metadata"))
+        return log
+
+    def dump_msgpack(self, fp: IO[bytes]) -> None:
+        """Write the log's buffers as one msgpack document.
+
+        Requires the optional ``msgpack`` package.
+        """
+        msgpack = _require_msgpack()
+        offsets, role_ids = self._offsets, self._role_ids
+        if sys.byteorder == "big":
+            offsets, role_ids = array("Q", offsets), array("H", role_ids)
+            offsets.byteswap()
+            role_ids.byteswap()
+        fp.write(msgpack.packb({
+            "roles": self._roles,
+            "role_ids": role_ids.tobytes(),
+            "offsets": offsets.tobytes(),
+            "content": bytes(self._buffer),
+            "metadata": {str(k): v for k, v in self._metadata.items()},
+        }, use_bin_type=True))
+
+    @classmethod
+    def load_msgpack(cls, fp: IO[bytes]) -> "MessageLog":
+        """Read a log written by ``dump_msgpack``.
+
+        Requires the optional ``msgpack`` package.
+        """
+        msgpack = _require_msgpack()
+        data = msgpack.unpackb(fp.read(), raw=False)
+        log = cls()
+        log._roles = list(data["roles"])
+        log._role_lookup = {role: i for i, role in enumerate(log._roles)}
+        log._role_ids = array("H", data["role_ids"])
+        log._offsets = array("Q", data["offsets"])
+        if sys.byteorder == "big":
+            log._role_ids.byteswap()
+            log._offsets.byteswap()
+        log._buffer = bytearray(data["content"])
+        log._metadata = {int(k): v for k, v in data["metadata"].items()}
+        return log
+
+
+def _require_msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "msgpack serialization requires the 'msgpack' package: "
+            "pip install terminal221b[msgpack]"
+        ) from e
+    return msgpack
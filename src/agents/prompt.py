@@ -0,0 +1,199 @@
+"""Prefix-stable prompt assembly for provider and KV-cache reuse.
+
+Every turn sends the system prompt, the history and the new prompt, in
+that order. Backends can skip prefill for a prefix they have already
+seen. That covers provider prompt caching and KV-cache reuse in a local
+engine, but it only works if the prefix is byte-identical from turn to
+turn.
+
+PromptAssembler keeps the prefix stable. It reuses the exact system
+message and history objects it sent before and gives every segment a
+chained fingerprint: sha256 over the previous fingerprint plus the
+segment. Two prompts share a prefix exactly when the fingerprint at its
+last segment matches. Only segments added since the last turn are
+hashed.
+
+Each assembled prompt carries cache breakpoints, the segment indices
+after which a backend should cache. The assembler remembers the
+breakpoints it has sent, so it can tell how much of the next prompt is
+a reused prefix. It reports that per session as a hit rate and as
+prefill tokens saved.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from utils import metrics
+
+from .base import AgentMessage
+from .tokens import TokenCounter, get_token_counter
+
+
+@dataclass
+class PromptSegment:
+    """One message of an assembled prompt."""
+
+    message: AgentMessage
+    fingerprint: str  # hash of this segment and everything before it
+    tokens: int
+
+
+@dataclass
+class AssembledPrompt:
+    """Messages to send plus where a backend may cache their prefix."""
+
+    segments: List[PromptSegment]
+    breakpoints: List[int] = field(default_factory=list)  # cache after these segment indices
+    cached_segments: int = 0  # leading segments matching a prefix sent earlier
+    cached_tokens: int = 0
+
+    @property
+    def messages(self) -> List[AgentMessage]:
+        return [segment.message for segment in self.segments]
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(segment.tokens for segment in self.segments)
+
+    @property
+    def prefix_key(self) -> str:
+        """Fingerprint of the first segment (the system prompt), for routing to a warm cache."""
+        return self.segments[0].fingerprint if self.segments else ""
+
+
+@dataclass
+class PrefixStats:
+    """Prefix reuse for one session."""
+
+    requests: int = 0
+    hits: int = 0  # requests that reused at least one segment
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # prefill tokens a caching backend can skip
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def token_hit_rate(self) -> float:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"prefix hits {self.hits}/{self.requests} ({self.hit_rate:.0%}), "
+            f"prefill saved {self.cached_tokens}/{self.prompt_tokens} tokens ({self.token_hit_rate:.0%})"
+        )
+
+
+def _fingerprint(previous: str, message: AgentMessage) -> str:
+    digest = hashlib.sha256(previous.encode("ascii"))
+    digest.update(message.role.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(message.content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PromptAssembler:
+    """Builds byte-stable prompts for one session and tracks prefix reuse.
+
+    Usage:
+        assembler = PromptAssembler()
+        prompt = assembler.assemble(agent.get_system_prompt(), agent.context.messages, "Next?")
+        await provider.complete(prompt.messages, context, breakpoints=prompt.breakpoints)
+        print(assembler.stats.summary())
+    """
+
+    def __init__(
+        self,
+        count_tokens: Optional[TokenCounter] = None,
+        max_breakpoints: int = 4,
+        max_remembered: int = 64,
+    ):
+        """Initialize assembler.
+
+        Args:
+            count_tokens: Token counter (default: the shared counter)
+            max_breakpoints: Breakpoints per prompt (Anthropic-style caching allows 4)
+            max_remembered: Sent breakpoint prefixes remembered for hit detection
+        """
+        self.count_tokens = count_tokens or get_token_counter()
+        self.max_breakpoints = max_breakpoints
+        self.max_remembered = max_remembered
+        self.stats = PrefixStats()
+        self._previous: List[PromptSegment] = []
+        self._sent: "OrderedDict[str, int]" = OrderedDict()  # breakpoint fingerprint -> segment count
+
+    def _segments(self, messages: Sequence[AgentMessage]) -> List[PromptSegment]:
+        segments: List[PromptSegment] = []
+        previous = self._previous
+        # Reuse segments (and their exact message objects) up to the first change
+        for message in messages:
+            i = len(segments)
+            if i < len(previous):
+                old = previous[i].message
+                if old is message or (old.role == message.role and old.content == message.content):
+                    segments.append(previous[i])
+                    continue
+            break
+        for message in messages[len(segments):]:
+            parent = segments[-1].fingerprint if segments else ""
+            segments.append(
+                PromptSegment(message, _fingerprint(parent, message), self.count_tokens.count_message(message))
+            )
+        return segments
+
+    def assemble(self, system_prompt: str, history: Sequence[AgentMessage], prompt: str) -> AssembledPrompt:
+        """Lay out system prompt, history and the new prompt, in that order.
+
+        Args:
+            system_prompt: The agent's system prompt (empty for none)
+            history: Conversation so far, oldest first
+            prompt: The new user prompt
+
+        Returns:
+            AssembledPrompt whose prefix is reused wherever it is unchanged
+        """
+        messages: List[AgentMessage] = []
+        if system_prompt:
+            messages.append(AgentMessage(role="system", content=system_prompt))
+        messages.extend(history)
+        messages.append(AgentMessage(role="user", content=prompt))
+        segments = self._segments(messages)
+
+        cached = 0
+        for fingerprint, count in self._sent.items():
+            if count > cached and count <= len(segments) and segments[count - 1].fingerprint == fingerprint:
+                cached = count
+        if cached:
+            self._sent.move_to_end(segments[cached - 1].fingerprint)
+        cached_tokens = sum(segment.tokens for segment in segments[:cached])
+
+        # Cache the system prompt, the prefix that just hit, and the whole prompt
+        # (which is the next turn's prefix).
+        points = {len(segments) - 1}
+        if system_prompt:
+            points.add(0)
+        if cached:
+            points.add(cached - 1)
+        breakpoints = sorted(points)[-self.max_breakpoints:] if self.max_breakpoints > 0 else []
+        for index in breakpoints:
+            self._sent[segments[index].fingerprint] = index + 1
+            self._sent.move_to_end(segments[index].fingerprint)
+        while len(self._sent) > self.max_remembered:
+            self._sent.popitem(last=False)
+
+        assembled = AssembledPrompt(segments, breakpoints, cached, cached_tokens)
+        self._previous = segments
+        self.stats.requests += 1
+        self.stats.hits += bool(cached)
+        self.stats.prompt_tokens += assembled.total_tokens
+        self.stats.cached_tokens += cached_tokens
+        metrics.observe("prompt_prefill_tokens_saved", cached_tokens)
+        return assembled
+
+    def reset(self) -> None:
+        """Forget sent prefixes (e.g. after switching backends)."""
+        self._previous = []
+        self._sent.clear()
@@ -0,0 +1,234 @@
+"""Agent registry: built-in and plugin agents, tier capabilities and warm pools.
+
+Third-party agents register under the ``terminal221b.agents`` entry-point
+group (``myagent = "my_package.agents:MyAgent"``). Entry points are read on
+first lookup and plugin modules are only imported when the agent is used.
+"""
+
+import importlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Type
+
+from utils.license import TIER_LIMITS, LicenseTier
+
+from .base import AgentCapability, AgentContext, BaseAgent, capability_mask
+from .history import history_budget
+
+ENTRY_POINT_GROUP = "terminal221b.agents"
+
+_TIER_ORDER = (LicenseTier.FREE, LicenseTier.PRO, LicenseTier.ENTERPRISE)
+
+# Capabilities granted by each license tier
+TIER_CAPABILITIES: Dict[LicenseTier, FrozenSet[AgentCapability]] = {
+    LicenseTier.FREE: frozenset({AgentCapability.TEXT_GENERATION, AgentCapability.DATA_ANALYSIS}),
+    LicenseTier.PRO: frozenset(AgentCapability),
+    LicenseTier.ENTERPRISE: frozenset(AgentCapability),
+}
+TIER_CAPABILITY_MASKS: Dict[LicenseTier, int] = {
+    tier: capability_mask(caps) for tier, caps in TIER_CAPABILITIES.items()
+}
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """How to find an agent and which tiers may use it."""
+
+    name: str
+    target: str  # "module:Class", imported on first use
+    description: str = ""
+    min_tier: LicenseTier = LicenseTier.PRO
+
+    def allowed(self, tier: LicenseTier) -> bool:
+        """Check whether ``tier`` includes this agent."""
+        return _TIER_ORDER.index(tier) >= _TIER_ORDER.index(self.min_tier)
+
+    def load(self) -> Type[BaseAgent]:
+        """Import the agent class."""
+        module_name, _, attr = self.target.partition(":")
+        return getattr(importlib.import_module(module_name), attr)
+
+
+BUILTIN_AGENTS: Tuple[AgentSpec, ...] = (
+    AgentSpec("analyst", "src.agents.analyst:AnalystAgent", "Data analysis, research, and insights", LicenseTier.FREE),
+    AgentSpec("artist", "src.agents.artist:ArtistAgent", "Creative content generation", LicenseTier.PRO),
+    AgentSpec("engineer", "src.agents.engineer:EngineerAgent", "Code generation and architecture", LicenseTier.PRO),
+    AgentSpec("writer", "src.agents.writer:WriterAgent", "Documentation and technical writing", LicenseTier.PRO),
+)
+
+
+class AgentPool:
+    """Warm agent instances reused across requests.
+
+    Released agents are reset with ``clear_history()`` instead of being
+    rebuilt, so construction and capability validation happen once per
+    instance rather than once per request.
+    """
+
+    def __init__(self, factory: Callable[[], BaseAgent], max_idle: int = 8):
+        """Initialize pool.
+
+        Args:
+            factory: Builds a new agent when none are idle
+            max_idle: Idle agents kept for reuse; extras are dropped on release
+        """
+        self.factory = factory
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self._idle: List[BaseAgent] = []
+
+    def acquire(self) -> BaseAgent:
+        """Take an idle agent, or build one."""
+        if self._idle:
+            self.reused += 1
+            return self._idle.pop()
+        self.created += 1
+        return self.factory()
+
+    def release(self, agent: BaseAgent) -> None:
+        """Reset an agent and return it to the pool.
+
+        Any attached SessionLog is detached first, so the next lease
+        neither writes to nor resets the previous user's session.
+        """
+        agent.detach_session()
+        agent.clear_history()
+        if len(self._idle) < self.max_idle:
+            self._idle.append(agent)
+
+    @contextmanager
+    def lease(self) -> Iterator[BaseAgent]:
+        """Borrow an agent for the duration of a ``with`` block."""
+        agent = self.acquire()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+
+class AgentRegistry:
+    """Name -> AgentSpec lookup with lazy plugin discovery."""
+
+    def __init__(self, specs: Tuple[AgentSpec, ...] = BUILTIN_AGENTS, discover: bool = True):
+        """Initialize registry.
+
+        Args:
+            specs: Agents known up front
+            discover: Also load specs from the ``terminal221b.agents`` entry points
+        """
+        self._specs: Dict[str, AgentSpec] = {spec.name: spec for spec in specs}
+        self._discover = discover
+        self._classes: Dict[str, Type[BaseAgent]] = {}
+        self._pools: Dict[Tuple[str, LicenseTier], AgentPool] = {}
+
+    def _discover_plugins(self) -> None:
+        if not self._discover:
+            return
+        self._discover = False
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            # Built-ins win over plugins of the same name
+            self._specs.setdefault(ep.name, AgentSpec(ep.name, ep.value))
+
+    def register(self, spec: AgentSpec) -> None:
+        """Add or replace an agent."""
+        self._discover_plugins()
+        self._specs[spec.name] = spec
+        self._classes.pop(spec.name, None)
+        self._pools = {key: pool for key, pool in self._pools.items() if key[0] != spec.name}
+
+    def names(self) -> List[str]:
+        """Registered agent names."""
+        self._discover_plugins()
+        return list(self._specs)
+
+    def specs(self) -> List[AgentSpec]:
+        """Registered agent specs."""
+        self._discover_plugins()
+        return list(self._specs.values())
+
+    def get(self, name: str) -> AgentSpec:
+        """Look up an agent spec.
+
+        Raises:
+            KeyError: If no agent is registered under ``name``
+        """
+        self._discover_plugins()
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise KeyError(f"Unknown agent '{name}'") from None
+
+    def describe(self, name: str) -> str:
+        """Description from the spec, falling back to the (imported) class."""
+        spec = self.get(name)
+        if spec.description:
+            return spec.description
+        try:
+            return self.load(name).description
+        except ImportError:
+            return ""
+
+    def load(self, name: str) -> Type[BaseAgent]:
+        """Import and cache the agent class.
+
+        Raises:
+            KeyError: If the agent is unknown
+            ImportError: If its module is not installed
+        """
+        cls = self._classes.get(name)
+        if cls is None:
+            cls = self._classes[name] = self.get(name).load()
+        return cls
+
+    def allowed(self, name: str, tier: LicenseTier) -> bool:
+        """Check whether ``tier`` may run agent ``name``."""
+        return self.get(name).allowed(tier)
+
+    def context_for(self, tier: LicenseTier, **kwargs) -> AgentContext:
+        """Build an AgentContext carrying the tier's capabilities, precomputed mask and history budget.
+
+        The history budget is what the tier's per-run token limit leaves
+        after reserving ``max_tokens`` for the completion, unless passed
+        explicitly.
+        """
+        allowed = TIER_CAPABILITIES[tier]
+        context = AgentContext(capabilities=[cap for cap in AgentCapability if cap in allowed], **kwargs)
+        if "history_budget" not in kwargs:
+            context.history_budget = history_budget(TIER_LIMITS[tier].max_tokens_per_run, context.max_tokens)
+        context._capability_mask = (context.capabilities, len(context.capabilities), TIER_CAPABILITY_MASKS[tier])
+        return context
+
+    def create(self, name: str, tier: LicenseTier, context: Optional[AgentContext] = None) -> BaseAgent:
+        """Construct agent ``name`` for a license tier.
+
+        Raises:
+            PermissionError: If the tier does not include the agent
+        """
+        if not self.allowed(name, tier):
+            raise PermissionError(f"Agent '{name}' is not available in the {tier.value} tier.")
+        return self.load(name)(context or self.context_for(tier))
+
+    def pool(self, name: str, tier: LicenseTier, max_idle: int = 8) -> AgentPool:
+        """Shared pool of warm ``name`` agents for a tier."""
+        key = (name, tier)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = AgentPool(lambda: self.create(name, tier), max_idle=max_idle)
+        return pool
+
+
+_registry: Optional[AgentRegistry] = None
+
+
+def get_registry() -> AgentRegistry:
+    """Process-wide registry (built-ins plus installed plugins)."""
+    global _registry
+    if _registry is None:
+        _registry = AgentRegistry()
+    return _registry
@@ -0,0 +1,525 @@
+"""Append-only, memory-mapped session transcripts.
+
+Each session is stored as two files:
+
+* ``<id>.log``: a header, then length-prefixed, CRC-checked records. Each
+  record is one JSON message or an empty reset marker left by
+  ``clear_history()``.
+* ``<id>.idx``: a header, then one fixed-size entry per message holding
+  the log offset, token count and flags.
+
+Both files are memory-mapped for reads. Fetching message N is one index
+lookup plus one slice of the log, and resuming a session walks the index
+backwards to read only the tail that fits the token budget. Messages
+before the last reset are dead weight; compaction rewrites the files
+without them, off the caller's thread. Sessions are sharded into
+subdirectories by a hash of their id, so a store holding many sessions
+keeps every directory small.
+"""
+
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .base import AgentMessage
+from .tokens import get_token_counter
+
+LOG_MAGIC = b"T221LOG1"
+IDX_MAGIC = b"T221IDX1"
+LOG_HEADER = struct.Struct("<8sQQ")  # magic, generation, number of the first message in the file
+IDX_HEADER = struct.Struct("<8sQ")  # magic, generation (must match the log)
+RECORD = struct.Struct("<IIIB")  # payload length, crc32, tokens, kind
+ENTRY = struct.Struct("<QII")  # log offset, tokens, flags
+
+KIND_MESSAGE = 0
+KIND_RESET = 1
+FLAG_RESET_BEFORE = 1  # a reset marker precedes this message
+
+_SESSION_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,127}")
+
+
+def default_session_dir() -> Path:
+    """Session store location (``TERMINAL221B_SESSIONS`` or ~/.terminal221b/sessions)."""
+    override = os.environ.get("TERMINAL221B_SESSIONS")
+    if override:
+        return Path(override).expanduser()
+    return Path.home() / ".terminal221b" / "sessions"
+
+
+def _open_rw(path: Path):
+    return os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b")
+
+
+def _new_generation() -> int:
+    return int.from_bytes(os.urandom(8), "little")
+
+
+class SessionLog:
+    """One session's transcript on disk.
+
+    Messages are numbered from 0 for the life of the session; compaction
+    removes dead messages from the files but does not renumber the rest.
+
+    Usage:
+        with SessionLog(path) as log:
+            log.append(AgentMessage(role="user", content="hi"))
+            messages = log.tail(budget=4000)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        count_tokens: Optional[Callable[[AgentMessage], int]] = None,
+        executor: Optional[Executor] = None,
+        compact_ratio: float = 0.5,
+        compact_min_bytes: int = 1 << 20,
+    ):
+        """Open or create a session log.
+
+        Args:
+            path: Base path; ``.log`` and ``.idx`` are appended
+            count_tokens: Token counter for new messages (default: the shared TokenCounter)
+            executor: Where background compaction runs (None disables it)
+            compact_ratio: Compact after a reset once this fraction of the log is dead
+            compact_min_bytes: ...and at least this many bytes are dead
+        """
+        self.path = Path(path)
+        self.log_path = Path(f"{self.path}.log")
+        self.idx_path = Path(f"{self.path}.idx")
+        self.count_tokens = count_tokens or get_token_counter().count_message
+        self.executor = executor
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self._lock = threading.RLock()
+        self._compaction: Optional[Future] = None
+        self._log_map: Optional[mmap.mmap] = None
+        self._idx_map: Optional[mmap.mmap] = None
+        self._open()
+
+    # -- opening and recovery -------------------------------------------------
+
+    def _open(self) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = _open_rw(self.log_path)
+        self._idx = _open_rw(self.idx_path)
+        header = self._log.read(LOG_HEADER.size)
+        if not header:
+            self.generation, self.base = _new_generation(), 0
+            self._log.write(LOG_HEADER.pack(LOG_MAGIC, self.generation, self.base))
+            self._log.flush()
+        else:
+            if len(header) < LOG_HEADER.size or header[:8] != LOG_MAGIC:
+                self._log.close()
+                self._idx.close()
+                raise ValueError(f"{self.log_path} is not a session log")
+            _, self.generation, self.base = LOG_HEADER.unpack(header)
+        self._log_size = self._log.seek(0, os.SEEK_END)
+        self._trailing_reset = False
+        self._live_start: Optional[int] = None
+        self._load_index()
+        self._remap()
+
+    def _load_index(self) -> None:
+        """Validate the index against the log, repairing torn or missing tails."""
+        idx_size = self._idx.seek(0, os.SEEK_END)
+        self._idx.seek(0)
+        header = self._idx.read(IDX_HEADER.size)
+        if len(header) < IDX_HEADER.size or IDX_HEADER.unpack(header) != (IDX_MAGIC, self.generation):
+            # Missing, or left over from before a compaction: rebuild from the log
+            self._idx.seek(0)
+            self._idx.truncate()
+            self._idx.write(IDX_HEADER.pack(IDX_MAGIC, self.generation))
+            self._n = 0
+            scan_from = LOG_HEADER.size
+        else:
+            self._n = (idx_size - IDX_HEADER.size) // ENTRY.size
+            scan_from = LOG_HEADER.size
+            # Drop entries pointing past the end of the log (log write lost in a crash)
+            while self._n:
+                self._idx.seek(IDX_HEADER.size + (self._n - 1) * ENTRY.size)
+                offset = ENTRY.unpack(self._idx.read(ENTRY.size))[0]
+                end = self._record_end(offset)
+                if end is not None:
+                    scan_from = end
+                    break
+                self._n -= 1
+        self._idx.truncate(IDX_HEADER.size + self._n * ENTRY.size)
+        self._idx_size = IDX_HEADER.size + self._n * ENTRY.size
+        self._idx.seek(self._idx_size)
+        # Index records the log has but the index missed (index write lost in a crash)
+        flags = 0
+        for offset, tokens, kind in self._scan(scan_from):
+            if kind == KIND_RESET:
+                flags = FLAG_RESET_BEFORE
+                continue
+            self._idx.write(ENTRY.pack(offset, tokens, flags))
+            self._n += 1
+            self._idx_size += ENTRY.size
+            flags = 0
+        self._trailing_reset = bool(flags)
+        self._idx.flush()
+
+    def _record_end(self, offset: int) -> Optional[int]:
+        """End offset of the record at ``offset``, or None if it is not fully on disk."""
+        if offset + RECORD.size > self._log_size:
+            return None
+        self._log.seek(offset)
+        length = RECORD.unpack(self._log.read(RECORD.size))[0]
+        end = offset + RECORD.size + length
+        return end if end <= self._log_size else None
+
+    def _scan(self, offset: int) -> Iterator[Tuple[int, int, int]]:
+        """Yield (offset, tokens, kind) for valid records from ``offset``; truncate a torn tail."""
+        while offset < self._log_size:
+            self._log.seek(offset)
+            header = self._log.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            length, crc, tokens, kind = RECORD.unpack(header)
+            payload = self._log.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            yield offset, tokens, kind
+            offset += RECORD.size + length
+        if offset < self._log_size:
+            self._log.truncate(offset)
+            self._log_size = offset
+
+    def _remap(self) -> None:
+        # Old maps are left to the garbage collector: raw() views may still point into them
+        self._log.flush()
+        self._idx.flush()
+        self._log_map = mmap.mmap(self._log.fileno(), self._log_size, access=mmap.ACCESS_READ)
+        self._idx_map = mmap.mmap(self._idx.fileno(), self._idx_size, access=mmap.ACCESS_READ)
+
+    def _maps(self) -> Tuple[mmap.mmap, mmap.mmap]:
+        if len(self._log_map) < self._log_size or len(self._idx_map) < self._idx_size:
+            self._remap()
+        return self._log_map, self._idx_map
+
+    # -- writing --------------------------------------------------------------
+
+    def _write_record(self, payload: bytes, tokens: int, kind: int) -> int:
+        offset = self._log_size
+        self._log.seek(offset)
+        self._log.write(RECORD.pack(len(payload), zlib.crc32(payload), tokens, kind) + payload)
+        self._log.flush()
+        self._log_size += RECORD.size + len(payload)
+        return offset
+
+    def append(self, message: AgentMessage) -> int:
+        """Append a message; return its number."""
+        record = {"role": message.role, "content": message.content}
+        if message.metadata:
+            record["metadata"] = message.metadata
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tokens = self.count_tokens(message)
+        with self._lock:
+            offset = self._write_record(payload, tokens, KIND_MESSAGE)
+            flags = FLAG_RESET_BEFORE if self._trailing_reset else 0
+            self._trailing_reset = False
+            self._idx.seek(self._idx_size)
+            self._idx.write(ENTRY.pack(offset, tokens, flags))
+            self._idx.flush()
+            self._idx_size += ENTRY.size
+            self._n += 1
+            return self.base + self._n - 1
+
+    def extend(self, messages) -> None:
+        for message in messages:
+            self.append(message)
+
+    def reset(self) -> None:
+        """Record a history reset; earlier messages are no longer resumed.
+
+        Schedules background compaction once enough of the log is dead.
+        """
+        with self._lock:
+            self._write_record(b"", 0, KIND_RESET)
+            self._trailing_reset = True
+            self._live_start = len(self)
+            dead = self.dead_bytes
+            if (
+                self.executor is not None
+                and (self._compaction is None or self._compaction.done())
+                and dead >= self.compact_min_bytes
+                and dead >= self.compact_ratio * self._log_size
+            ):
+                self._compaction = self.executor.submit(self.compact)
+
+    def sync(self) -> None:
+        """fsync both files (appends are flushed to the OS, not forced to disk)."""
+        with self._lock:
+            os.fsync(self._log.fileno())
+            os.fsync(self._idx.fileno())
+
+    # -- reading --------------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Number of messages ever appended (including compacted ones)."""
+        return self.base + self._n
+
+    def _entry(self, local: int) -> Tuple[int, int, int]:
+        return ENTRY.unpack_from(self._maps()[1], IDX_HEADER.size + local * ENTRY.size)
+
+    def _local(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        if index < self.base:
+            raise IndexError(f"message {index} was removed by compaction")
+        return index - self.base
+
+    def raw(self, index: int) -> memoryview:
+        """Zero-copy view of message ``index``'s JSON payload (release it when done)."""
+        with self._lock:
+            offset = self._entry(self._local(index))[0]
+            log_map = self._maps()[0]
+            length = RECORD.unpack_from(log_map, offset)[0]
+            start = offset + RECORD.size
+            return memoryview(log_map)[start:start + length]
+
+    def __getitem__(self, index: int) -> AgentMessage:
+        with self._lock, self.raw(index) as payload:
+            return AgentMessage(**json.loads(bytes(payload)))
+
+    def tokens(self, index: int) -> int:
+        """Token count recorded for message ``index``."""
+        with self._lock:
+            return self._entry(self._local(index))[1]
+
+    @property
+    def live_start(self) -> int:
+        """Number of the first message after the last reset."""
+        with self._lock:
+            if self._trailing_reset:
+                return len(self)
+            if self._live_start is None:
+                start = self._n
+                while start > 0:
+                    start -= 1
+                    if self._entry(start)[2] & FLAG_RESET_BEFORE:
+                        break
+                else:
+                    start = 0
+                self._live_start = self.base + start
+            return self._live_start
+
+    def tail(self, budget: Optional[int] = None) -> List[AgentMessage]:
+        """Most recent live messages whose tokens fit ``budget`` (None: all live messages).
+
+        Reads only the returned messages, so resuming a long session costs
+        the size of the tail rather than the whole transcript.
+        """
+        with self._lock:
+            if self._trailing_reset:
+                return []
+            start, total = self._n, 0
+            for local in range(self._n - 1, -1, -1):
+                _, tokens, flags = self._entry(local)
+                if budget is not None and total + tokens > budget:
+                    break
+                total += tokens
+                start = local
+                if flags & FLAG_RESET_BEFORE:
+                    break
+            return [self[self.base + local] for local in range(start, self._n)]
+
+    @property
+    def size(self) -> int:
+        """Bytes in the log file."""
+        return self._log_size
+
+    @property
+    def dead_bytes(self) -> int:
+        """Log bytes before the live messages (reclaimable by compaction)."""
+        with self._lock:
+            live = self.live_start
+            if live >= len(self):
+                return self._log_size - LOG_HEADER.size
+            return self._entry(live - self.base)[0] - LOG_HEADER.size
+
+    # -- compaction -----------------------------------------------------------
+
+    def compact(self) -> bool:
+        """Rewrite the files without messages before the last reset.
+
+        Safe to run on a worker thread: the bulk copy happens without the
+        lock, and appends made meanwhile are carried over before the swap.
+
+        Returns:
+            Whether anything was removed
+        """
+        with self._lock:
+            live = self.live_start
+            cut = self._entry(live - self.base)[0] if live < len(self) else self._log_size
+            if cut == LOG_HEADER.size:
+                return False
+            snapshot_size, snapshot_n = self._log_size, self._n
+            first_local = live - self.base
+        generation = _new_generation()
+        shift = cut - LOG_HEADER.size
+        tmp_log = Path(f"{self.log_path}.compact")
+        tmp_idx = Path(f"{self.idx_path}.compact")
+        with open(self.log_path, "rb") as src, open(tmp_log, "wb") as log_out, open(self.idx_path, "rb") as idx_src, open(tmp_idx, "wb") as idx_out:
+            log_out.write(LOG_HEADER.pack(LOG_MAGIC, generation, live))
+            idx_out.write(IDX_HEADER.pack(IDX_MAGIC, generation))
+            self._copy(src, log_out, cut, snapshot_size)
+            self._copy_entries(idx_src, idx_out, first_local, snapshot_n, shift)
+            with self._lock:
+                # Carry over anything appended while copying, then swap files
+                self._log.flush()
+                self._idx.flush()
+                self._copy(src, log_out, snapshot_size, self._log_size)
+                self._copy_entries(idx_src, idx_out, snapshot_n, self._n, shift)
+                log_out.flush()
+                idx_out.flush()
+                os.fsync(log_out.fileno())
+                os.fsync(idx_out.fileno())
+                trailing_reset = self._trailing_reset
+                self._close_files()
+                os.replace(tmp_log, self.log_path)
+                os.replace(tmp_idx, self.idx_path)
+                self._open()
+                self._trailing_reset = self._trailing_reset or trailing_reset
+        return True
+
+    @staticmethod
+    def _copy(src, dst, start: int, end: int, chunk: int = 1 << 20) -> None:
+        src.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = src.read(min(chunk, remaining))
+            dst.write(data)
+            remaining -= len(data)
+
+    @staticmethod
+    def _copy_entries(src, dst, first: int, last: int, shift: int, batch: int = 4096) -> None:
+        for start in range(first, last, batch):
+            count = min(batch, last - start)
+            src.seek(IDX_HEADER.size + start * ENTRY.size)
+            data = src.read(count * ENTRY.size)
+            dst.write(b"".join(
+                ENTRY.pack(offset - shift, tokens, flags) for offset, tokens, flags in ENTRY.iter_unpack(data)
+            ))
+
+    def wait_for_compaction(self) -> None:
+        """Block until a scheduled background compaction has finished."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.result()
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def _close_files(self) -> None:
+        for m in (self._log_map, self._idx_map):
+            if m is not None:
+                with contextlib.suppress(BufferError):  # a raw() view is still alive
+                    m.close()
+        self._log_map = self._idx_map = None
+        self._log.close()
+        self._idx.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._log.closed:
+                self._close_files()
+
+    def __enter__(self) -> "SessionLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SessionStore:
+    """Directory of session logs, sharded by a hash of the session id.
+
+    Usage:
+        store = SessionStore()
+        agent.attach_session(store.open("project-x"))
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, background_compaction: bool = True, **log_options):
+        """Initialize store.
+
+        Args:
+            root: Store directory (default: ``default_session_dir()``)
+            background_compaction: Compact logs on a worker thread after resets
+            **log_options: Passed to every SessionLog (e.g. compact_ratio)
+        """
+        self.root = Path(root) if root else default_session_dir()
+        self.log_options = log_options
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="session-compact") if background_compaction else None
+        self._logs: Dict[str, SessionLog] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, session_id: str) -> Path:
+        """Base path for a session's files.
+
+        Raises:
+            ValueError: If the id is not a safe file name
+        """
+        if not _SESSION_ID.fullmatch(session_id):
+            raise ValueError(f"Invalid session id {session_id!r} (use letters, digits, '.', '_' and '-')")
+        shard = hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:2]
+        return self.root / shard / session_id
+
+    def open(self, session_id: str) -> SessionLog:
+        """Open (creating if needed) a session; repeated calls share one SessionLog."""
+        with self._lock:
+            log = self._logs.get(session_id)
+            if log is None:
+                log = self._logs[session_id] = SessionLog(
+                    self.path_for(session_id), executor=self._executor, **self.log_options
+                )
+            return log
+
+    def exists(self, session_id: str) -> bool:
+        return Path(f"{self.path_for(session_id)}.log").exists()
+
+    def delete(self, session_id: str) -> None:
+        """Remove a session's files."""
+        with self._lock:
+            log = self._logs.pop(session_id, None)
+        if log is not None:
+            log.wait_for_compaction()
+            log.close()
+        base = self.path_for(session_id)
+        for suffix in (".log", ".idx"):
+            Path(f"{base}{suffix}").unlink(missing_ok=True)
+
+    def sessions(self) -> Iterator[str]:
+        """Ids of every stored session."""
+        if not self.root.is_dir():
+            return
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".log"):
+                        yield entry.name[:-4]
+
+    def close(self) -> None:
+        """Finish background compaction and close every open log."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._lock:
+            for log in self._logs.values():
+                log.close()
+            self._logs.clear()
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
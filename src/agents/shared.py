@@ -0,0 +1,300 @@
+"""Copy-on-write shared context for multi-agent collaboration.
+
+A Blackboard holds the shared conversation as a persistent vector: an
+immutable 32-way trie whose versions share all unchanged nodes. Forking
+it for an agent is O(1) and allocates nothing but a small wrapper; each
+fork records its own messages privately and ``merge`` appends them back
+onto the shared conversation without touching the other forks.
+"""
+
+from collections.abc import MutableSequence
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from .base import AgentMessage
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class PVector:
+    """Immutable, structurally shared sequence (a persistent bit-partitioned trie).
+
+    ``append``/``extend`` return new vectors that share every untouched
+    node with the original, so old versions stay valid and cost nothing
+    to keep. Indexing is O(log32 n), effectively constant.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._count = 0
+        self._shift = _BITS
+        self._root: Tuple = ()
+        self._tail: Tuple = ()
+        if items:
+            built = self.extend(items)
+            self._count, self._shift, self._root, self._tail = built._count, built._shift, built._root, built._tail
+
+    @classmethod
+    def _make(cls, count: int, shift: int, root: Tuple, tail: Tuple) -> "PVector":
+        vector = cls.__new__(cls)
+        vector._count, vector._shift, vector._root, vector._tail = count, shift, root, tail
+        return vector
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _tail_offset(self) -> int:
+        return 0 if self._count < _WIDTH else ((self._count - 1) >> _BITS) << _BITS
+
+    def _leaf(self, index: int) -> Tuple:
+        if index >= self._tail_offset():
+            return self._tail
+        node = self._root
+        for level in range(self._shift, 0, -_BITS):
+            node = node[(index >> level) & _MASK]
+        return node
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._leaf(i)[i & _MASK] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        return self._leaf(index)[index & _MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        for start in range(0, self._count, _WIDTH):
+            yield from self._leaf(start)
+
+    def _push_tail(self, level: int, parent: Tuple, leaf: Tuple) -> Tuple:
+        sub = ((self._count - 1) >> level) & _MASK
+        if level == _BITS:
+            node = leaf
+        elif sub < len(parent):
+            node = self._push_tail(level - _BITS, parent[sub], leaf)
+        else:
+            node = _new_path(level - _BITS, leaf)
+        return parent[:sub] + (node,) + parent[sub + 1:]
+
+    def append(self, item: Any) -> "PVector":
+        """New vector with ``item`` added at the end."""
+        if self._count - self._tail_offset() < _WIDTH:
+            return self._make(self._count + 1, self._shift, self._root, self._tail + (item,))
+        shift = self._shift
+        if (self._count >> _BITS) > (1 << shift):
+            root = (self._root, _new_path(shift, self._tail))
+            shift += _BITS
+        else:
+            root = self._push_tail(shift, self._root, self._tail)
+        return self._make(self._count + 1, shift, root, (item,))
+
+    def extend(self, items: Iterable[Any]) -> "PVector":
+        """New vector with ``items`` added at the end."""
+        vector = self
+        for item in items:
+            vector = vector.append(item)
+        return vector
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PVector):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"<PVector len={self._count}>"
+
+
+def _new_path(level: int, leaf: Tuple) -> Tuple:
+    node = leaf
+    for _ in range(0, level, _BITS):
+        node = (node,)
+    return node
+
+
+class CowMessages(MutableSequence):
+    """An agent's copy-on-write view of a shared conversation.
+
+    Reads fall through to the shared PVector; appends go to a private
+    list. Dropping messages from the front (history compaction) only moves
+    an offset and inserts at the front go to a small private head, so the
+    shared part is never copied for the operations ConversationHistory
+    performs. Any other edit inside the shared part copies it once.
+    """
+
+    def __init__(self, base: Optional[PVector] = None):
+        self.base = base if base is not None else PVector()
+        self._head: List[AgentMessage] = []
+        self._lo = 0
+        self._hi = len(self.base)
+        self._tail: List[AgentMessage] = []
+        self.appended: List[AgentMessage] = []  # everything this fork added, for merging
+        self._merged = 0
+
+    def __len__(self) -> int:
+        return len(self._head) + (self._hi - self._lo) + len(self._tail)
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Map a position to (region, offset): 0 head, 1 shared, 2 tail."""
+        if index < len(self._head):
+            return 0, index
+        index -= len(self._head)
+        if index < self._hi - self._lo:
+            return 1, self._lo + index
+        return 2, index - (self._hi - self._lo)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        region, offset = self._locate(index)
+        if region == 0:
+            return self._head[offset]
+        if region == 1:
+            return self.base[offset]
+        return self._tail[offset]
+
+    def __iter__(self) -> Iterator[AgentMessage]:
+        yield from self._head
+        if self._lo == 0 and self._hi == len(self.base):
+            yield from self.base
+        else:
+            for i in range(self._lo, self._hi):
+                yield self.base[i]
+        yield from self._tail
+
+    def append(self, message: AgentMessage) -> None:
+        self._tail.append(message)
+        self.appended.append(message)
+
+    def extend(self, messages: Iterable[AgentMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def insert(self, index: int, message: AgentMessage) -> None:
+        if index < 0:
+            index = max(0, index + len(self))
+        if index <= len(self._head):
+            self._head.insert(index, message)
+        elif index >= len(self):
+            self.append(message)
+        else:
+            self._materialize()
+            self._head.insert(index, message)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, int) and -len(self) <= index < len(self):
+            region, offset = self._locate(index % len(self))
+            if region == 0:
+                self._head[offset] = value
+                return
+            if region == 2:
+                self._tail[offset] = value
+                return
+        self._materialize()
+        self._head[index] = value
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice) and index.start in (None, 0) and index.step in (None, 1):
+            # Front deletion: trim the head, then slide the shared window
+            end = min(len(self), index.stop if index.stop is not None else len(self))
+            if end < 0:
+                end = max(0, end + len(self))
+            from_head = min(end, len(self._head))
+            del self._head[:from_head]
+            end -= from_head
+            from_shared = min(end, self._hi - self._lo)
+            self._lo += from_shared
+            del self._tail[:end - from_shared]
+            return
+        self._materialize()
+        del self._head[index]
+
+    def clear(self) -> None:
+        self._head, self._tail = [], []
+        self._lo = self._hi
+
+    def _materialize(self) -> None:
+        """Copy the shared window and the tail into the private head."""
+        self._head = list(self)
+        self._lo = self._hi
+        self._tail = []
+
+    def __add__(self, other) -> List[AgentMessage]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[AgentMessage]:
+        return list(other) + list(self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, CowMessages)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    @property
+    def shared(self) -> int:
+        """Messages still read straight from the shared conversation."""
+        return self._hi - self._lo
+
+    def __repr__(self) -> str:
+        return f"<CowMessages len={len(self)} shared={self.shared} private={len(self._head) + len(self._tail)}>"
+
+
+class Blackboard:
+    """Shared conversation that agents fork from and merge results into.
+
+    Usage:
+        board = Blackboard(context.messages)
+        board.attach(analyst)
+        board.attach(writer)
+        await asyncio.gather(analyst.execute(p1), writer.execute(p2))
+        board.merge(analyst.context.messages, agent="analyst")
+        board.merge(writer.context.messages, agent="writer")
+    """
+
+    def __init__(self, messages: Iterable[AgentMessage] = ()):
+        self.messages = messages if isinstance(messages, PVector) else PVector(messages)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def fork(self) -> CowMessages:
+        """O(1) private view of the current conversation."""
+        return CowMessages(self.messages)
+
+    def attach(self, agent) -> CowMessages:
+        """Point an agent's history at a fresh fork (replacing its own messages)."""
+        fork = self.fork()
+        agent.context.messages = fork
+        return fork
+
+    def post(self, message: AgentMessage) -> None:
+        """Append a message directly to the shared conversation."""
+        self.messages = self.messages.append(message)
+
+    def merge(self, fork: CowMessages, agent: Optional[str] = None) -> int:
+        """Append a fork's new messages to the shared conversation.
+
+        Merging the same fork again only adds what it appended since.
+
+        Args:
+            fork: A fork returned by ``fork()``/``attach()``
+            agent: Recorded as ``metadata["agent"]`` on the merged messages
+
+        Returns:
+            Number of messages merged
+        """
+        new = fork.appended[fork._merged:]
+        fork._merged = len(fork.appended)
+        if agent is not None:
+            new = [
+                message.model_copy(update={"metadata": {**(message.metadata or {}), "agent": agent}})
+                for message in new
+            ]
+        self.messages = self.messages.extend(new)
+        return len(new)
@@ -0,0 +1,162 @@
+"""Speculative fan-out across agents.
+
+For latency-critical requests the same prompt is sent to several agents
+at once. The first result that passes an acceptance predicate wins and
+every other call is cancelled immediately, so the losers stop consuming
+tokens. The report records what the race cost (tokens spent by completed
+losers) and what cancellation saved, measured against the tier's
+per-run token limit.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from utils import metrics
+
+from .base import AgentResult, BaseAgent
+
+AcceptFn = Callable[[AgentResult], bool]
+
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def accept_success(result: AgentResult) -> bool:
+    """Default predicate: any successful result is acceptable."""
+    return result.success
+
+
+@dataclass
+class Attempt:
+    """One agent's part in a speculative race."""
+
+    agent: str
+    status: str = CANCELLED
+    elapsed: float = 0.0
+    tokens_used: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class SpeculationReport:
+    """Outcome of a speculative race."""
+
+    result: AgentResult
+    winner: Optional[str]
+    attempts: List[Attempt] = field(default_factory=list)
+    elapsed: float = 0.0
+    tokens_used: int = 0  # spent by the winner
+    tokens_wasted: int = 0  # spent by attempts that finished but lost
+    tokens_saved: int = 0  # estimated for attempts cancelled before finishing
+    max_tokens_per_run: int = -1  # tier limit the totals are reported against
+
+    @property
+    def tokens_spent(self) -> int:
+        return self.tokens_used + self.tokens_wasted
+
+    @property
+    def within_limit(self) -> bool:
+        """Whether the race as a whole stayed within the tier's per-run token limit."""
+        return self.max_tokens_per_run < 0 or self.tokens_spent <= self.max_tokens_per_run
+
+    def summary(self) -> str:
+        limit = "unlimited" if self.max_tokens_per_run < 0 else str(self.max_tokens_per_run)
+        return (
+            f"winner={self.winner or '-'} in {self.elapsed:.2f}s; "
+            f"tokens used={self.tokens_used} wasted={self.tokens_wasted} "
+            f"saved~{self.tokens_saved} (limit {limit}/run)"
+        )
+
+
+async def speculate(
+    agents: Sequence[BaseAgent],
+    prompt: str,
+    accept: AcceptFn = accept_success,
+    deadline: Optional[float] = None,
+    limits=None,
+) -> SpeculationReport:
+    """Run ``prompt`` on every agent and keep the first acceptable result.
+
+    Args:
+        agents: Agents (or differently configured backends) to race
+        prompt: Prompt sent to all of them
+        accept: Predicate a result must pass to win; raising counts as rejection
+        deadline: Seconds for the whole race; remaining calls are cancelled when it passes
+        limits: LicenseLimits the token totals are reported against
+
+    Returns:
+        SpeculationReport; ``result.success`` is False if nothing was accepted
+    """
+    if not agents:
+        raise ValueError("speculate() needs at least one agent")
+    start = time.perf_counter()
+    attempts = [Attempt(agent.name) for agent in agents]
+    pending: Dict[asyncio.Task, int] = {
+        asyncio.ensure_future(agent.execute(prompt)): i for i, agent in enumerate(agents)
+    }
+    winner: Optional[int] = None
+    result: Optional[AgentResult] = None
+    timeout = deadline
+    try:
+        while pending and winner is None:
+            if deadline is not None:
+                timeout = max(0.0, deadline - (time.perf_counter() - start))
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                index = pending.pop(task)
+                attempt = attempts[index]
+                attempt.elapsed = time.perf_counter() - start
+                try:
+                    outcome = task.result()
+                except Exception as e:
+                    attempt.status, attempt.error = FAILED, str(e)
+                    continue
+                attempt.tokens_used = outcome.tokens_used
+                try:
+                    accepted = winner is None and bool(accept(outcome))
+                except Exception as e:
+                    accepted, attempt.error = False, f"accept() raised: {e}"
+                if accepted:
+                    winner, result, attempt.status = index, outcome, ACCEPTED
+                else:
+                    attempt.status = REJECTED if outcome.success else FAILED
+                    attempt.error = attempt.error or outcome.error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    elapsed = time.perf_counter() - start
+    if result is None:
+        if pending:
+            error = f"No acceptable result within {deadline}s deadline"
+        else:
+            error = "No agent produced an acceptable result"
+        result = AgentResult(success=False, output="", error=error)
+
+    finished = [a for a in attempts if a.status != CANCELLED]
+    cancelled = len(attempts) - len(finished)
+    # A cancelled call would have cost about what the finished ones did
+    typical = sum(a.tokens_used for a in finished) // len(finished) if finished else 0
+    report = SpeculationReport(
+        result=result,
+        winner=attempts[winner].agent if winner is not None else None,
+        attempts=attempts,
+        elapsed=elapsed,
+        tokens_used=attempts[winner].tokens_used if winner is not None else 0,
+        tokens_wasted=sum(a.tokens_used for i, a in enumerate(attempts) if i != winner),
+        tokens_saved=typical * cancelled,
+        max_tokens_per_run=limits.max_tokens_per_run if limits is not None else -1,
+    )
+    metrics.observe("speculative_tokens_wasted", report.tokens_wasted)
+    metrics.observe("speculative_tokens_saved", report.tokens_saved)
+    return report
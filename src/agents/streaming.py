@@ -0,0 +1,193 @@
+"""Backpressure-aware streaming pipeline for agent output.
+
+Token chunks from ``BaseAgent.stream`` are fanned out to several sinks
+(terminal, file, token counter) through one bounded queue per sink. Every
+sink receives the same chunk object, so nothing is copied per sink, and a
+slow sink stalls the producer once its queue is full instead of letting
+memory grow without bound.
+"""
+
+import asyncio
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, TextIO, Union
+
+_DONE = object()
+
+
+class StreamSink(ABC):
+    """Consumer of streamed token chunks."""
+
+    name: str = "sink"
+
+    @abstractmethod
+    async def write(self, chunk: str) -> None:
+        """Handle one chunk."""
+        pass
+
+    async def close(self) -> None:
+        """Release resources once the stream has ended."""
+        pass
+
+
+class TerminalSink(StreamSink):
+    """Writes chunks to a text stream (stdout by default) as they arrive."""
+
+    name = "terminal"
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+
+    async def write(self, chunk: str) -> None:
+        self.stream.write(chunk)
+        self.stream.flush()
+
+
+class FileSink(StreamSink):
+    """Appends chunks to a file."""
+
+    name = "file"
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._fh: Optional[TextIO] = None
+
+    async def write(self, chunk: str) -> None:
+        if self._fh is None:
+            self._fh = self.path.open("a", encoding="utf-8")
+        self._fh.write(chunk)
+
+    async def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class TokenCounterSink(StreamSink):
+    """Counts streamed tokens (one chunk per token) and characters."""
+
+    name = "tokens"
+
+    def __init__(self):
+        self.tokens = 0
+        self.characters = 0
+
+    async def write(self, chunk: str) -> None:
+        self.tokens += 1
+        self.characters += len(chunk)
+
+
+@dataclass
+class StageStats:
+    """Timing for one pipeline stage, in seconds since the pipeline started."""
+
+    name: str
+    first_chunk: Optional[float] = None
+    finished: Optional[float] = None
+    chunks: int = 0
+    max_queued: int = 0
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage timings for a completed stream."""
+
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def time_to_first_token(self) -> Dict[str, Optional[float]]:
+        """Time-to-first-token at every stage."""
+        return {name: stage.first_chunk for name, stage in self.stages.items()}
+
+
+class StreamPipeline:
+    """Fans a chunk stream out to sinks through bounded queues.
+
+    Usage:
+        pipeline = StreamPipeline([TerminalSink(), TokenCounterSink()])
+        stats = await pipeline.run_agent(agent, "Explain the plan")
+    """
+
+    SOURCE = "source"
+
+    def __init__(self, sinks: List[StreamSink], maxsize: int = 64):
+        """Initialize pipeline.
+
+        Args:
+            sinks: Consumers; names must be unique
+            maxsize: Chunks buffered per sink before the producer waits
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        names = [sink.name for sink in sinks]
+        if len(set(names)) != len(names) or self.SOURCE in names:
+            raise ValueError(f"Sink names must be unique and not '{self.SOURCE}'")
+        self.sinks = list(sinks)
+        self.maxsize = maxsize
+
+    async def run_agent(self, agent, prompt: str) -> PipelineStats:
+        """Stream an agent's output through the pipeline."""
+        return await self.run(agent.stream(prompt))
+
+    async def run(self, source: AsyncIterator[str]) -> PipelineStats:
+        """Drain ``source`` into every sink.
+
+        Raises:
+            Exception: The first error raised by the source or any sink
+        """
+        stats = PipelineStats()
+        start = time.perf_counter()
+        queues = [asyncio.Queue(self.maxsize) for _ in self.sinks]
+        stats.stages[self.SOURCE] = StageStats(self.SOURCE)
+        tasks = [asyncio.ensure_future(self._produce(source, queues, stats, start))]
+        for sink, queue in zip(self.sinks, queues):
+            stats.stages[sink.name] = StageStats(sink.name)
+            tasks.append(asyncio.ensure_future(self._consume(sink, queue, stats, start)))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            for sink in self.sinks:
+                await sink.close()
+
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    async def _produce(self, source, queues, stats: PipelineStats, start: float) -> None:
+        stage = stats.stages[self.SOURCE]
+        async for chunk in source:
+            if stage.first_chunk is None:
+                stage.first_chunk = time.perf_counter() - start
+            stage.chunks += 1
+            for queue in queues:
+                await queue.put(chunk)
+        stage.finished = time.perf_counter() - start
+        for queue in queues:
+            await queue.put(_DONE)
+
+    async def _consume(self, sink: StreamSink, queue: asyncio.Queue, stats: PipelineStats, start: float) -> None:
+        stage = stats.stages[sink.name]
+        while True:
+            stage.max_queued = max(stage.max_queued, queue.qsize())
+            chunk = await queue.get()
+            if chunk is _DONE:
+                break
+            await sink.write(chunk)
+            if stage.first_chunk is None:
+                stage.first_chunk = time.perf_counter() - start
+            stage.chunks += 1
+        stage.finished = time.perf_counter() - start
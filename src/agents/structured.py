@@ -0,0 +1,231 @@
+"""Incremental parser for structured agent output.
+
+Consumes token chunks from ``BaseAgent.stream`` and emits structured
+pieces the moment they close, so downstream agents and sinks can start
+work before generation finishes:
+
+- ``field``: one top-level member of a JSON object, as soon as its value ends
+- ``object``: a complete top-level JSON object
+- ``code``: a fenced code block (``` or longer), with its info-string language
+
+Every character is looked at once. Members are decoded as they close and
+an object is assembled from its members, so the buffer is never
+re-scanned. JSON is recognised both in prose and inside ```json fences.
+Only objects are tracked at the top level (not bare arrays), so markdown
+such as ``[link]`` is never mistaken for JSON.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+
+from .streaming import StreamSink
+
+FIELD = "field"
+OBJECT = "object"
+CODE = "code"
+
+
+@dataclass
+class StructuredEvent:
+    """One structured piece of streamed output."""
+
+    kind: str  # FIELD, OBJECT or CODE
+    value: Any  # field value, object dict, or code text
+    key: Optional[str] = None  # FIELD only
+    language: Optional[str] = None  # CODE only
+
+
+class _JsonScanner:
+    """Tracks top-level JSON objects one character at a time."""
+
+    def __init__(self, events: List[StructuredEvent]):
+        self._events = events
+        self._reset()
+
+    def _reset(self) -> None:
+        self.depth = 0
+        self._buf: List[str] = []
+        self._member_start = 0
+        self._fields: Dict[str, Any] = {}
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._valid = True
+
+    def feed(self, c: str) -> None:
+        if self.depth == 0:
+            if c == "{":
+                self.depth, self._buf, self._member_start, self._expect_key = 1, ["{"], 1, True
+            return
+        if self._expect_key and not c.isspace():
+            self._expect_key = False
+            if c not in '"}':
+                self._reset()  # a brace in prose, not an object
+                return
+        if self._in_string and c == "\n":
+            self._reset()  # raw newlines are invalid in JSON strings: this was a stray brace
+            return
+        self._buf.append(c)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+        elif c == '"':
+            self._in_string = True
+        elif c in "{[":
+            self.depth += 1
+        elif c in "}]":
+            self.depth -= 1
+            if self.depth == 0:
+                self._member(len(self._buf) - 1)
+                if self._valid:
+                    self._events.append(StructuredEvent(OBJECT, self._fields))
+                self._reset()
+        elif c == "," and self.depth == 1:
+            self._member(len(self._buf) - 1)
+            self._member_start = len(self._buf)
+
+    def _member(self, end: int) -> None:
+        text = "".join(self._buf[self._member_start:end]).strip()
+        if not text:
+            return
+        try:
+            decoded = json.loads("{" + text + "}")
+        except ValueError:
+            self._valid = False
+            return
+        for key, value in decoded.items():
+            self._fields[key] = value
+            self._events.append(StructuredEvent(FIELD, value, key=key))
+
+
+class StructuredParser:
+    """Push parser turning streamed chunks into StructuredEvents.
+
+    Usage:
+        parser = StructuredParser()
+        async for chunk in agent.stream(prompt):
+            for event in parser.feed(chunk):
+                handle(event)
+        for event in parser.close():
+            handle(event)
+    """
+
+    def __init__(self):
+        self._events: List[StructuredEvent] = []
+        self._json = _JsonScanner(self._events)
+        self._fence = 0  # backticks in the opening fence while inside a code block
+        self._language: Optional[str] = None
+        self._code: List[str] = []
+        self._new_line()
+
+    def _new_line(self) -> None:
+        # The current line is buffered only while it could still be a fence
+        self._line: List[str] = []
+        self._maybe_fence = True
+        self._ticks = 0
+        self._tail = False
+
+    def feed(self, chunk: str) -> List[StructuredEvent]:
+        """Consume a chunk and return the events it completed."""
+        for c in chunk:
+            if not self._fence or self._language == "json":
+                self._json.feed(c)
+            if c == "\n":
+                self._end_line()
+            elif self._maybe_fence:
+                self._line.append(c)
+                self._track_fence(c)
+            elif self._fence:
+                self._code.append(c)
+        events = self._events[:]
+        self._events.clear()
+        return events
+
+    def _track_fence(self, c: str) -> None:
+        if c == "`" and not self._tail:
+            self._ticks += 1
+            return
+        if not self._ticks and c.isspace():
+            return  # indentation before a fence
+        self._tail = True
+        # An opening fence may carry an info string; a closing one may not
+        if self._ticks < 3 or (self._fence and not c.isspace()):
+            self._maybe_fence = False
+            if self._fence:
+                self._code.extend(self._line)
+            self._line = []
+
+    def _end_line(self) -> None:
+        if self._maybe_fence and self._ticks >= 3:
+            if not self._fence:
+                info = "".join(self._line).strip()[self._ticks:].strip()
+                self._fence, self._language, self._code = self._ticks, info.lower() or None, []
+                self._new_line()
+                return
+            if self._ticks >= self._fence:
+                self._events.append(StructuredEvent(CODE, "".join(self._code), language=self._language))
+                self._fence, self._language = 0, None
+                if self._json.depth:
+                    self._json._reset()  # unterminated JSON inside the fence
+                self._new_line()
+                return
+        if self._fence:
+            self._code.extend(self._line)
+            self._code.append("\n")
+        self._new_line()
+
+    def close(self) -> List[StructuredEvent]:
+        """Flush at end of stream; an unterminated fence still yields its code."""
+        events = self.feed("\n") if self._line or not self._maybe_fence else []
+        if self._fence:
+            events.append(StructuredEvent(CODE, "".join(self._code), language=self._language))
+            self._fence, self._language = 0, None
+        return events
+
+
+async def parse_stream(chunks: AsyncIterator[str]) -> AsyncIterator[StructuredEvent]:
+    """Yield structured events from a chunk stream as soon as each one closes."""
+    parser = StructuredParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
+
+
+EventHandler = Callable[[StructuredEvent], Union[None, Awaitable[None]]]
+
+
+class StructuredSink(StreamSink):
+    """Pipeline sink that parses the stream and hands each event to a handler.
+
+    Usage:
+        sink = StructuredSink(on_event=lambda e: print(e.kind, e.value))
+        await StreamPipeline([TerminalSink(), sink]).run_agent(agent, prompt)
+    """
+
+    name = "structured"
+
+    def __init__(self, on_event: Optional[EventHandler] = None):
+        self.on_event = on_event
+        self.events: List[StructuredEvent] = []
+        self._parser = StructuredParser()
+
+    async def _emit(self, events: List[StructuredEvent]) -> None:
+        for event in events:
+            self.events.append(event)
+            if self.on_event is not None:
+                result = self.on_event(event)
+                if result is not None:
+                    await result
+
+    async def write(self, chunk: str) -> None:
+        await self._emit(self._parser.feed(chunk))
+
+    async def close(self) -> None:
+        await self._emit(self._parser.close())
@@ -0,0 +1,119 @@
+"""Cached token accounting for agent messages.
+
+Counts are computed once per message and cached on the AgentMessage, so a
+conversation is never re-tokenized turn after turn. Uses tiktoken when
+the encoding can be loaded and falls back to a character estimate
+otherwise (e.g. offline without a cached encoding).
+"""
+
+import os
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from .base import AgentMessage
+
+DEFAULT_ENCODING = "cl100k_base"
+ESTIMATE = "estimate"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenCounter:
+    """Token counter with per-message caching and batch tokenization."""
+
+    def __init__(
+        self,
+        encoding_name: str = DEFAULT_ENCODING,
+        encode: Optional[Callable[[str], Sequence[int]]] = None,
+    ):
+        """Initialize counter.
+
+        Args:
+            encoding_name: tiktoken encoding, or "estimate" for the character heuristic
+            encode: Custom tokenizer; overrides tiktoken
+        """
+        self.encoding_name = encoding_name
+        self._encode = encode
+        self._encoding = None
+        self._loaded = encode is not None or encoding_name == ESTIMATE
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception:
+            self._encoding = None
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real tokenizer rather than the estimate."""
+        if not self._loaded:
+            self._load()
+        return self._encode is not None or self._encoding is not None
+
+    def count(self, text: str) -> int:
+        """Count tokens in a string."""
+        if not self._loaded:
+            self._load()
+        if self._encode is not None:
+            return len(self._encode(text))
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+    __call__ = count
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens for many strings at once (parallel in tiktoken)."""
+        if not self._loaded:
+            self._load()
+        if self._encoding is not None and self._encode is None:
+            return [len(ids) for ids in self._encoding.encode_batch(list(texts), disallowed_special=())]
+        return [self.count(text) for text in texts]
+
+    def count_message(self, message) -> int:
+        """Count a message's content, reusing the count cached on it."""
+        cached = getattr(message, "_token_count", None)
+        if cached is not None and cached[0] == self.encoding_name and cached[1] is message.content:
+            return cached[2]
+        count = self.count(message.content)
+        self._store(message, count)
+        return count
+
+    def count_messages(self, messages: Iterable) -> List[int]:
+        """Count many messages, batch-tokenizing only those without a cached count."""
+        messages = list(messages)
+        counts: List[Optional[int]] = []
+        missing = []
+        for i, message in enumerate(messages):
+            cached = getattr(message, "_token_count", None)
+            if cached is not None and cached[0] == self.encoding_name and cached[1] is message.content:
+                counts.append(cached[2])
+            else:
+                counts.append(None)
+                missing.append(i)
+        if missing:
+            fresh = self.count_batch([messages[i].content for i in missing])
+            for i, count in zip(missing, fresh):
+                counts[i] = count
+                self._store(messages[i], count)
+        return counts
+
+    def _store(self, message, count: int) -> None:
+        if isinstance(message, AgentMessage):
+            message._token_count = (self.encoding_name, message.content, count)
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the shared counter (encoding from ``TERMINAL221B_TOKENIZER``)."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter(os.environ.get("TERMINAL221B_TOKENIZER", DEFAULT_ENCODING))
+    return _default_counter
@@ -0,0 +1,234 @@
+"""Streaming batch execution for `terminal221b run --batch`.
+
+Prompts are read lazily from JSONL, executed with bounded concurrency and
+written out as they finish, so memory stays constant regardless of input
+size. A checkpoint (a completed-prefix watermark plus the few indices
+done beyond it) lets an interrupted batch resume without redoing work,
+and license runs are reserved in blocks rather than per line.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Set, TextIO, Union
+
+from src.agents.base import AgentResult, BaseAgent
+
+
+class BatchProgress:
+    """Tracks which input indices are finished.
+
+    Everything below ``watermark`` is done; ``done`` holds finished indices
+    at or above it. ``window`` caps how far past the watermark work may
+    run, which bounds ``done`` (and the checkpoint) no matter the input size.
+    ``offset`` is the size of the results file when progress was saved, so a
+    resumed run can drop results written after the last checkpoint.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, window: int = 1024):
+        self.path = Path(path) if path else None
+        self.window = window
+        self.watermark = 0
+        self.done: Set[int] = set()
+        self.offset: Optional[int] = None
+        if self.path is not None and self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.watermark = data["watermark"]
+            self.done = set(data["done"])
+            self.offset = data.get("offset")
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    def mark(self, index: int) -> None:
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self) -> None:
+        """Atomically persist progress (no-op without a path)."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"watermark": self.watermark, "done": sorted(self.done), "offset": self.offset}, fh)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of a batch run."""
+
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    tokens_used: int = 0
+    limited: bool = False  # stopped early because the license allowance ran out
+
+
+def parse_line(line: str) -> Dict[str, Any]:
+    """Parse one input line: a JSON object with "prompt", or a JSON string."""
+    record = json.loads(line)
+    if isinstance(record, str):
+        return {"prompt": record}
+    if not isinstance(record, dict) or not isinstance(record.get("prompt"), str):
+        raise ValueError('each line must be a JSON string or an object with a "prompt" field')
+    return record
+
+
+def _output_record(index: int, record: Dict[str, Any], result: AgentResult) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"index": index}
+    if "id" in record:
+        out["id"] = record["id"]
+    out.update(success=result.success, output=result.output, tokens_used=result.tokens_used)
+    if result.error:
+        out["error"] = result.error
+    return out
+
+
+class BatchRunner:
+    """Runs a stream of prompts through pooled agents.
+
+    Usage:
+        runner = BatchRunner(lambda: AnalystAgent(ctx), concurrency=16,
+                             reserve_runs=manager.reserve_runs)
+        summary = await runner.run(open("prompts.jsonl"), sys.stdout)
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], BaseAgent],
+        concurrency: int = 8,
+        progress: Optional[BatchProgress] = None,
+        reserve_runs: Optional[Callable[[int], int]] = None,
+        release_runs: Optional[Callable[[int], None]] = None,
+        charge_block: int = 100,
+        postprocess: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        executor: Optional[Executor] = None,
+        checkpoint_every: int = 100,
+    ):
+        """Initialize runner.
+
+        Args:
+            agent_factory: Creates one agent per worker
+            concurrency: Prompts in flight at once
+            progress: Completion tracker, optionally backed by a checkpoint file
+            reserve_runs: Reserves up to N license runs, returning how many were granted
+            release_runs: Returns unused reserved runs at the end
+            charge_block: Runs reserved per license call
+            postprocess: Transforms each output record (runs in ``executor`` if given)
+            executor: Pool for CPU-bound post-processing (e.g. ProcessPoolExecutor)
+            checkpoint_every: Completions between checkpoint saves
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.progress = progress or BatchProgress()
+        self.reserve_runs = reserve_runs
+        self.release_runs = release_runs
+        self.charge_block = charge_block
+        self.postprocess = postprocess
+        self.executor = executor
+        self.checkpoint_every = checkpoint_every
+        self._allowance = 0
+
+    def _take_run(self) -> bool:
+        if self.reserve_runs is None:
+            return True
+        if self._allowance == 0:
+            self._allowance = self.reserve_runs(self.charge_block)
+        if self._allowance == 0:
+            return False
+        self._allowance -= 1
+        return True
+
+    async def run(self, lines: Iterable[str], output: TextIO) -> BatchSummary:
+        """Process every pending line and stream results to ``output``."""
+        summary = BatchSummary()
+        queue: asyncio.Queue = asyncio.Queue(self.concurrency * 2)
+        advanced = asyncio.Event()
+        since_save = 0
+
+        def save() -> None:
+            output.flush()
+            try:
+                self.progress.offset = output.tell()
+            except (OSError, ValueError):
+                self.progress.offset = None  # stdout or a pipe
+            self.progress.save()
+
+        async def produce() -> None:
+            for index, line in enumerate(lines):
+                if not line.strip():
+                    self.progress.mark(index)
+                    continue
+                if self.progress.is_done(index):
+                    summary.skipped += 1
+                    continue
+                while index - self.progress.watermark >= self.progress.window:
+                    advanced.clear()
+                    await advanced.wait()
+                if not self._take_run():
+                    summary.limited = True
+                    break
+                await queue.put((index, line))
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def work() -> None:
+            nonlocal since_save
+            agent = self.agent_factory()
+            loop = asyncio.get_running_loop()
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, line = item
+                try:
+                    record = parse_line(line)
+                    agent.clear_history()
+                    result = await agent.execute(record["prompt"])
+                except Exception as e:
+                    record = {}
+                    result = AgentResult(success=False, output="", error=str(e))
+                out = _output_record(index, record, result)
+                if self.postprocess is not None:
+                    if self.executor is not None:
+                        out = await loop.run_in_executor(self.executor, self.postprocess, out)
+                    else:
+                        out = self.postprocess(out)
+                # No awaits from here on: every result in the file is marked done
+                output.write(json.dumps(out, ensure_ascii=False) + "\n")
+                self.progress.mark(index)
+                advanced.set()
+                summary.processed += 1
+                summary.tokens_used += result.tokens_used
+                if result.success:
+                    summary.succeeded += 1
+                else:
+                    summary.failed += 1
+                since_save += 1
+                if since_save >= self.checkpoint_every:
+                    save()
+                    since_save = 0
+
+        tasks = [asyncio.ensure_future(produce())]
+        tasks += [asyncio.ensure_future(work()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            save()
+            if self._allowance and self.release_runs is not None:
+                self.release_runs(self._allowance)
+                self._allowance = 0
+        return summary
@@ -0,0 +1,5 @@
+"""Terminal221b Solana integration."""
+
+from .rpc import RPCError, RPCStats, SolanaRPC, get_rpc
+
+__all__ = ["RPCError", "RPCStats", "SolanaRPC", "get_rpc"]
@@ -0,0 +1,318 @@
+"""Batched, cached Solana JSON-RPC client.
+
+Wallet and treasury operations fan out into many small RPC calls
+(balances, account lookups, transaction submissions). Sending them one at
+a time costs a round-trip each. SolanaRPC keeps the round-trip count flat:
+
+- Connections come from a pooled ``ProviderTransport``, so keep-alive,
+  TLS reuse and retry with backoff match the LLM providers.
+- Concurrent calls are collected by a ``MicroBatcher`` and sent as one
+  JSON-RPC batch (a JSON array of requests) per flush.
+- Read-only lookups (``getBalance``, ``getAccountInfo``, ...) are cached
+  for a short TTL. Identical lookups already in flight share one request.
+- ``send_transactions`` pipelines submissions: every transaction is sent
+  without waiting for earlier ones to confirm, up to ``max_inflight`` at
+  once. ``confirm_transactions`` then polls their statuses in bulk.
+
+A balance check across 500 wallets is therefore a handful of HTTP
+requests instead of 500.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from src.agents.batching import MicroBatcher
+from src.agents.cache import MemoryCache
+from src.providers.transport import ProviderTransport, RetryPolicy, get_transport
+from utils import metrics
+
+DEFAULT_RPC_URL = "https://api.mainnet-beta.solana.com"
+
+# Read-only methods whose results may be served from the TTL cache
+CACHEABLE: FrozenSet[str] = frozenset({
+    "getAccountInfo",
+    "getBalance",
+    "getLatestBlockhash",
+    "getMultipleAccounts",
+    "getTokenAccountBalance",
+    "getTokenAccountsByOwner",
+})
+
+# Commitment levels, weakest first
+COMMITMENT_LEVELS: Dict[str, int] = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+# getSignatureStatuses accepts at most this many signatures per call
+MAX_STATUS_BATCH = 256
+
+
+class RPCError(RuntimeError):
+    """JSON-RPC error returned by the node for one call."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+@dataclass
+class RPCStats:
+    """Calls made versus HTTP round-trips actually paid."""
+
+    calls: int = 0
+    round_trips: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0  # calls that joined an identical in-flight lookup
+    sent_transactions: int = 0
+
+    @property
+    def calls_per_round_trip(self) -> float:
+        sent = self.calls - self.cache_hits - self.coalesced
+        return sent / self.round_trips if self.round_trips else 0.0
+
+
+def _cache_key(method: str, params: Sequence[Any]) -> str:
+    return method + json.dumps(list(params), sort_keys=True, separators=(",", ":"))
+
+
+class SolanaRPC:
+    """JSON-RPC client for one Solana endpoint.
+
+    Usage:
+        rpc = SolanaRPC(get_transport("solana", url))
+        balances = await rpc.get_balances(wallets)
+        signatures = await rpc.send_transactions(signed_txs)
+        statuses = await rpc.confirm_transactions(signatures)
+    """
+
+    def __init__(
+        self,
+        transport: ProviderTransport,
+        commitment: str = "confirmed",
+        cache_ttl: float = 2.0,
+        max_batch_size: int = 64,
+        max_delay: float = 0.002,
+        max_inflight: int = 32,
+    ):
+        """Initialize client.
+
+        Args:
+            transport: Pooled HTTP transport for the RPC endpoint
+            commitment: Commitment level added to reads and status polls
+            cache_ttl: Seconds a read-only result stays cached (0 disables)
+            max_batch_size: Calls per JSON-RPC batch
+            max_delay: Longest a call waits for others to share its batch
+            max_inflight: Transactions submitted concurrently by ``send_transactions``
+        """
+        self.transport = transport
+        self.commitment = commitment
+        self.cache = MemoryCache(ttl=cache_ttl) if cache_ttl > 0 else None
+        self.max_inflight = max_inflight
+        self.stats = RPCStats()
+        self.batcher: MicroBatcher[Tuple[str, List[Any]], Any] = MicroBatcher(
+            self._send_batch, max_batch_size, max_delay
+        )
+        self._pending: Dict[str, asyncio.Future] = {}  # cache key -> in-flight lookup task
+        self._ids = itertools.count(1)
+
+    async def _send_batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": id_, "method": method, "params": params}
+            for id_, (method, params) in zip(ids, calls)
+        ]
+        self.stats.round_trips += 1
+        metrics.observe("rpc_batch_size", len(calls))
+        with metrics.timer("rpc_round_trip_seconds"):
+            response = await self.transport.post("", payload)
+        replies = response.json()
+        if isinstance(replies, dict):  # some nodes answer a whole failed batch with one error
+            replies = [replies]
+        by_id = {reply.get("id"): reply for reply in replies}
+        results: List[Any] = []
+        for id_ in ids:
+            reply = by_id.get(id_)
+            if reply is None:
+                error = (replies[0].get("error") if len(replies) == 1 else None) or {}
+                results.append(RPCError(error.get("code", -32603), error.get("message", "No reply for request")))
+            elif "error" in reply:
+                error = reply["error"]
+                results.append(RPCError(error.get("code", 0), error.get("message", ""), error.get("data")))
+            else:
+                results.append(reply.get("result"))
+        return results
+
+    async def _call(self, method: str, params: List[Any]) -> Any:
+        result = await self.batcher.submit((method, params))
+        if isinstance(result, RPCError):
+            raise result
+        return result
+
+    async def call(self, method: str, params: Optional[Sequence[Any]] = None) -> Any:
+        """Make one JSON-RPC call, batched with any concurrent calls.
+
+        Raises:
+            RPCError: If the node returned an error for this call
+            httpx.HTTPError: If the batch could not be delivered
+        """
+        params = list(params or [])
+        self.stats.calls += 1
+        if method not in CACHEABLE or self.cache is None:
+            return await self._call(method, params)
+
+        key = _cache_key(method, params)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.stats.cache_hits += 1
+            return entry["result"]
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+        else:
+            # The shared lookup runs as its own task, so cancelling whichever
+            # caller started it does not cancel the callers that joined it.
+            pending = self._pending[key] = asyncio.ensure_future(self._lookup(key, method, params))
+            pending.add_done_callback(_retrieve)
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, key: str, method: str, params: List[Any]) -> Any:
+        try:
+            result = await self._call(method, params)
+            self.cache.put(key, {"result": result})
+            return result
+        finally:
+            del self._pending[key]
+
+    def invalidate(self) -> None:
+        """Drop cached reads (done automatically after sending transactions)."""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _config(self, **extra: Any) -> Dict[str, Any]:
+        config = {"commitment": self.commitment}
+        config.update({key: value for key, value in extra.items() if value is not None})
+        return config
+
+    async def get_balance(self, pubkey: str) -> int:
+        """Balance of an account in lamports."""
+        result = await self.call("getBalance", [pubkey, self._config()])
+        return result["value"]
+
+    async def get_balances(self, pubkeys: Sequence[str]) -> Dict[str, int]:
+        """Balances of many accounts, in as few round-trips as the batch size allows."""
+        balances = await asyncio.gather(*(self.get_balance(pubkey) for pubkey in pubkeys))
+        return dict(zip(pubkeys, balances))
+
+    async def get_account_info(self, pubkey: str, encoding: str = "base64") -> Optional[Dict[str, Any]]:
+        """Account data and owner, or None if the account does not exist."""
+        result = await self.call("getAccountInfo", [pubkey, self._config(encoding=encoding)])
+        return result["value"]
+
+    async def get_latest_blockhash(self) -> str:
+        result = await self.call("getLatestBlockhash", [self._config()])
+        return result["value"]["blockhash"]
+
+    async def send_transaction(self, transaction: str, skip_preflight: bool = False) -> str:
+        """Submit a signed, base64-encoded transaction and return its signature.
+
+        Submission is idempotent on the cluster (a transaction is identified
+        by its signature), so transport retries cannot double-spend.
+        """
+        self.stats.calls += 1
+        self.stats.sent_transactions += 1
+        config = {"encoding": "base64", "skipPreflight": skip_preflight, "preflightCommitment": self.commitment}
+        try:
+            return await self._call("sendTransaction", [transaction, config])
+        finally:
+            self.invalidate()
+
+    async def send_transactions(self, transactions: Sequence[str], skip_preflight: bool = False) -> List[str]:
+        """Pipeline many submissions without waiting on confirmations in between.
+
+        Returns signatures in input order. Fails with the first error, after
+        every other submission has finished.
+        """
+        semaphore = asyncio.Semaphore(self.max_inflight)
+
+        async def send(transaction: str) -> str:
+            async with semaphore:
+                return await self.send_transaction(transaction, skip_preflight)
+
+        results = await asyncio.gather(*(send(tx) for tx in transactions), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)
+
+    async def get_signature_statuses(self, signatures: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Statuses for any number of signatures (None for unknown ones)."""
+        chunks = [signatures[i:i + MAX_STATUS_BATCH] for i in range(0, len(signatures), MAX_STATUS_BATCH)]
+        replies = await asyncio.gather(*(self.call("getSignatureStatuses", [list(chunk)]) for chunk in chunks))
+        return [status for reply in replies for status in reply["value"]]
+
+    async def confirm_transactions(
+        self,
+        signatures: Sequence[str],
+        timeout: float = 60.0,
+        poll_interval: float = 0.5,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Poll until every signature reaches the commitment level or ``timeout`` passes.
+
+        Returns:
+            Latest status per signature; None if the cluster never saw it.
+            A status with a non-null ``err`` landed but failed.
+        """
+        wanted = COMMITMENT_LEVELS.get(self.commitment, 1)
+        statuses: Dict[str, Optional[Dict[str, Any]]] = {signature: None for signature in signatures}
+        waiting = list(statuses)
+        deadline = time.monotonic() + timeout
+        while waiting:
+            for signature, status in zip(waiting, await self.get_signature_statuses(waiting)):
+                statuses[signature] = status
+            waiting = [
+                signature for signature in waiting
+                if not _reached(statuses[signature], wanted)
+            ]
+            if not waiting or time.monotonic() + poll_interval > deadline:
+                break
+            await asyncio.sleep(poll_interval)
+        return statuses
+
+    async def aclose(self) -> None:
+        """Send pending calls and close pooled connections."""
+        await self.batcher.flush()
+        await self.transport.aclose()
+
+
+def _retrieve(task: asyncio.Future) -> None:
+    # Every caller of a shared lookup may have been cancelled; don't log its error as unretrieved
+    if not task.cancelled():
+        task.exception()
+
+
+def _reached(status: Optional[Dict[str, Any]], wanted: int) -> bool:
+    if status is None:
+        return False
+    if status.get("err") is not None:
+        return True  # landed and failed; waiting longer will not change it
+    return COMMITMENT_LEVELS.get(status.get("confirmationStatus"), -1) >= wanted
+
+
+def get_rpc(url: Optional[str] = None, **kwargs) -> SolanaRPC:
+    """SolanaRPC on the shared transport for ``url``.
+
+    Each endpoint gets its own transport ("solana:<url>"), so a devnet
+    client never reuses the pool opened for mainnet.
+
+    Args:
+        url: RPC endpoint (default: TERMINAL221B_SOLANA_RPC, else mainnet-beta)
+        **kwargs: SolanaRPC options
+    """
+    url = url or os.environ.get("TERMINAL221B_SOLANA_RPC", DEFAULT_RPC_URL)
+    transport = get_transport(f"solana:{url}", url, retry=RetryPolicy(retry_statuses=(429, 502, 503, 504)))
+    return SolanaRPC(transport, **kwargs)
@@ -0,0 +1,82 @@
+"""Terminal221b CLI subcommands.
+
+Every subcommand lives in its own module and is only imported when it is
+invoked (or when ``--help`` needs its short description). Shared helpers
+here are lazy too, so ``terminal221b --version`` never pays for Rich or
+license initialization.
+"""
+
+import importlib
+from typing import Dict, List, Optional
+
+import click
+
+# Command name -> "module:attribute". Modules are imported on first use.
+COMMANDS: Dict[str, str] = {
+    "run": "src.commands.run:run",
+    "tui": "src.commands.tui:tui",
+    "agents": "src.commands.agents:agents",
+    "wallet": "src.commands.wallet:wallet",
+    "stats": "src.commands.stats:stats",
+    "serve": "src.commands.serve:serve",
+}
+
+_console = None
+
+
+def get_console():
+    """Get the shared Rich console, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def get_license_manager(ctx: click.Context):
+    """Get the license manager for this invocation, creating it on first use.
+
+    The CLI always counts runs in the persistent usage ledger, so the daily
+    limit holds across invocations and concurrent processes.
+
+    Args:
+        ctx: Click context; the manager is cached on ``ctx.obj``
+
+    Returns:
+        The invocation's LicenseManager
+    """
+    obj = ctx.ensure_object(dict)
+    manager = obj.get("license_manager")
+    if manager is None:
+        from utils import metrics
+        from utils.ledger import UsageLedger, default_ledger_path
+        from utils.license import LicenseManager
+
+        manager = LicenseManager(ledger=UsageLedger(default_ledger_path()))
+        metrics.set_default_labels(tier=manager.tier.value)
+        obj["license_manager"] = manager
+    return manager
+
+
+class LazyGroup(click.Group):
+    """Click group that resolves subcommands from import paths on demand."""
+
+    def __init__(self, *args, lazy_commands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            self.add_command(self._load(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, attr = self.lazy_commands[cmd_name].split(":")
+        command = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"Lazy command '{cmd_name}' did not resolve to a click command")
+        return command
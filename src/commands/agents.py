@@ -0,0 +1,19 @@
+"""`terminal221b agents` - list available agents."""
+
+import click
+
+from src.commands import get_console
+
+
+@click.command()
+def agents():
+    """List available agents."""
+    from src.agents.registry import get_registry
+
+    console = get_console()
+    console.print("\n[bold]Available Agents:[/bold]\n")
+
+    registry = get_registry()
+    for spec in registry.specs():
+        tier = spec.min_tier.value.title() + ("+" if spec.min_tier.value != "enterprise" else "")
+        console.print(f"  [cyan]{spec.name:12}[/cyan] {registry.describe(spec.name)} [dim]({tier})[/dim]")
@@ -0,0 +1,237 @@
+"""`terminal221b run` - start an agent session."""
+
+import importlib
+import os
+import sys
+from typing import Callable, Optional
+
+import click
+
+from src.commands import get_console, get_license_manager
+
+
+def resolve_agent(name: str) -> Optional[Callable]:
+    """Return the registered agent class for ``name``, or None if it is not installed."""
+    from src.agents.registry import get_registry
+
+    try:
+        return get_registry().load(name)
+    except ImportError:
+        return None
+
+
+def _agent_names():
+    from src.agents.registry import get_registry
+
+    return get_registry().names()
+
+
+class AgentName(click.ParamType):
+    """Registered agent name.
+
+    Names are checked against the registry in the command body rather than
+    at parse time: loading the registry imports the agent stack, which the
+    daemon client path avoids (the daemon validates names itself).
+    """
+
+    name = "agent"
+
+    def get_metavar(self, param, ctx=None):
+        return "[" + "|".join(_agent_names()) + "]"
+
+
+# AgentContext.max_tokens default, repeated here so the daemon client path
+# never imports the agent stack
+DEFAULT_MAX_TOKENS = 1000
+
+
+def run_remote(client, agent: str, prompt: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> int:
+    """Stream one run through the daemon; return the exit code.
+
+    ``max_tokens`` is sent as the run's token estimate for admission.
+    """
+    from src.daemon import DaemonError
+
+    with client:
+        try:
+            for token in client.stream(agent, prompt, max_tokens=max_tokens):
+                click.echo(token, nl=False)
+        except DaemonError as e:
+            click.echo(f"Error: {e}", err=True)
+            return 1
+    click.echo()
+    result = client.last_result or {}
+    if not result.get("success", False):
+        click.echo(f"Error: {result.get('error', 'run failed')}", err=True)
+        return 1
+    return 0
+
+
+def run_local(agent_cls, context, prompt: str, limiter=None) -> int:
+    """Stream one run in-process; return the exit code.
+
+    With a ``TierRateLimiter``, the run waits for a run slot and every
+    streamed token is charged to the tier's per-run token budget.
+    """
+    import asyncio
+
+    async def stream():
+        if limiter is None:
+            async for token in agent_cls(context).stream(prompt):
+                click.echo(token, nl=False)
+            return
+        async with limiter.run() as budget:
+            async for token in agent_cls(context).stream(prompt):
+                await budget.consume(1)
+                click.echo(token, nl=False)
+
+    try:
+        asyncio.run(stream())
+    except Exception as e:
+        click.echo(f"\nError: {e}", err=True)
+        return 1
+    click.echo()
+    return 0
+
+
+def _load_callable(spec: str) -> Callable:
+    """Import a ``module:function`` reference."""
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise click.BadParameter("expected module:function", param_hint="--postprocess")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _open_output(path: str, offset: Optional[int]):
+    """Open the results file, truncating to the checkpointed size when resuming."""
+    if path == "-":
+        return sys.stdout
+    if offset is not None and os.path.exists(path):
+        fh = open(path, "r+", encoding="utf-8")
+        fh.truncate(offset)
+        fh.seek(offset)
+        return fh
+    return open(path, "w", encoding="utf-8")
+
+
+def run_batch(manager, agent_cls, source: str, output: str, concurrency: int,
+              checkpoint: Optional[str], workers: int, postprocess: Optional[str],
+              max_tokens: int = DEFAULT_MAX_TOKENS):
+    """Run every prompt in ``source`` and stream results to ``output``."""
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    from src.agents.registry import get_registry
+    from src.batch import BatchProgress, BatchRunner
+
+    if checkpoint is None and output != "-":
+        checkpoint = output + ".checkpoint"
+    progress = BatchProgress(checkpoint)
+    post = _load_callable(postprocess) if postprocess else None
+    executor = ProcessPoolExecutor(workers) if post and workers > 0 else None
+
+    lines = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    out = _open_output(output, progress.offset)
+    runner = BatchRunner(
+        lambda: agent_cls(get_registry().context_for(manager.tier, max_tokens=max_tokens)),
+        concurrency=concurrency,
+        progress=progress,
+        reserve_runs=manager.reserve_runs,
+        release_runs=manager.release_runs,
+        postprocess=post,
+        executor=executor,
+    )
+    try:
+        return asyncio.run(runner.run(lines, out))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if lines is not sys.stdin:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+@click.command()
+@click.option("--agent", "-a", type=AgentName(),
+              default="analyst", help="Agent to run")
+@click.option("--prompt", "-p", type=str, help="Initial prompt for the agent")
+@click.option("--batch", "batch", type=str, default=None,
+              help="Run every prompt in a JSONL file ('-' for stdin)")
+@click.option("--output", "-o", type=str, default="-", show_default=True,
+              help="Where batch results are written as JSONL")
+@click.option("--concurrency", "-c", type=click.IntRange(min=1), default=8, show_default=True,
+              help="Batch prompts in flight at once")
+@click.option("--checkpoint", type=str, default=None,
+              help="Batch progress file [default: <output>.checkpoint]")
+@click.option("--postprocess", type=str, default=None,
+              help="module:function applied to each batch result")
+@click.option("--workers", type=click.IntRange(min=0), default=0, show_default=True,
+              help="Processes for --postprocess (0 runs it inline)")
+@click.option("--max-tokens", type=click.IntRange(min=1), default=DEFAULT_MAX_TOKENS, show_default=True,
+              help="Completion tokens per run (also the daemon's admission estimate)")
+@click.option("--no-daemon", is_flag=True, help="Run in this process even if `terminal221b serve` is up")
+@click.pass_context
+def run(ctx, agent, prompt, batch, output, concurrency, checkpoint, postprocess, workers, max_tokens, no_daemon):
+    """Start an agent session."""
+    # A running daemon already holds warm agents and license state
+    if prompt is not None and batch is None and not no_daemon:
+        from src.daemon import DaemonClient
+
+        client = DaemonClient.connect()
+        if client is not None:
+            sys.exit(run_remote(client, agent, prompt, max_tokens))
+
+    from src.agents.registry import get_registry
+    from utils.license import LicenseTier
+    from utils.ratelimit import get_rate_limiter
+
+    if agent not in get_registry().names():
+        raise click.BadParameter(f"unknown agent '{agent}'", param_hint="'--agent'")
+
+    console = get_console()
+    manager = get_license_manager(ctx)
+
+    # Batches are charged in blocks by the runner rather than here
+    if batch is None:
+        # Check if we can run
+        can_run, message = manager.can_run()
+        if not can_run:
+            console.print(f"[red]Error:[/red] {message}")
+            if manager.tier == LicenseTier.FREE:
+                console.print("[yellow]Upgrade to Pro for more runs: https://bakerstreetproject221B.store/terminal221b[/yellow]")
+            sys.exit(1)
+
+    registry = get_registry()
+
+    # Check the tier includes this agent
+    if not registry.allowed(agent, manager.tier):
+        allowed = [name for name in registry.names() if registry.allowed(name, manager.tier)]
+        console.print(f"[red]Error:[/red] {manager.tier.value.title()} tier only supports the {', '.join(allowed)} agent{'s' if len(allowed) != 1 else ''}.")
+        console.print("[yellow]Upgrade to Pro for all agents: https://bakerstreetproject221B.store/terminal221b[/yellow]")
+        sys.exit(1)
+
+    agent_cls = resolve_agent(agent)
+
+    if batch is not None:
+        if agent_cls is None:
+            click.echo(f"Error: {agent} agent is not available. See TODO_MVP.md", err=True)
+            sys.exit(1)
+        summary = run_batch(manager, agent_cls, batch, output, concurrency, checkpoint, workers, postprocess,
+                            max_tokens)
+        click.echo(
+            f"Batch: {summary.processed} processed ({summary.succeeded} ok, {summary.failed} failed), "
+            f"{summary.skipped} already done, {summary.tokens_used} tokens",
+            err=True,
+        )
+        if summary.limited:
+            click.echo(f"Stopped early: daily run limit reached. {manager.get_status()}", err=True)
+            sys.exit(1)
+        return
+
+    console.print(f"\n[bold green]Starting {agent} agent...[/bold green]")
+    if agent_cls is None or prompt is None:
+        console.print("[dim]Agent system not yet implemented. See TODO_MVP.md[/dim]")
+        return
+    context = registry.context_for(manager.tier, max_tokens=max_tokens)
+    sys.exit(run_local(agent_cls, context, prompt, get_rate_limiter(manager.tier)))
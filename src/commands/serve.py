@@ -0,0 +1,57 @@
+"""`terminal221b serve` - keep agents and license state warm behind a Unix socket."""
+
+from pathlib import Path
+
+import click
+
+from src.commands import get_console, get_license_manager
+
+
+@click.command()
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Socket path [default: ~/.terminal221b/daemon.sock]")
+@click.option("--status", is_flag=True, help="Show the running daemon's status")
+@click.option("--stop", is_flag=True, help="Stop the running daemon")
+@click.pass_context
+def serve(ctx, socket_path, status, stop):
+    """Run the agent daemon; `run` uses it automatically while it is up."""
+    import asyncio
+    import signal
+
+    from src.daemon import DaemonClient, default_socket_path
+
+    console = get_console()
+    path = socket_path or default_socket_path()
+
+    if status or stop:
+        client = DaemonClient.connect(path, timeout=5.0)
+        if client is None:
+            console.print(f"[yellow]No daemon listening on {path}[/yellow]")
+            raise SystemExit(1)
+        with client:
+            if stop:
+                client.shutdown()
+                console.print("[green]Daemon stopped[/green]")
+                return
+            info = client.status()
+        console.print(f"Daemon pid {info['pid']} | up {info['uptime']:.0f}s | {info['requests']} requests")
+        console.print(f"{info['running']} running, {info['queued']} queued")
+        console.print(info["license"])
+        return
+
+    from src.daemon.server import AgentServer
+
+    async def main():
+        server = AgentServer(path, manager=get_license_manager(ctx))
+        await server.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: loop.create_task(server.close()))
+        console.print(f"[green]Serving on {path}[/green] (stop with Ctrl+C or `terminal221b serve --stop`)")
+        await server.wait_closed()
+
+    try:
+        asyncio.run(main())
+    except RuntimeError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise SystemExit(1) from e
@@ -0,0 +1,58 @@
+"""`terminal221b stats` - show recorded performance metrics."""
+
+from pathlib import Path
+
+import click
+
+from src.commands import get_console
+
+
+def _format(name: str, value: float) -> str:
+    if name.endswith("_seconds"):
+        return f"{value * 1000:.2f}ms"
+    return f"{value:,.1f}"
+
+
+@click.command()
+@click.option("--prometheus", type=click.Path(dir_okay=False, path_type=Path),
+              help="Write an OpenMetrics text file (Prometheus textfile collector)")
+@click.option("--reset", is_flag=True, help="Clear recorded metrics")
+def stats(prometheus, reset):
+    """Show performance metrics (record with TERMINAL221B_METRICS=1)."""
+    from rich.table import Table
+
+    from utils import metrics
+
+    console = get_console()
+    path = metrics.snapshot_path()
+
+    if reset:
+        path.unlink(missing_ok=True)
+        console.print("[green]Metrics cleared.[/green]")
+        return
+
+    recorded = metrics.load_snapshot(path)
+    if prometheus:
+        metrics.write_prometheus(prometheus, recorded)
+        console.print(f"[green]Wrote OpenMetrics export to {prometheus}[/green]")
+        return
+
+    if not recorded.histograms:
+        console.print("[dim]No metrics recorded. Run commands with TERMINAL221B_METRICS=1 to collect them.[/dim]")
+        return
+
+    table = Table(title="Terminal221b metrics")
+    for column in ("Metric", "Labels", "Count", "Mean", "p50", "p95", "p99", "Max"):
+        table.add_column(column, justify="left" if column in ("Metric", "Labels") else "right")
+    for (name, labels), hist in sorted(recorded.histograms.items()):
+        table.add_row(
+            name,
+            " ".join(f"{k}={v}" for k, v in labels),
+            str(hist.count),
+            _format(name, hist.mean),
+            _format(name, hist.percentile(50)),
+            _format(name, hist.percentile(95)),
+            _format(name, hist.percentile(99)),
+            _format(name, hist.max),
+        )
+    console.print(table)
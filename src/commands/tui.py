@@ -0,0 +1,54 @@
+"""`terminal221b tui` - launch the terminal UI."""
+
+import sys
+
+import click
+
+from src.commands import get_console, get_license_manager
+
+
+@click.command()
+@click.option("--agent", "-a", "agent_names", multiple=True, default=("analyst",), show_default=True,
+              help="Agent pane to open (repeat for several)")
+@click.option("--prompt", "-p", type=str, help="Prompt to send on start")
+@click.option("--fps", type=click.FloatRange(min=1), default=30.0, show_default=True,
+              help="Maximum transcript repaints per second")
+@click.option("--max-lines", type=click.IntRange(min=100), default=None,
+              help="Scrollback kept per pane [default: unlimited]")
+@click.option("--demo", is_flag=True, help="Use offline FakeAgent panes instead of real agents")
+@click.pass_context
+def tui(ctx, agent_names, prompt, fps, max_lines, demo):
+    """Launch the terminal UI."""
+    from src.agents.registry import get_registry
+
+    console = get_console()
+    manager = get_license_manager(ctx)
+
+    limits = manager.get_limits()
+    if limits.max_agents != -1 and len(agent_names) > limits.max_agents:
+        console.print(f"[red]Error:[/red] {manager.tier.value.title()} tier allows {limits.max_agents} agent pane(s).")
+        sys.exit(1)
+
+    registry = get_registry()
+    agents = {}
+    for name in agent_names:
+        if demo:
+            from src.agents.fake import FakeAgent
+
+            agents[name] = FakeAgent(latency=0.2, tokens_per_second=200, output_tokens=400)
+            continue
+        if name not in registry.names() or not registry.allowed(name, manager.tier):
+            console.print(f"[red]Error:[/red] Agent '{name}' is not available in the {manager.tier.value} tier.")
+            sys.exit(1)
+        try:
+            agents[name] = registry.create(name, manager.tier)
+        except ImportError:
+            console.print("\n[bold green]Launching Terminal221b TUI...[/bold green]")
+            console.print(f"[dim]The {name} agent is not implemented yet. See TODO_MVP.md (try --demo)[/dim]")
+            return
+
+    from src.tui import Terminal221bApp
+
+    # Each prompt is charged per pane as it is sent; demo panes do no real work
+    can_run = None if demo else manager.can_run
+    Terminal221bApp(agents, fps=fps, max_lines=max_lines, prompt=prompt, can_run=can_run).run()
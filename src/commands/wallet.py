@@ -0,0 +1,34 @@
+"""`terminal221b wallet` - manage the Solana wallet (Pro+ tier)."""
+
+import sys
+
+import click
+
+from src.commands import get_console, get_license_manager
+
+
+@click.command()
+@click.option("--create", is_flag=True, help="Create a new Solana wallet")
+@click.option("--balance", is_flag=True, help="Check wallet balance")
+@click.pass_context
+def wallet(ctx, create, balance):
+    """Manage Solana wallet (Pro+ tier)."""
+    console = get_console()
+    manager = get_license_manager(ctx)
+    limits = manager.get_limits()
+
+    if not limits.blockchain_enabled:
+        console.print("[red]Error:[/red] Blockchain features require Pro or Enterprise tier.")
+        console.print("[yellow]Upgrade at: https://bakerstreetproject221B.store/terminal221b[/yellow]")
+        sys.exit(1)
+
+    console.print("\n[bold green]Solana Wallet Manager[/bold green]")
+    console.print("[dim]Blockchain integration not yet implemented. See TODO_MVP.md[/dim]")
+
+    # TODO: Implement Solana wallet
+    # from src.blockchain import WalletManager
+    # wallet_mgr = WalletManager()
+    # if create:
+    #     wallet_mgr.create()
+    # if balance:
+    #     wallet_mgr.show_balance()
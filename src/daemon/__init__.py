@@ -0,0 +1,12 @@
+"""Terminal221b daemon: a warm agent server on a Unix domain socket.
+
+Only the lightweight protocol and client are imported here so that
+``terminal221b run`` can talk to a running daemon without paying for
+pydantic, Rich or license initialization. Import ``src.daemon.server``
+explicitly to serve.
+"""
+
+from .client import DaemonClient, DaemonError
+from .protocol import ProtocolError, default_socket_path
+
+__all__ = ["DaemonClient", "DaemonError", "ProtocolError", "default_socket_path"]
@@ -0,0 +1,119 @@
+"""Thin blocking client for the Terminal221b daemon.
+
+Deliberately uses only the standard library so a client process starts
+in milliseconds; all agent, provider and license work happens daemon-side.
+"""
+
+import os
+import socket
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from .protocol import TERMINAL_TYPES, ProtocolError, default_socket_path, encode_frame, recv_frame
+
+
+class DaemonError(RuntimeError):
+    """The daemon answered a request with an error."""
+
+
+class DaemonClient:
+    """One connection to a running daemon.
+
+    Usage:
+        client = DaemonClient.connect()
+        if client is not None:
+            with client:
+                for token in client.stream("analyst", "Summarize..."):
+                    print(token, end="")
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def connect(cls, path: Optional[Union[str, Path]] = None, timeout: Optional[float] = None) -> Optional["DaemonClient"]:
+        """Connect to the daemon, or return None if none is listening.
+
+        Args:
+            path: Socket path (default: ``default_socket_path()``)
+            timeout: Socket timeout in seconds for every operation (None blocks)
+        """
+        path = os.fspath(path or default_socket_path())
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock)
+
+    def request(self, message: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Send a request and yield response frames up to the terminal one."""
+        self.sock.sendall(encode_frame(message))
+        while True:
+            frame = recv_frame(self.sock)
+            if frame is None:
+                raise ProtocolError("Daemon closed the connection")
+            yield frame
+            if frame.get("type") in TERMINAL_TYPES:
+                return
+
+    def call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and return its terminal frame.
+
+        Raises:
+            DaemonError: If the daemon answered with an error
+        """
+        frame: Dict[str, Any] = {}
+        for frame in self.request(message):
+            pass
+        if frame.get("type") == "error":
+            raise DaemonError(frame.get("message", "daemon error"))
+        return frame
+
+    def stream(self, agent: str, prompt: str, max_tokens: int = 0) -> Iterator[str]:
+        """Stream tokens for one run; the final result is available afterwards as ``last_result``.
+
+        Raises:
+            DaemonError: If the run was refused (unknown agent, tier or daily limit)
+        """
+        self.last_result = None
+        request = {"op": "run", "agent": agent, "prompt": prompt, "stream": True, "max_tokens": max_tokens}
+        for frame in self.request(request):
+            kind = frame.get("type")
+            if kind == "token":
+                yield frame["data"]
+            elif kind == "error":
+                raise DaemonError(frame.get("message", "daemon error"))
+            elif kind == "result":
+                self.last_result = frame
+
+    def run(self, agent: str, prompt: str, max_tokens: int = 0) -> Dict[str, Any]:
+        """Run a prompt without streaming and return the result frame.
+
+        ``max_tokens`` is the run's token estimate, used for admission.
+        """
+        return self.call({"op": "run", "agent": agent, "prompt": prompt, "stream": False, "max_tokens": max_tokens})
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call({"op": "ping"})
+
+    def status(self) -> Dict[str, Any]:
+        return self.call({"op": "status"})
+
+    def shutdown(self) -> None:
+        """Ask the daemon to stop."""
+        self.call({"op": "shutdown"})
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
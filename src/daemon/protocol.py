@@ -0,0 +1,90 @@
+"""Length-prefixed JSON framing shared by the daemon and its clients.
+
+Each frame is a 4-byte big-endian payload length followed by compact
+UTF-8 JSON. Requests carry an ``op``; responses carry a ``type``:
+
+    -> {"op": "run", "agent": "analyst", "prompt": "...", "stream": true}
+    <- {"type": "token", "data": "..."}          (zero or more)
+    <- {"type": "result", "success": true, "output": "...", "tokens_used": 12}
+
+    -> {"op": "ping"}      <- {"type": "pong", "pid": 1234}
+    -> {"op": "status"}    <- {"type": "status", ...}
+    -> {"op": "shutdown"}  <- {"type": "bye"}
+
+Any request may instead be answered with ``{"type": "error", "message": ...}``.
+"""
+
+import json
+import os
+import socket
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+HEADER = struct.Struct("!I")
+MAX_FRAME = 16 * 1024 * 1024
+
+# Response types that end a request
+TERMINAL_TYPES = frozenset({"result", "error", "pong", "status", "bye"})
+
+
+class ProtocolError(RuntimeError):
+    """Malformed or oversized frame."""
+
+
+def default_socket_path() -> Path:
+    """Daemon socket location (``TERMINAL221B_SOCKET`` or ~/.terminal221b/daemon.sock)."""
+    override = os.environ.get("TERMINAL221B_SOCKET")
+    if override:
+        return Path(override).expanduser()
+    return Path.home() / ".terminal221b" / "daemon.sock"
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize one message as a frame."""
+    payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(payload) > MAX_FRAME:
+        raise ProtocolError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME}")
+    return HEADER.pack(len(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Parse a frame payload."""
+    try:
+        message = json.loads(payload)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid frame payload: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Frame payload must be a JSON object")
+    return message
+
+
+def check_length(header: bytes) -> int:
+    """Payload length from a frame header."""
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME}")
+    return length
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            if buf:
+                raise ProtocolError("Connection closed mid-frame")
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one frame from a blocking socket; None at a clean EOF."""
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exactly(sock, check_length(header))
+    if payload is None:
+        raise ProtocolError("Connection closed mid-frame")
+    return decode_payload(payload)
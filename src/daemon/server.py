@@ -0,0 +1,246 @@
+"""Warm agent server behind ``terminal221b serve``.
+
+The daemon owns one LicenseManager (and its usage ledger), the agent
+registry's warm pools and any provider connection pools, so a client
+request costs a socket round-trip instead of a process cold start.
+
+The daemon is single-tenant: its socket is private to the user who
+started it and every request runs under that user's license tier. The
+admission scheduler therefore bounds concurrency and tokens in flight
+for that one tier; its per-tier fair queueing only comes into play when
+a scheduler is shared by several tiers (e.g. in a hosted worker). Runs
+also wait out the tier's run rate and charge streamed tokens to the
+tier's rate limiter.
+"""
+
+import asyncio
+import contextlib
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from src.agents.registry import AgentRegistry, get_registry
+from utils.license import LicenseManager
+from utils.ratelimit import TierRateLimiter, TokenBudgetExceededError, get_rate_limiter
+from utils.scheduler import AdmissionScheduler
+
+from .protocol import (
+    HEADER,
+    ProtocolError,
+    check_length,
+    decode_payload,
+    default_socket_path,
+    encode_frame,
+)
+
+
+def _socket_in_use(path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(os.fspath(path))
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+class AgentServer:
+    """Unix-socket server running agents for thin clients.
+
+    Usage:
+        server = AgentServer(manager=LicenseManager(ledger=UsageLedger(path)))
+        await server.start()
+        await server.wait_closed()
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        manager: Optional[LicenseManager] = None,
+        registry: Optional[AgentRegistry] = None,
+        max_idle: int = 8,
+        scheduler: Optional[AdmissionScheduler] = None,
+        limiter: Optional[TierRateLimiter] = None,
+    ):
+        """Initialize server.
+
+        Args:
+            path: Socket path (default: ``default_socket_path()``)
+            manager: License state shared by every request (created if omitted)
+            registry: Agents to serve (default: the process-wide registry)
+            max_idle: Warm instances kept per agent
+            scheduler: Admission control for runs (default: 4 concurrent runs); every
+                request is admitted under ``manager.tier``
+            limiter: Run and token rates (default: the shared limiter for ``manager.tier``)
+        """
+        self.path = Path(path) if path else default_socket_path()
+        self.manager = manager or LicenseManager()
+        self.registry = registry or get_registry()
+        self.max_idle = max_idle
+        self.scheduler = scheduler or AdmissionScheduler()
+        self.limiter = limiter
+        self.requests = 0
+        self.started = time.monotonic()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._closed = asyncio.Event()
+
+    async def start(self) -> None:
+        """Bind the socket and start accepting connections.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the path
+        """
+        if self.path.exists():
+            if _socket_in_use(self.path):
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            self.path.unlink()  # stale socket from a crashed daemon
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle, path=os.fspath(self.path))
+        os.chmod(self.path, 0o600)
+
+    async def wait_closed(self) -> None:
+        """Block until ``close()`` is called (e.g. by a shutdown request)."""
+        await self._closed.wait()
+
+    async def close(self) -> None:
+        """Stop accepting connections and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        if self.manager.ledger is not None:
+            self.manager.ledger.flush()
+        self._closed.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                    request = decode_payload(await reader.readexactly(check_length(header)))
+                except asyncio.IncompleteReadError:
+                    return
+                except ProtocolError as e:
+                    writer.write(encode_frame({"type": "error", "message": str(e)}))
+                    return
+                if not await self._dispatch(request, reader, writer):
+                    return
+        except (ConnectionError, BrokenPipeError):
+            pass  # client went away mid-stream
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError, BrokenPipeError):
+                await writer.wait_closed()
+
+    async def _dispatch(
+        self, request: Dict[str, Any], reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer one request; return False to close the connection."""
+        op = request.get("op")
+        if op == "run":
+            self.requests += 1
+            await self._run(request, reader, writer)
+        elif op == "ping":
+            writer.write(encode_frame({"type": "pong", "pid": os.getpid()}))
+        elif op == "status":
+            writer.write(encode_frame({
+                "type": "status",
+                "pid": os.getpid(),
+                "license": self.manager.get_status(),
+                "requests": self.requests,
+                "uptime": round(time.monotonic() - self.started, 3),
+                "running": self.scheduler.active,
+                "queued": self.scheduler.depth(),
+                "scheduler": self.scheduler.stats(),
+            }))
+        elif op == "shutdown":
+            writer.write(encode_frame({"type": "bye"}))
+            await writer.drain()
+            asyncio.get_running_loop().create_task(self.close())
+            return False
+        else:
+            writer.write(encode_frame({"type": "error", "message": f"Unknown op '{op}'"}))
+        await writer.drain()
+        return True
+
+    def _refusal(self, name: Any, prompt: Any, tokens: Any) -> Optional[str]:
+        if not isinstance(name, str) or not isinstance(prompt, str):
+            return "Requests need string 'agent' and 'prompt' fields"
+        if not isinstance(tokens, int) or tokens < 0:
+            return "'max_tokens' must be a non-negative integer"
+        try:
+            allowed = self.registry.allowed(name, self.manager.tier)
+        except KeyError as e:
+            return e.args[0]
+        if not allowed:
+            return f"Agent '{name}' is not available in the {self.manager.tier.value} tier."
+        try:
+            self.registry.load(name)
+        except ImportError as e:
+            return f"Agent '{name}' is not installed ({e})"
+        try:
+            self.scheduler.check_tokens(self.manager.tier, tokens)
+        except (TokenBudgetExceededError, ValueError) as e:
+            return str(e)
+        return None
+
+    async def _run(self, request: Dict[str, Any], reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        name, prompt = request.get("agent"), request.get("prompt")
+        tokens = request.get("max_tokens", 0)
+        refusal = self._refusal(name, prompt, tokens)
+        if refusal is not None:
+            writer.write(encode_frame({"type": "error", "message": refusal}))
+            return
+        charged = succeeded = False
+        try:
+            pool = self.registry.pool(name, self.manager.tier, max_idle=self.max_idle)
+            limiter = self.limiter or get_rate_limiter(self.manager.tier)
+            # Wait out the tier's run rate before taking a worker slot
+            async with limiter.run() as budget, self.scheduler.admit(self.manager.tier, tokens):
+                if reader.at_eof():
+                    return  # client hung up while queued
+                # Charge the daily run only once admitted
+                charged, message = self.manager.can_run()
+                if not charged:
+                    writer.write(encode_frame({"type": "error", "message": message}))
+                    return
+                with pool.lease() as agent:
+                    if request.get("stream", True):
+                        chunks = []
+                        async for token in agent.stream(prompt):
+                            await budget.consume(1)
+                            chunks.append(token)
+                            writer.write(encode_frame({"type": "token", "data": token}))
+                            await writer.drain()
+                        result = {"success": True, "output": "".join(chunks), "tokens_used": len(chunks)}
+                    else:
+                        outcome = await agent.execute(prompt)
+                        await budget.consume(outcome.tokens_used)
+                        result = {"success": outcome.success, "output": outcome.output, "tokens_used": outcome.tokens_used}
+                        if outcome.error:
+                            result["error"] = outcome.error
+                succeeded = result["success"]
+        except (ConnectionError, BrokenPipeError):
+            raise
+        except Exception as e:
+            result = {"success": False, "output": "", "tokens_used": 0, "error": str(e)}
+        finally:
+            # Failed or abandoned runs don't count against the daily limit
+            if charged and not succeeded:
+                self.manager.release_runs(1)
+        writer.write(encode_frame({"type": "result", **result}))
+
+
+async def serve(path: Optional[Union[str, Path]] = None, manager: Optional[LicenseManager] = None) -> None:
+    """Run a daemon until it is shut down or the task is cancelled."""
+    server = AgentServer(path, manager=manager)
+    await server.start()
+    try:
+        await server.wait_closed()
+    finally:
+        await server.close()
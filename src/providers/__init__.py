@@ -0,0 +1,16 @@
+"""Terminal221b LLM provider layer."""
+
+from .chat import ChatCompletionsProvider, ProviderAgent
+from .sse import SSEEvent, iter_sse
+from .transport import ProviderTransport, RetryPolicy, close_transports, get_transport
+
+__all__ = [
+    "ChatCompletionsProvider",
+    "ProviderAgent",
+    "ProviderTransport",
+    "RetryPolicy",
+    "SSEEvent",
+    "close_transports",
+    "get_transport",
+    "iter_sse",
+]
@@ -0,0 +1,145 @@
+"""OpenAI-compatible chat completions provider and agent.
+
+Works with any endpoint speaking the ``/chat/completions`` protocol
+(OpenAI, vLLM, Ollama, LM Studio). Streaming responses are parsed from SSE
+straight into ``stream()``.
+"""
+
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.agents.base import AgentContext, AgentMessage, AgentResult, BaseAgent
+from src.agents.prompt import AssembledPrompt, PromptAssembler
+
+from .transport import ProviderTransport, connection_limit, get_transport
+
+# A plain message list, or an assembled prompt carrying cache breakpoints
+Prompt = Union[List[AgentMessage], AssembledPrompt]
+
+
+class ChatCompletionsProvider:
+    """Client for an OpenAI-compatible chat completions endpoint.
+
+    Prompts from PromptAssembler carry cache breakpoints. With
+    ``cache_control`` the messages at those breakpoints are sent as content
+    blocks marked ``cache_control: ephemeral`` (Anthropic-style explicit
+    caching, passed through by compatible gateways). With
+    ``prompt_cache_key`` the system-prefix fingerprint is sent as
+    ``prompt_cache_key`` so automatic prefix caching routes to a warm cache.
+    """
+
+    def __init__(
+        self,
+        transport: ProviderTransport,
+        model: str,
+        cache_control: bool = False,
+        prompt_cache_key: bool = False,
+    ):
+        self.transport = transport
+        self.model = model
+        self.cache_control = cache_control
+        self.prompt_cache_key = prompt_cache_key
+
+    @classmethod
+    def openai(cls, model: str = "gpt-4o-mini", max_agents: int = -1) -> "ChatCompletionsProvider":
+        """Provider for api.openai.com using ``OPENAI_API_KEY``.
+
+        Args:
+            model: Model name
+            max_agents: Tier limit from LicenseLimits, used to size the pool
+        """
+        transport = get_transport(
+            "openai",
+            os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            headers={"Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY', '')}"},
+            max_connections=connection_limit(max_agents),
+        )
+        return cls(transport, model, prompt_cache_key=True)
+
+    def _payload(self, messages: Prompt, context: AgentContext, stream: bool) -> Dict[str, Any]:
+        breakpoints: Sequence[int] = ()
+        if isinstance(messages, AssembledPrompt):
+            prompt, messages = messages, messages.messages
+            breakpoints = prompt.breakpoints if self.cache_control else ()
+        else:
+            prompt = None
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "max_tokens": context.max_tokens,
+            "temperature": context.temperature,
+        }
+        for i in breakpoints:
+            entry = payload["messages"][i]
+            entry["content"] = [
+                {"type": "text", "text": entry["content"], "cache_control": {"type": "ephemeral"}}
+            ]
+        if prompt is not None and self.prompt_cache_key and prompt.prefix_key:
+            payload["prompt_cache_key"] = prompt.prefix_key
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def complete(self, messages: Prompt, context: AgentContext) -> Tuple[str, int]:
+        """Run a completion.
+
+        Args:
+            messages: Message list, or an AssembledPrompt to send its cache breakpoints too
+            context: Sampling settings
+
+        Returns:
+            Tuple of (output text, total tokens reported by the provider)
+        """
+        response = await self.transport.post("/chat/completions", self._payload(messages, context, False))
+        body = response.json()
+        text = body["choices"][0]["message"].get("content") or ""
+        tokens = (body.get("usage") or {}).get("total_tokens", 0)
+        return text, tokens
+
+    async def stream(self, messages: Prompt, context: AgentContext) -> AsyncIterator[str]:
+        """Yield content deltas as the provider streams them."""
+        events = self.transport.stream_events("/chat/completions", self._payload(messages, context, True))
+        async for event in events:
+            if event.data == "[DONE]":
+                break
+            choices = json.loads(event.data).get("choices") or []
+            if choices:
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+
+class ProviderAgent(BaseAgent):
+    """Agent that sends its history and prompt to a chat provider."""
+
+    name = "provider"
+    description = "a general-purpose assistant"
+
+    def __init__(self, provider: ChatCompletionsProvider, context: Optional[AgentContext] = None):
+        super().__init__(context)
+        self.provider = provider
+        self.prompts = PromptAssembler()  # per-session prefix layout and reuse stats
+
+    def _messages(self, prompt: str) -> AssembledPrompt:
+        history = self.history
+        return self.prompts.assemble(history.system_prompt, history.messages, prompt)
+
+    async def execute(self, prompt: str) -> AgentResult:
+        """Run one completion and record the turn in history."""
+        try:
+            output, tokens = await self.provider.complete(self._messages(prompt), self.context)
+        except Exception as e:
+            return AgentResult(success=False, output="", error=str(e))
+        self.add_message("user", prompt)
+        self.add_message("assistant", output)
+        return AgentResult(success=True, output=output, tokens_used=tokens)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a completion and record the turn once it finishes."""
+        chunks = []
+        async for chunk in self.provider.stream(self._messages(prompt), self.context):
+            chunks.append(chunk)
+            yield chunk
+        self.add_message("user", prompt)
+        self.add_message("assistant", "".join(chunks))
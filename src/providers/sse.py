@@ -0,0 +1,44 @@
+"""Incremental Server-Sent Events parser."""
+
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+
+@dataclass
+class SSEEvent:
+    """One dispatched server-sent event."""
+
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+
+
+async def iter_sse(lines: AsyncIterator[str]) -> AsyncIterator[SSEEvent]:
+    """Parse SSE events from an async iterator of lines.
+
+    Events are yielded as soon as their terminating blank line arrives, so
+    tokens reach the caller while the response is still streaming.
+    """
+    data: List[str] = []
+    event = "message"
+    event_id: Optional[str] = None
+    async for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield SSEEvent(data="\n".join(data), event=event, id=event_id)
+            data, event = [], "message"
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id":
+            event_id = value
+    if data:
+        yield SSEEvent(data="\n".join(data), event=event, id=event_id)
@@ -0,0 +1,178 @@
+"""Pooled async HTTP transport shared by every agent using a provider.
+
+One long-lived ``httpx.AsyncClient`` per provider keeps connections (and
+their TLS sessions) alive across calls, so agents never pay a handshake
+or client setup per request. Connection limits follow the license tier's
+``max_agents`` and failed requests are retried with jittered backoff.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from .sse import SSEEvent, iter_sse
+
+# Connection ceiling when the tier does not limit concurrent agents
+UNLIMITED_CONNECTIONS = 100
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def connection_limit(max_agents: int) -> int:
+    """Connection pool size for a tier's ``max_agents`` (-1 for unlimited)."""
+    return max_agents if max_agents > 0 else UNLIMITED_CONNECTIONS
+
+
+@dataclass
+class RetryPolicy:
+    """Retry with full-jitter exponential backoff."""
+
+    attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    retry_statuses: Tuple[int, ...] = (408, 429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Backoff before retry number ``attempt`` (0-based)."""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class ProviderTransport:
+    """Shared HTTP client for one provider endpoint."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = UNLIMITED_CONNECTIONS,
+        http2: Optional[bool] = None,
+        timeout: float = 60.0,
+        retry: Optional[RetryPolicy] = None,
+        seed: Optional[int] = None,
+    ):
+        """Initialize transport.
+
+        Args:
+            base_url: Provider API root, e.g. ``https://api.openai.com/v1``
+            headers: Headers sent with every request (auth, versioning)
+            max_connections: Pool size; see ``connection_limit()``
+            http2: Use HTTP/2; defaults to on when the ``h2`` package is installed
+            timeout: Request timeout in seconds
+            retry: Retry policy for connection errors and retryable statuses
+            seed: Seed for backoff jitter (tests)
+        """
+        self.base_url = base_url
+        self.headers = dict(headers or {})
+        self.max_connections = max_connections
+        self.http2 = _h2_available() if http2 is None else http2
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self._rng = random.Random(seed)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The long-lived client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _backoff(self, attempt: int) -> None:
+        await asyncio.sleep(self.retry.delay(attempt, self._rng))
+
+    async def post(self, path: str, payload: Union[Dict[str, Any], List[Any]]) -> httpx.Response:
+        """POST JSON (an object, or an array for JSON-RPC batches), retrying transient failures.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-retryable or final error status
+            httpx.TransportError: If every attempt failed to connect
+        """
+        for attempt in range(self.retry.attempts):
+            last = attempt == self.retry.attempts - 1
+            try:
+                response = await self.client.post(path, json=payload)
+            except httpx.TransportError:
+                if last:
+                    raise
+                await self._backoff(attempt)
+                continue
+            if response.status_code in self.retry.retry_statuses and not last:
+                await self._backoff(attempt)
+                continue
+            response.raise_for_status()
+            return response
+        raise AssertionError("unreachable")
+
+    async def stream_events(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[SSEEvent]:
+        """POST JSON and yield server-sent events as they arrive.
+
+        Retries only happen before the first byte of a successful response,
+        so no event is ever delivered twice.
+        """
+        started = False
+        for attempt in range(self.retry.attempts):
+            last = attempt == self.retry.attempts - 1
+            try:
+                async with self.client.stream("POST", path, json=payload) as response:
+                    if response.status_code in self.retry.retry_statuses and not last:
+                        await response.aread()
+                    else:
+                        if response.is_error:
+                            await response.aread()
+                            response.raise_for_status()
+                        async for event in iter_sse(response.aiter_lines()):
+                            started = True
+                            yield event
+                        return
+            except httpx.TransportError:
+                if last or started:
+                    raise
+            await self._backoff(attempt)
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_transports: Dict[str, ProviderTransport] = {}
+
+
+def get_transport(name: str, base_url: str, **kwargs) -> ProviderTransport:
+    """Get or create the shared transport for a provider.
+
+    Args:
+        name: Provider name (e.g. "openai"); one transport exists per name
+        base_url: API root, used when the transport is first created
+        **kwargs: ProviderTransport options, used when first created
+    """
+    transport = _transports.get(name)
+    if transport is None:
+        transport = _transports[name] = ProviderTransport(base_url, **kwargs)
+    return transport
+
+
+async def close_transports() -> None:
+    """Close every shared transport (call on shutdown)."""
+    for transport in list(_transports.values()):
+        await transport.aclose()
+    _transports.clear()
@@ -0,0 +1,8 @@
+"""Terminal221b terminal UI."""
+
+from .app import Terminal221bApp
+from .coalesce import FrameCoalescer
+from .scrollback import Scrollback
+from .widgets import AgentPane, TranscriptView
+
+__all__ = ["AgentPane", "FrameCoalescer", "Scrollback", "Terminal221bApp", "TranscriptView"]
@@ -0,0 +1,119 @@
+"""Terminal221b Textual application."""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from textual.app import App, ComposeResult
+from textual.containers import Horizontal
+from textual.widgets import Footer, Header, Input
+
+from src.agents.base import BaseAgent
+
+from .coalesce import FrameCoalescer
+from .widgets import AgentPane
+
+
+class Terminal221bApp(App):
+    """Side-by-side agent panes fed by one prompt box.
+
+    Each pane streams from its own worker task. Token chunks go through a
+    shared FrameCoalescer, so panes repaint at most ``fps`` times per
+    second however fast the agents produce output.
+
+    When ``can_run`` is given, every prompt is charged once per pane
+    before that pane's agent runs (e.g. ``LicenseManager.can_run``).
+    """
+
+    TITLE = "Terminal221b"
+    CSS = """
+    #panes {
+        height: 1fr;
+    }
+    """
+    BINDINGS = [
+        ("ctrl+l", "clear", "Clear"),
+        ("ctrl+c", "quit", "Quit"),
+    ]
+
+    def __init__(
+        self,
+        agents: Dict[str, BaseAgent],
+        fps: float = 30.0,
+        max_lines: Optional[int] = None,
+        prompt: Optional[str] = None,
+        can_run: Optional[Callable[[], Tuple[bool, str]]] = None,
+    ):
+        """Initialize app.
+
+        Args:
+            agents: Pane title -> agent streaming into that pane
+            fps: Maximum transcript repaints per second
+            max_lines: Scrollback kept per pane (None keeps everything)
+            prompt: Prompt to send as soon as the app starts
+            can_run: License check-and-charge per pane run (None runs unmetered)
+        """
+        super().__init__()
+        self.agents = agents
+        self.max_lines = max_lines
+        self.initial_prompt = prompt
+        self.can_run = can_run
+        self.panes: Dict[str, AgentPane] = {}
+        self.coalescer = FrameCoalescer(self._paint, fps=fps)
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        with Horizontal(id="panes"):
+            for name in self.agents:
+                self.panes[name] = AgentPane(name, max_lines=self.max_lines)
+                yield self.panes[name]
+        yield Input(placeholder="Ask the agents...", id="prompt")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one("#prompt", Input).focus()
+        if self.initial_prompt:
+            self.submit(self.initial_prompt)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        prompt = event.value.strip()
+        event.input.value = ""
+        if prompt:
+            self.submit(prompt)
+
+    def submit(self, prompt: str) -> None:
+        """Send ``prompt`` to every pane's agent concurrently."""
+        for name, pane in self.panes.items():
+            pane.transcript.write_line(f"> {prompt}")
+            if self.can_run is not None:
+                allowed, message = self.can_run()
+                if not allowed:
+                    pane.transcript.write_line(f"[limit] {message}\n")
+                    pane.set_status("run limit reached")
+                    continue
+            self.run_worker(self._stream(name, prompt), group=name, exit_on_error=False)
+
+    async def _stream(self, name: str, prompt: str) -> None:
+        pane = self.panes[name]
+        pane.set_status("streaming...")
+        start = time.perf_counter()
+        chunks = 0
+        try:
+            async for token in self.agents[name].stream(prompt):
+                chunks += 1
+                self.coalescer.push(name, token)
+        except Exception as e:
+            self.coalescer.push(name, f"\n[error] {e}")
+            pane.set_status("failed")
+        else:
+            elapsed = time.perf_counter() - start
+            pane.set_status(f"{chunks} chunks in {elapsed:.2f}s")
+        self.coalescer.push(name, "\n\n")
+
+    def _paint(self, batch: Dict[str, str]) -> None:
+        for name, text in batch.items():
+            self.panes[name].transcript.write(text)
+
+    def action_clear(self) -> None:
+        for pane in self.panes.values():
+            pane.transcript.clear()
+            pane.set_status("")
@@ -0,0 +1,90 @@
+"""Frame-rate-capped merging of streamed token chunks.
+
+Agents can emit hundreds of chunks per second per pane; repainting on
+each one wastes the event loop on layout and rendering. FrameCoalescer
+buffers chunks per target and hands them over in one batch at most
+``fps`` times per second, so redraw cost tracks the frame rate rather
+than the token rate.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class CoalesceStats:
+    """Chunks received versus frames flushed."""
+
+    chunks: int = 0
+    frames: int = 0
+
+    @property
+    def chunks_per_frame(self) -> float:
+        return self.chunks / self.frames if self.frames else 0.0
+
+
+class FrameCoalescer:
+    """Buffer chunks per key and flush them together once per frame.
+
+    Usage:
+        coalescer = FrameCoalescer(lambda batch: [panes[k].write(t) for k, t in batch.items()])
+        async for token in agent.stream(prompt):
+            coalescer.push("analyst", token)
+        coalescer.flush()
+    """
+
+    def __init__(
+        self,
+        on_frame: Callable[[Dict[str, str]], None],
+        fps: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize coalescer.
+
+        Args:
+            on_frame: Called with {key: merged text} for every flushed frame
+            fps: Maximum frames per second
+            clock: Monotonic time source
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self.on_frame = on_frame
+        self.interval = 1.0 / fps
+        self.clock = clock
+        self.stats = CoalesceStats()
+        self._pending: Dict[str, List[str]] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        self._last_frame = float("-inf")
+
+    def push(self, key: str, chunk: str) -> None:
+        """Queue a chunk for ``key``; it is shown at the next frame."""
+        self.stats.chunks += 1
+        self._pending.setdefault(key, []).append(chunk)
+        if self._handle is None:
+            # The first chunk after an idle spell goes out immediately
+            delay = max(0.0, self._last_frame + self.interval - self.clock())
+            loop = asyncio.get_running_loop()
+            if delay:
+                self._handle = loop.call_later(delay, self.flush)
+            else:
+                self._handle = loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        """Emit everything pending now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._pending:
+            return
+        batch = {key: "".join(chunks) for key, chunks in self._pending.items()}
+        self._pending.clear()
+        self._last_frame = self.clock()
+        self.stats.frames += 1
+        self.on_frame(batch)
+
+    @property
+    def pending(self) -> int:
+        """Chunks waiting for the next frame."""
+        return sum(len(chunks) for chunks in self._pending.values())
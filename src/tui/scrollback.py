@@ -0,0 +1,89 @@
+"""Virtualized transcript storage for the TUI.
+
+Scrollback keeps logical lines in a flat list and only ever materializes
+the visible window, so appending and rendering cost the same whether a
+session holds a hundred lines or a million.
+"""
+
+from typing import List, Optional
+
+
+class Scrollback:
+    """Append-only line buffer with O(1) windowed reads.
+
+    Streamed text is appended as it arrives; a trailing partial line keeps
+    growing until a newline closes it. With ``width`` set, long lines are
+    wrapped into rows as they are appended, so reads never re-wrap; a new
+    width only applies to text appended afterwards.
+    """
+
+    def __init__(self, max_lines: Optional[int] = None, width: Optional[int] = None):
+        """Initialize scrollback.
+
+        Args:
+            max_lines: Keep at most this many rows, dropping the oldest (None keeps all)
+            width: Wrap rows at this many characters (None disables wrapping)
+        """
+        self.max_lines = max_lines
+        self.width = width
+        self.dropped = 0  # lines trimmed from the front
+        self._lines: List[str] = [""]
+
+    def __len__(self) -> int:
+        # An empty trailing line is just the cursor after a newline
+        return len(self._lines) - (0 if self._lines[-1] else 1)
+
+    def __getitem__(self, index: int) -> str:
+        return self._lines[index]
+
+    @property
+    def partial(self) -> str:
+        """The unterminated last line (empty after a newline)."""
+        return self._lines[-1]
+
+    def append(self, text: str) -> int:
+        """Append streamed text; return the index of the first line it changed."""
+        first = len(self._lines) - 1
+        parts = text.split("\n")
+        self._lines[-1] += parts[0]
+        if len(parts) > 1:
+            self._lines.extend(parts[1:])
+        if self.width:
+            wrapped: List[str] = []
+            for line in self._lines[first:]:
+                wrapped.extend(self._wrap(line, self.width))
+            self._lines[first:] = wrapped
+        return max(0, first - self._trim())
+
+    def write_line(self, line: str = "") -> int:
+        """Append a whole line, closing any partial one first."""
+        return self.append(("\n" if self._lines[-1] else "") + line + "\n")
+
+    def window(self, top: int, height: int) -> List[str]:
+        """Visible lines ``top`` .. ``top + height`` (clamped to the buffer)."""
+        top = max(0, top)
+        return self._lines[top:top + height]
+
+    def clear(self) -> None:
+        self._lines = [""]
+        self.dropped = 0
+
+    @staticmethod
+    def _wrap(line: str, width: int) -> List[str]:
+        rows = []
+        while len(line) > width:
+            cut = line.rfind(" ", 0, width)
+            cut = cut + 1 if cut > 0 else width  # break after a space, or mid-word if there is none
+            rows.append(line[:cut])
+            line = line[cut:]
+        rows.append(line)
+        return rows
+
+    def _trim(self) -> int:
+        # Trim in chunks so deleting from the front stays amortized O(1) per line
+        if self.max_lines is None or len(self._lines) <= self.max_lines + max(1, self.max_lines // 8):
+            return 0
+        excess = len(self._lines) - self.max_lines
+        del self._lines[:excess]
+        self.dropped += excess
+        return excess
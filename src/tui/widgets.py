@@ -0,0 +1,101 @@
+"""Textual widgets for streaming agent transcripts."""
+
+from typing import Optional
+
+from rich.cells import cell_len
+from rich.segment import Segment
+from textual.containers import Vertical
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Static
+
+from .scrollback import Scrollback
+
+
+class TranscriptView(ScrollView):
+    """Scrollable transcript drawn with Textual's line API.
+
+    Only the rows currently on screen are rendered, straight from the
+    Scrollback buffer, so redraw cost is independent of transcript length.
+    The view follows new output while scrolled to the bottom, and wraps
+    incoming text to its current width.
+    """
+
+    DEFAULT_CSS = """
+    TranscriptView {
+        height: 1fr;
+    }
+    """
+
+    def __init__(self, max_lines: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.scrollback = Scrollback(max_lines)
+        self._width = 0
+
+    def write(self, text: str) -> None:
+        """Append streamed text."""
+        follow = self.is_vertical_scroll_end
+        dropped = self.scrollback.dropped
+        first = self.scrollback.append(text)
+        for line in self.scrollback.window(first, len(self.scrollback) + 1 - first):
+            self._width = max(self._width, cell_len(line))
+        self.virtual_size = Size(self._width, len(self.scrollback))
+        shift = self.scrollback.dropped - dropped
+        if follow:
+            self.scroll_to(y=self.max_scroll_y, animate=False, immediate=True, force=True)
+        elif shift:
+            self.scroll_to(y=max(0, self.scroll_offset.y - shift), animate=False, immediate=True, force=True)
+        self.refresh()
+
+    def write_line(self, line: str = "") -> None:
+        """Append a whole line."""
+        self.write(("\n" if self.scrollback.partial else "") + line + "\n")
+
+    def clear(self) -> None:
+        self.scrollback.clear()
+        self._width = 0
+        self.virtual_size = Size(0, 0)
+        self.refresh()
+
+    def on_resize(self) -> None:
+        self.scrollback.width = self.scrollable_content_region.width or None
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        style = self.rich_style
+        if index >= len(self.scrollback):
+            return Strip.blank(width, style)
+        text = self.scrollback[index]
+        strip = Strip([Segment(text, style)], cell_len(text))
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
+
+
+class AgentPane(Vertical):
+    """One agent's title bar and transcript."""
+
+    DEFAULT_CSS = """
+    AgentPane {
+        border: round $accent;
+        width: 1fr;
+    }
+    AgentPane > .pane-title {
+        height: 1;
+        text-style: bold;
+    }
+    """
+
+    def __init__(self, agent_name: str, max_lines: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.agent_name = agent_name
+        self.title_bar = Static(agent_name, classes="pane-title")
+        self.transcript = TranscriptView(max_lines=max_lines)
+
+    def compose(self):
+        yield self.title_bar
+        yield self.transcript
+
+    def set_status(self, status: str) -> None:
+        self.title_bar.update(f"{self.agent_name} [dim]{status}[/dim]" if status else self.agent_name)
@@ -0,0 +1,51 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_ledger(tmp_path, monkeypatch):
+    """Keep CLI runs in tests from touching the user's real usage ledger."""
+    path = tmp_path / "usage.db"
+    monkeypatch.setenv("TERMINAL221B_LEDGER", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def offline_tokenizer(monkeypatch):
+    """Use the character estimate so tests never download tiktoken encodings."""
+    monkeypatch.setenv("TERMINAL221B_TOKENIZER", "estimate")
+
+
+@pytest.fixture(autouse=True)
+def isolated_metrics(tmp_path, monkeypatch):
+    """Keep metric snapshots written during tests out of the user's home."""
+    from utils import metrics
+
+    monkeypatch.setenv("TERMINAL221B_METRICS_FILE", str(tmp_path / "metrics.json"))
+    yield
+    metrics.registry.default_labels.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_daemon(tmp_path, monkeypatch):
+    """Never talk to a daemon the developer has running."""
+    monkeypatch.setenv("TERMINAL221B_SOCKET", str(tmp_path / "none.sock"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_license_cache(tmp_path, monkeypatch):
+    """Keep license verification caches written during tests out of the user's home."""
+    monkeypatch.setenv("TERMINAL221B_LICENSE_CACHE", str(tmp_path / "license.json"))
+    monkeypatch.setenv("TERMINAL221B_LICENSE_URL", "http://127.0.0.1:9/unreachable")
+    monkeypatch.delenv("TERMINAL221B_LICENSE_KEYS", raising=False)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiters():
+    """Start every test with full run and token buckets."""
+    from utils import ratelimit
+
+    ratelimit._limiters.clear()
+    yield
+    ratelimit._limiters.clear()
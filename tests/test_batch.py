@@ -0,0 +1,202 @@
+"""Tests for streaming batch mode."""
+
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.fake import FakeAgent
+from src.batch import BatchProgress, BatchRunner, parse_line
+from src.main import cli
+
+
+def add_length(record):
+    """Module-level so it can run in a worker process."""
+    record["length"] = len(record["output"])
+    return record
+
+
+class CountingAgent(FakeAgent):
+    """FakeAgent that records every prompt it was asked to run."""
+
+    seen = []
+
+    async def execute(self, prompt):
+        CountingAgent.seen.append(prompt)
+        return await super().execute(prompt)
+
+
+def prompts(n):
+    return [json.dumps({"id": f"p{i}", "prompt": f"prompt {i}"}) + "\n" for i in range(n)]
+
+
+def results(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class TestBatchProgress:
+    """Test the watermark checkpoint."""
+
+    def test_watermark_advances_over_contiguous_prefix(self):
+        progress = BatchProgress()
+        for index in (1, 2, 4):
+            progress.mark(index)
+        assert progress.watermark == 0
+        progress.mark(0)
+        assert progress.watermark == 3
+        assert progress.done == {4}
+        assert progress.is_done(2) and progress.is_done(4) and not progress.is_done(3)
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "ckpt.json"
+        progress = BatchProgress(path)
+        for index in (0, 1, 3):
+            progress.mark(index)
+        progress.offset = 42
+        progress.save()
+        loaded = BatchProgress(path)
+        assert (loaded.watermark, loaded.done, loaded.offset) == (2, {3}, 42)
+
+
+class TestParseLine:
+    """Test input line formats."""
+
+    def test_formats(self):
+        assert parse_line('"hi"') == {"prompt": "hi"}
+        assert parse_line('{"prompt": "hi", "id": 3}') == {"prompt": "hi", "id": 3}
+        with pytest.raises(ValueError):
+            parse_line('{"text": "hi"}')
+
+
+class TestBatchRunner:
+    """Test concurrent execution, checkpointing and bulk charging."""
+
+    @pytest.mark.asyncio
+    async def test_runs_every_prompt(self):
+        out = io.StringIO()
+        runner = BatchRunner(lambda: FakeAgent(latency=0.001), concurrency=4)
+        summary = await runner.run(prompts(50), out)
+        rows = results(out.getvalue())
+        assert summary.processed == summary.succeeded == 50
+        assert sorted(row["index"] for row in rows) == list(range(50))
+        assert all(row["id"] == f"p{row['index']}" for row in rows)
+        assert summary.tokens_used == 50 * 16
+
+    @pytest.mark.asyncio
+    async def test_bad_lines_become_failed_results(self):
+        out = io.StringIO()
+        lines = ['{"prompt": "ok"}\n', "not json\n", "\n", '{"prompt": "ok too"}\n']
+        summary = await BatchRunner(FakeAgent).run(lines, out)
+        rows = {row["index"]: row for row in results(out.getvalue())}
+        assert summary.succeeded == 2 and summary.failed == 1
+        assert rows[1]["success"] is False and "error" in rows[1]
+        assert 2 not in rows
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_progress_state(self):
+        progress = BatchProgress(window=8)
+        sizes = []
+
+        class Slow(FakeAgent):
+            async def execute(self, prompt):
+                sizes.append(len(progress.done))
+                return await super().execute(prompt)
+
+        summary = await BatchRunner(lambda: Slow(latency=0.001), concurrency=4, progress=progress).run(
+            prompts(200), io.StringIO()
+        )
+        assert summary.processed == 200
+        assert max(sizes) < 8
+        assert progress.watermark == 200 and not progress.done
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_items(self, tmp_path):
+        path = tmp_path / "ckpt.json"
+        progress = BatchProgress(path)
+        for index in list(range(30)) + [35, 40]:
+            progress.mark(index)
+        progress.save()
+        CountingAgent.seen = []
+        summary = await BatchRunner(CountingAgent, progress=BatchProgress(path)).run(prompts(50), io.StringIO())
+        assert summary.skipped == 32
+        assert summary.processed == 18
+        assert "prompt 35" not in CountingAgent.seen and "prompt 30" in CountingAgent.seen
+        assert BatchProgress(path).watermark == 50
+
+    @pytest.mark.asyncio
+    async def test_license_charged_in_blocks(self):
+        calls = []
+        released = []
+
+        def reserve(count):
+            calls.append(count)
+            return count
+
+        runner = BatchRunner(FakeAgent, reserve_runs=reserve, release_runs=released.append, charge_block=10)
+        summary = await runner.run(prompts(25), io.StringIO())
+        assert summary.processed == 25
+        assert calls == [10, 10, 10]
+        assert released == [5]
+
+    @pytest.mark.asyncio
+    async def test_stops_when_allowance_runs_out(self):
+        granted = iter([10, 3, 0])
+        runner = BatchRunner(FakeAgent, reserve_runs=lambda n: next(granted), charge_block=10)
+        summary = await runner.run(prompts(50), io.StringIO())
+        assert summary.processed == 13
+        assert summary.limited
+
+    @pytest.mark.asyncio
+    async def test_postprocess_in_process_pool(self):
+        out = io.StringIO()
+        with ProcessPoolExecutor(1) as pool:
+            summary = await BatchRunner(FakeAgent, postprocess=add_length, executor=pool).run(prompts(5), out)
+        assert summary.processed == 5
+        assert all(row["length"] == len(row["output"]) for row in results(out.getvalue()))
+
+
+class TestBatchCommand:
+    """Test `terminal221b run --batch`."""
+
+    @pytest.fixture(autouse=True)
+    def free_tier(self, monkeypatch):
+        monkeypatch.delenv("LICENSE_KEY", raising=False)
+
+    def test_file_to_file_and_resume(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LICENSE_KEY", "ENT_" + "x" * 20)
+        source = tmp_path / "prompts.jsonl"
+        source.write_text("".join(prompts(20)))
+        output = tmp_path / "results.jsonl"
+        with patch("src.commands.run.resolve_agent", return_value=FakeAgent):
+            result = CliRunner().invoke(cli, ["run", "--batch", str(source), "-o", str(output)], obj={})
+            assert result.exit_code == 0, result.output
+            assert len(results(output.read_text())) == 20
+
+            # Simulate a crash after the checkpoint: a torn line past the saved offset
+            with open(output, "a") as fh:
+                fh.write('{"index": 99, "outp')
+            source.write_text("".join(prompts(25)))
+            result = CliRunner().invoke(cli, ["run", "--batch", str(source), "-o", str(output)], obj={})
+        assert result.exit_code == 0, result.output
+        assert "20 already done" in result.output
+        rows = results(output.read_text())
+        assert sorted(row["index"] for row in rows) == list(range(25))
+
+    def test_free_tier_limit_stops_batch(self, tmp_path):
+        source = tmp_path / "prompts.jsonl"
+        source.write_text("".join(prompts(30)))
+        with patch("src.commands.run.resolve_agent", return_value=FakeAgent):
+            result = CliRunner().invoke(cli, ["run", "--batch", str(source)], obj={})
+        assert result.exit_code == 1
+        assert "daily run limit reached" in result.output
+        assert len([l for l in result.output.splitlines() if l.startswith("{")]) == 5
+
+    def test_unavailable_agent(self, tmp_path):
+        source = tmp_path / "prompts.jsonl"
+        source.write_text("".join(prompts(1)))
+        result = CliRunner().invoke(cli, ["run", "--batch", str(source)], obj={})
+        assert result.exit_code == 1
+        assert "not available" in result.output
@@ -0,0 +1,129 @@
+"""Tests for micro-batching of concurrent requests."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.agents.base import AgentResult, BaseAgent
+from src.agents.batching import BatchingAgent, MicroBatcher
+from src.agents.fake import FakeAgent
+
+
+class TestMicroBatcher:
+    """Test batch collection and result splitting."""
+
+    @pytest.mark.asyncio
+    async def test_results_split_per_caller(self):
+        """Each caller should get the result for its own item."""
+        sizes = []
+
+        async def double(items):
+            sizes.append(len(items))
+            return [i * 2 for i in items]
+
+        batcher = MicroBatcher(double, max_batch_size=8, max_delay=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        assert results == [i * 2 for i in range(20)]
+        assert sizes == [8, 8, 4]
+        assert batcher.stats.batches == 3
+        assert batcher.stats.mean_batch_size == pytest.approx(20 / 3)
+
+    @pytest.mark.asyncio
+    async def test_max_delay_bounds_added_latency(self):
+        """A lone item should be sent once max_delay expires."""
+
+        async def echo(items):
+            return items
+
+        batcher = MicroBatcher(echo, max_batch_size=100, max_delay=0.02)
+        start = time.perf_counter()
+        assert await batcher.submit("x") == "x"
+        elapsed = time.perf_counter() - start
+        assert 0.015 <= elapsed < 0.2
+        assert batcher.stats.max_wait >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_batch_errors_propagate_to_all(self):
+        """A failing batch should fail every caller in it."""
+
+        async def broken(items):
+            raise RuntimeError("backend down")
+
+        batcher = MicroBatcher(broken, max_batch_size=3)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch(self):
+        """Returning the wrong number of results should be an error."""
+
+        async def short(items):
+            return items[:-1]
+
+        batcher = MicroBatcher(short, max_batch_size=2)
+        with pytest.raises(RuntimeError, match="1 results for 2 items"):
+            await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    @pytest.mark.asyncio
+    async def test_flush(self):
+        """flush() should send pending items without waiting for the timer."""
+
+        async def echo(items):
+            return items
+
+        batcher = MicroBatcher(echo, max_batch_size=100, max_delay=10)
+        pending = asyncio.ensure_future(batcher.submit("x"))
+        await asyncio.sleep(0)
+        await batcher.flush()
+        assert await asyncio.wait_for(pending, timeout=1) == "x"
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            MicroBatcher(lambda items: items, max_batch_size=0)
+
+
+class TestBatchingAgent:
+    """Test the agent wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_executes_batched(self):
+        """Concurrent executes should share provider calls."""
+        fake = FakeAgent(latency=0.01)
+        agent = BatchingAgent(fake, max_batch_size=10, max_delay=0.005)
+        results = await asyncio.gather(*(agent.execute(f"p{i}") for i in range(30)))
+        assert [r.output for r in results] == [(await fake.execute(f"p{i}")).output for i in range(30)]
+        assert fake.batches == 3
+        assert agent.stats.items == 30
+        assert agent.name == "fake"
+
+    @pytest.mark.asyncio
+    async def test_default_execute_batch(self):
+        """BaseAgent.execute_batch should fall back to concurrent executes."""
+        class UpperAgent(BaseAgent):
+            async def execute(self, prompt):
+                return AgentResult(success=True, output=prompt.upper())
+
+            async def stream(self, prompt):
+                yield prompt.upper()
+
+        results = await UpperAgent().execute_batch(["a", "b"])
+        assert [r.output for r in results] == ["A", "B"]
+
+    @pytest.mark.asyncio
+    async def test_one_failing_prompt_fails_only_its_caller(self):
+        """An exception from one prompt should not fail the rest of the batch."""
+        class PickyAgent(BaseAgent):
+            async def execute(self, prompt):
+                if prompt == "bad":
+                    raise ValueError("cannot answer")
+                return AgentResult(success=True, output=prompt.upper())
+
+            async def stream(self, prompt):
+                yield prompt.upper()
+
+        agent = BatchingAgent(PickyAgent(), max_batch_size=3, max_delay=0.01)
+        results = await asyncio.gather(agent.execute("a"), agent.execute("bad"), agent.execute("b"))
+        assert agent.stats.batches == 1
+        assert [(r.success, r.output) for r in results] == [(True, "A"), (False, ""), (True, "B")]
+        assert results[1].error == "cannot answer"
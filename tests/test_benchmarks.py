@@ -0,0 +1,91 @@
+"""Tests for the fake provider and the agent benchmark suite."""
+
+import time
+
+import pytest
+
+from benchmarks.agents import format_table, percentile, run_suite
+from src.agents.fake import FakeAgent, FakeProviderError
+
+
+class TestFakeAgent:
+    """Test the deterministic provider stand-in."""
+
+    @pytest.mark.asyncio
+    async def test_deterministic_output(self):
+        """The same prompt should always give the same output."""
+        a, b = FakeAgent(output_tokens=8), FakeAgent(output_tokens=8)
+        first, second = await a.execute("hello"), await b.execute("hello")
+        assert first.output == second.output
+        assert first.tokens_used == 8
+        assert (await a.execute("other")).output != first.output
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_execute(self):
+        """Streaming should yield the same tokens as execute returns."""
+        agent = FakeAgent(output_tokens=5)
+        chunks = [c async for c in agent.stream("p")]
+        assert len(chunks) == 5
+        assert "".join(chunks) == (await agent.execute("p")).output
+
+    @pytest.mark.asyncio
+    async def test_latency_and_rate(self):
+        """Latency and token rate should shape timing."""
+        agent = FakeAgent(latency=0.02, tokens_per_second=200, output_tokens=5)
+        start = time.perf_counter()
+        await agent.execute("p")
+        assert time.perf_counter() - start >= 0.02 + 5 / 200 - 0.005
+
+    @pytest.mark.asyncio
+    async def test_error_injection_repeatable(self):
+        """Errors should be injected at the configured rate, reproducibly."""
+
+        async def outcomes(seed):
+            agent = FakeAgent(error_rate=0.3, seed=seed)
+            results = []
+            for _ in range(50):
+                try:
+                    await agent.execute("p")
+                    results.append(True)
+                except FakeProviderError:
+                    results.append(False)
+            return results
+
+        first = await outcomes(1)
+        assert first == await outcomes(1)
+        assert 5 <= first.count(False) <= 25
+
+
+class TestBenchmarkSuite:
+    """The suite should run quickly offline and report every metric."""
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        assert percentile(samples, 50) == 50
+        assert percentile(samples, 99) == 99
+        assert percentile([], 50) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_suite_reports_metrics(self):
+        """Every workload should report latency percentiles and throughput."""
+        results = await run_suite(runs=40, concurrency=4, latency=0.001, batch_size=4)
+        assert [r.name for r in results] == [
+            "execute/single", "execute/concurrent-4", "stream/single", "stream/concurrent-4",
+            "execute/batched-4",
+        ]
+        for result in results:
+            summary = result.summary()
+            assert summary["runs"] == 40
+            assert len(result.latencies) == 40
+            assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+        assert "ttft_p95_ms" in results[2].summary()
+        assert results[4].summary()["mean_batch"] > 1
+        # concurrency should overlap simulated latency
+        assert results[1].runs_per_second > results[0].runs_per_second
+        assert "runs_per_s" in format_table(results)
+
+    @pytest.mark.asyncio
+    async def test_errors_counted(self):
+        """Injected errors should be counted, not crash the suite."""
+        results = await run_suite(runs=20, concurrency=2, error_rate=0.5)
+        assert all(r.errors > 0 for r in results)
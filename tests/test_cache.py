@@ -0,0 +1,156 @@
+"""Tests for the agent response cache."""
+
+import os
+import time
+
+import pytest
+
+from src.agents.base import AgentContext, AgentResult, BaseAgent
+from src.agents.cache import (
+    CachedAgent,
+    DiskCache,
+    MemoryCache,
+    ResponseCache,
+    cache_key,
+)
+
+
+class CountingAgent(BaseAgent):
+    """Agent that counts provider calls."""
+
+    name = "counting"
+
+    def __init__(self, context=None):
+        super().__init__(context or AgentContext(temperature=0))
+        self.calls = 0
+
+    async def execute(self, prompt):
+        self.calls += 1
+        return AgentResult(success=True, output=f"answer to {prompt}", tokens_used=3)
+
+    async def stream(self, prompt):
+        self.calls += 1
+        for word in ("answer ", "to ", prompt):
+            yield word
+
+
+class TestCacheKey:
+    """Test key stability."""
+
+    def test_normalized(self):
+        """Whitespace and role casing should not change the key."""
+        a, b = CountingAgent(), CountingAgent()
+        a.add_message("user", "hello ")
+        b.add_message("User", "hello")
+        assert cache_key(a, "q") == cache_key(b, " q ")
+
+    def test_sensitive_to_inputs(self):
+        """History, temperature and max_tokens should change the key."""
+        base = CountingAgent()
+        other = CountingAgent(AgentContext(temperature=0, max_tokens=5))
+        assert cache_key(base, "q") != cache_key(other, "q")
+        assert cache_key(base, "q") != cache_key(base, "r")
+        before = cache_key(base, "q")
+        base.add_message("user", "x")
+        assert cache_key(base, "q") != before
+
+
+class TestCachedAgent:
+    """Test the cache wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_execute_hit(self):
+        """Repeated prompts should hit the cache."""
+        agent = CachedAgent(CountingAgent())
+        first = await agent.execute("q")
+        second = await agent.execute("q")
+        assert agent.agent.calls == 1
+        assert second.output == first.output
+        assert second.metadata["cached"] is True
+        assert (agent.stats.hits, agent.stats.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_stream_replay(self):
+        """A streamed miss should be replayed chunk by chunk on a hit."""
+        agent = CachedAgent(CountingAgent())
+        first = [c async for c in agent.stream("q")]
+        second = [c async for c in agent.stream("q")]
+        assert first == second == ["answer ", "to ", "q"]
+        assert agent.agent.calls == 1
+        result = await agent.execute("q")
+        assert result.output == "answer to q"
+        assert agent.agent.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_sampling_bypasses_unless_opted_in(self):
+        """temperature > 0 should skip the cache by default."""
+        sampled = CountingAgent(AgentContext(temperature=0.7))
+        agent = CachedAgent(sampled)
+        await agent.execute("q")
+        await agent.execute("q")
+        assert sampled.calls == 2
+        assert agent.stats.bypassed == 2
+        opted = CachedAgent(CountingAgent(AgentContext(temperature=0.7)), cache_sampled=True)
+        await opted.execute("q")
+        await opted.execute("q")
+        assert opted.agent.calls == 1
+
+    def test_delegates_attributes(self):
+        """Agent attributes should pass through the wrapper."""
+        agent = CachedAgent(CountingAgent())
+        assert agent.name == "counting"
+
+
+class TestTiers:
+    """Test memory and disk tiers."""
+
+    def test_memory_lru(self):
+        """The least recently used entry should be evicted first."""
+        cache = MemoryCache(max_entries=2)
+        cache.put("a", {"output": "1"})
+        cache.put("b", {"output": "2"})
+        cache.get("a")
+        cache.put("c", {"output": "3"})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_memory_ttl(self):
+        """Expired memory entries should miss."""
+        cache = MemoryCache(ttl=0)
+        cache.put("a", {"output": "1"})
+        time.sleep(0.01)
+        assert cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory(self, tmp_path):
+        """A fresh process should hit entries stored on disk."""
+        first = CachedAgent(CountingAgent(), ResponseCache(disk=DiskCache(tmp_path)))
+        await first.execute("q")
+        second = CachedAgent(CountingAgent(), ResponseCache(disk=DiskCache(tmp_path)))
+        result = await second.execute("q")
+        assert second.agent.calls == 0
+        assert result.output == "answer to q"
+        assert second.stats.disk_hits == 1
+        await second.execute("q")
+        assert second.stats.memory_hits == 1
+
+    def test_disk_size_eviction(self, tmp_path):
+        """The disk tier should stay under max_bytes, dropping oldest first."""
+        cache = DiskCache(tmp_path, max_bytes=2000)
+        for i in range(20):
+            key = f"{i:02d}" + "k" * 62
+            cache.put(key, {"output": "x" * 200})
+            os.utime(cache._path(key), (i, i))
+        assert cache.size <= 2000
+        assert cache.get("19" + "k" * 62) is not None
+        assert cache.get("00" + "k" * 62) is None
+        assert DiskCache(tmp_path).size == cache.size
+
+    def test_disk_ttl(self, tmp_path):
+        """Expired disk entries should miss and be removed."""
+        cache = DiskCache(tmp_path, ttl=60)
+        cache.put("ab" * 32, {"output": "x"})
+        old = time.time() - 120
+        os.utime(cache._path("ab" * 32), (old, old))
+        assert cache.get("ab" * 32) is None
+        assert cache.size == 0
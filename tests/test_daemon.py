@@ -0,0 +1,283 @@
+"""Tests for the serve daemon, its framing protocol and the thin client."""
+
+import asyncio
+import dataclasses
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.base import AgentContext
+from src.agents.fake import FakeAgent
+from src.agents.registry import AgentRegistry, AgentSpec
+from src.daemon import DaemonClient, DaemonError, ProtocolError
+from src.daemon.protocol import HEADER, MAX_FRAME, decode_payload, encode_frame, recv_frame
+from src.commands.run import run_local
+from src.daemon.server import AgentServer
+from src.main import cli
+from utils.ledger import UsageLedger
+from utils.license import TIER_LIMITS, LicenseManager, LicenseTier
+from utils.ratelimit import RateLimits, TierRateLimiter
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Free tier limits without the run and token rates, so tests can run back to back
+UNTHROTTLED = RateLimits(runs_per_minute=-1, run_burst=-1, tokens_per_second=-1, token_burst=-1)
+
+
+def tight_limiter(max_tokens_per_run):
+    limits = dataclasses.replace(TIER_LIMITS[LicenseTier.FREE], max_tokens_per_run=max_tokens_per_run)
+    return TierRateLimiter(LicenseTier.FREE, rates=UNTHROTTLED, limits=limits)
+
+
+class TestProtocol:
+    """Test length-prefixed JSON frames."""
+
+    def test_round_trip(self):
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(encode_frame({"op": "ping"}) + encode_frame({"type": "token", "data": "é"}))
+            a.close()
+            assert recv_frame(b) == {"op": "ping"}
+            assert recv_frame(b) == {"type": "token", "data": "é"}
+            assert recv_frame(b) is None
+
+    def test_compact_encoding(self):
+        frame = encode_frame({"type": "token", "data": "hi"})
+        assert frame[HEADER.size:] == b'{"type":"token","data":"hi"}'
+        assert HEADER.unpack(frame[:HEADER.size])[0] == len(frame) - HEADER.size
+
+    def test_truncated_frame(self):
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(encode_frame({"op": "ping"})[:-2])
+            a.close()
+            with pytest.raises(ProtocolError, match="mid-frame"):
+                recv_frame(b)
+
+    def test_rejects_bad_frames(self):
+        with pytest.raises(ProtocolError):
+            decode_payload(b"[1, 2]")
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(HEADER.pack(MAX_FRAME + 1))
+            with pytest.raises(ProtocolError, match="exceeds"):
+                recv_frame(b)
+
+
+@pytest.fixture
+def socket_path():
+    """Short socket path (AF_UNIX paths are limited to ~100 bytes)."""
+    directory = tempfile.mkdtemp(prefix="t221b-")
+    yield Path(directory) / "d.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path, tmp_path, monkeypatch):
+    """AgentServer serving FakeAgent from a background event loop."""
+    monkeypatch.delenv("LICENSE_KEY", raising=False)
+    registry = AgentRegistry((AgentSpec("fake", "src.agents.fake:FakeAgent", min_tier=LicenseTier.FREE),
+                              AgentSpec("pro", "src.agents.fake:FakeAgent")), discover=False)
+    manager = LicenseManager(ledger=UsageLedger(tmp_path / "usage.db"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        limiter = TierRateLimiter(LicenseTier.FREE, rates=UNTHROTTLED)
+        server = AgentServer(socket_path, manager=manager, registry=registry, limiter=limiter)
+        await server.start()
+        return server
+
+    server = asyncio.run_coroutine_threadsafe(start(), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+class TestAgentServer:
+    """Test requests against a live daemon."""
+
+    def test_ping_and_status(self, daemon):
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            assert client.ping()["pid"] == os.getpid()
+            status = client.status()
+        assert status["requests"] == 0
+        assert "Free" in status["license"]
+        assert (status["running"], status["queued"]) == (0, 0)
+
+    def test_stream_tokens(self, daemon):
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            tokens = list(client.stream("fake", "hello"))
+            assert tokens == FakeAgent().tokens_for("hello")
+            assert client.last_result["output"] == "".join(tokens)
+            result = client.run("fake", "again")
+        assert result["success"] and result["tokens_used"] == 16
+
+    def test_agents_are_pooled(self, daemon):
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            for i in range(3):
+                client.run("fake", f"prompt {i}")
+        pool = daemon.registry.pool("fake", LicenseTier.FREE)
+        assert (pool.created, pool.reused) == (1, 2)
+
+    def test_refusals(self, daemon):
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            with pytest.raises(DaemonError, match="Unknown agent"):
+                client.run("nobody", "x")
+            with pytest.raises(DaemonError, match="free tier"):
+                list(client.stream("pro", "x"))
+            with pytest.raises(DaemonError, match="limit 1000 per run"):
+                client.run("fake", "x", max_tokens=5000)
+            with pytest.raises(DaemonError, match="Unknown op"):
+                client.call({"op": "dance"})
+            for _ in range(5):
+                client.run("fake", "x")
+            with pytest.raises(DaemonError, match="Daily limit reached"):
+                client.run("fake", "x")
+
+    def test_failed_runs_are_refunded(self, daemon, monkeypatch):
+        async def boom(self, prompt):
+            raise RuntimeError("provider down")
+
+        monkeypatch.setattr(FakeAgent, "execute", boom)
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            result = client.run("fake", "x")
+        assert not result["success"] and result["error"] == "provider down"
+        assert daemon.manager.daily_runs == 0
+
+    def test_runs_take_the_tier_run_rate(self, daemon):
+        daemon.limiter = TierRateLimiter(LicenseTier.FREE)
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            client.run("fake", "one")
+            client.run("fake", "two")
+        assert daemon.limiter.runs.available() < 1  # burst of 2 used up
+
+    def test_streamed_tokens_charge_the_run_budget(self, daemon):
+        daemon.limiter = tight_limiter(4)
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            tokens = list(client.stream("fake", "hello"))
+            result = client.last_result
+        assert len(tokens) == 4
+        assert not result["success"] and "limit 4 per run" in result["error"]
+        assert daemon.manager.daily_runs == 0
+
+    def test_runs_abandoned_while_queued_are_not_charged(self, daemon):
+        loop = daemon._server.get_loop()
+        ticket = asyncio.run_coroutine_threadsafe(daemon.scheduler.acquire(LicenseTier.FREE), loop).result(5)
+        daemon.scheduler.max_concurrent = 1
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(daemon.path))
+        sock.sendall(encode_frame({"op": "run", "agent": "fake", "prompt": "x"}))
+        sock.close()
+        for _ in range(200):
+            if daemon.scheduler.depth():
+                break
+            time.sleep(0.01)
+        assert daemon.scheduler.depth() == 1
+        loop.call_soon_threadsafe(daemon.scheduler.release, ticket)
+        for _ in range(200):
+            if not daemon.scheduler.depth() and not daemon.scheduler.active:
+                break
+            time.sleep(0.01)
+        assert (daemon.requests, daemon.manager.daily_runs) == (1, 0)
+        assert daemon.scheduler.stats()["free"]["admitted"] == 2
+
+    def test_refuses_second_daemon(self, daemon):
+        with pytest.raises(RuntimeError, match="already listening"):
+            asyncio.run(AgentServer(daemon.path, manager=daemon.manager).start())
+
+    def test_shutdown_removes_socket(self, daemon):
+        with DaemonClient.connect(daemon.path, timeout=5) as client:
+            client.shutdown()
+        for _ in range(100):
+            if not daemon.path.exists():
+                break
+            time.sleep(0.01)
+        assert not daemon.path.exists()
+        assert DaemonClient.connect(daemon.path) is None
+
+    def test_replaces_stale_socket(self, socket_path):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(socket_path))
+        stale.close()
+
+        async def start_and_ping():
+            server = AgentServer(socket_path, manager=LicenseManager())
+            await server.start()
+            reader, writer = await asyncio.open_unix_connection(str(socket_path))
+            writer.write(encode_frame({"op": "ping"}))
+            header = await reader.readexactly(HEADER.size)
+            frame = decode_payload(await reader.readexactly(HEADER.unpack(header)[0]))
+            writer.close()
+            await server.close()
+            return frame
+
+        assert asyncio.run(start_and_ping())["type"] == "pong"
+
+
+class TestRunClient:
+    """`terminal221b run` should use a running daemon transparently."""
+
+    def test_run_goes_through_daemon(self, daemon, monkeypatch):
+        monkeypatch.setenv("TERMINAL221B_SOCKET", str(daemon.path))
+        result = CliRunner().invoke(cli, ["run", "--agent", "fake", "--prompt", "hello"], obj={})
+        assert result.exit_code == 0, result.output
+        assert result.output.strip() == "".join(FakeAgent().tokens_for("hello")).strip()
+        assert daemon.requests == 1
+
+    def test_daemon_errors_reported(self, daemon, monkeypatch):
+        monkeypatch.setenv("TERMINAL221B_SOCKET", str(daemon.path))
+        result = CliRunner().invoke(cli, ["run", "--agent", "pro", "--prompt", "hello"], obj={})
+        assert result.exit_code == 1
+        assert "not available in the free tier" in result.output
+
+    def test_max_tokens_sent_for_admission(self, daemon, monkeypatch):
+        monkeypatch.setenv("TERMINAL221B_SOCKET", str(daemon.path))
+        args = ["run", "--agent", "fake", "--prompt", "hello", "--max-tokens"]
+        result = CliRunner().invoke(cli, args + ["5000"], obj={})
+        assert result.exit_code == 1
+        assert "limit 1000 per run" in result.output
+        assert CliRunner().invoke(cli, args + ["800"], obj={}).exit_code == 0
+        assert daemon.scheduler.stats()["free"]["admitted"] == 1
+
+    def test_no_daemon_flag_runs_locally(self, daemon, monkeypatch):
+        monkeypatch.setenv("TERMINAL221B_SOCKET", str(daemon.path))
+        result = CliRunner().invoke(cli, ["run", "--prompt", "hi", "--no-daemon"], obj={})
+        assert result.exit_code == 0
+        assert "Starting analyst agent" in result.output
+        assert daemon.requests == 0
+
+    def test_local_runs_charge_the_run_budget(self, capsys):
+        assert run_local(FakeAgent, AgentContext(), "hello", tight_limiter(4)) == 1
+        assert "limit 4 per run" in capsys.readouterr().err
+        assert run_local(FakeAgent, AgentContext(), "hello", tight_limiter(16)) == 0
+
+    def test_client_path_stays_thin(self, daemon):
+        """The client process should not import the agent stack or Rich."""
+        probe = (
+            "import json, sys\n"
+            "sys.argv = ['terminal221b', 'run', '-a', 'fake', '-p', 'hi']\n"
+            "from src.main import main\n"
+            "try:\n    main()\nexcept SystemExit:\n    pass\n"
+            "print(json.dumps(sorted(sys.modules)))\n"
+        )
+        env = dict(os.environ, TERMINAL221B_SOCKET=str(daemon.path))
+        proc = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, env=env,
+                              capture_output=True, text=True, check=True, timeout=30)
+        modules = set(json.loads(proc.stdout.strip().splitlines()[-1]))
+        assert daemon.requests == 1
+        for heavy in ("pydantic", "rich", "utils.license", "src.agents"):
+            assert heavy not in modules
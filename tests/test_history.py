@@ -0,0 +1,137 @@
+"""Tests for token-budgeted conversation history."""
+
+import pytest
+
+from src.agents.base import AgentContext, AgentMessage, AgentResult, BaseAgent
+from src.agents.history import SUMMARY_KEY, ConversationHistory, history_budget
+
+
+def words(text):
+    """Token counter used in tests: one token per word."""
+    return len(text.split())
+
+
+def msg(content, role="user"):
+    return AgentMessage(role=role, content=content)
+
+
+class EchoAgent(BaseAgent):
+    name = "echo"
+    description = "an echo agent"
+
+    async def execute(self, prompt):
+        return AgentResult(success=True, output=prompt)
+
+    async def stream(self, prompt):
+        yield prompt
+
+
+class CountingList(list):
+    """List that counts front deletions, to check compaction is batched."""
+
+    deletes = 0
+
+    def __delitem__(self, key):
+        CountingList.deletes += 1
+        super().__delitem__(key)
+
+
+class TestBudget:
+    """Test eviction against the token budget."""
+
+    def test_unbounded_keeps_everything(self):
+        """Without a budget nothing should be evicted."""
+        history = ConversationHistory(count_tokens=words)
+        for i in range(100):
+            history.append(msg(f"turn {i}"))
+        assert len(history.messages) == 100
+        assert history.total_tokens == 200
+
+    def test_budget_enforced(self):
+        """Total tokens should never exceed the budget."""
+        history = ConversationHistory(budget=20, count_tokens=words)
+        for i in range(200):
+            history.append(msg(f"turn number {i}"))
+            assert history.total_tokens <= 20
+        assert history.messages[-1].content == "turn number 199"
+        assert history.evicted == 200 - len(history.messages)
+
+    def test_compaction_is_batched(self):
+        """Eviction should drop down to the low watermark, not one message at a time."""
+        CountingList.deletes = 0
+        history = ConversationHistory(CountingList(), budget=100, count_tokens=words, low_watermark=0.5)
+        for i in range(1000):
+            history.append(msg("one two"))
+        # every compaction frees ~half the budget (~25 messages)
+        assert 0 < CountingList.deletes <= 1000 // 20
+
+    def test_newest_message_always_kept(self):
+        """A single oversized message should still be kept."""
+        history = ConversationHistory(budget=3, count_tokens=words)
+        history.append(msg("a b c d e f"))
+        assert len(history.messages) == 1
+
+    def test_system_prompt_counts_and_is_pinned(self):
+        """The system prompt should count against the budget and lead the prompt."""
+        history = ConversationHistory(budget=10, system_prompt="you are a bot", count_tokens=words)
+        for i in range(20):
+            history.append(msg("hello there"))
+        assert history.system_tokens == 4
+        assert history.total_tokens <= 10
+        prompt = history.prompt_messages()
+        assert prompt[0].role == "system"
+        assert prompt[0].content == "you are a bot"
+
+    def test_history_budget_helper(self):
+        """Budget should reserve room for the completion."""
+        assert history_budget(10000, 1000) == 9000
+        assert history_budget(-1, 1000) is None
+        assert history_budget(500, 1000) == 0
+
+    def test_invalid_watermark(self):
+        with pytest.raises(ValueError):
+            ConversationHistory(low_watermark=0)
+
+
+class TestSummarization:
+    """Test the summarization hook."""
+
+    def test_summary_replaces_evicted_turns(self):
+        """Evicted turns should be folded into one pinned summary message."""
+        calls = []
+
+        def summarize(evicted):
+            calls.append(evicted)
+            return f"summary of {sum(1 for m in evicted if m.role != 'system')} turns"
+
+        history = ConversationHistory(budget=30, count_tokens=words, summarizer=summarize)
+        for i in range(50):
+            history.append(msg(f"turn {i} here"))
+        head = history.messages[0]
+        assert head.role == "system"
+        assert head.metadata[SUMMARY_KEY] is True
+        assert history.total_tokens <= 30
+        # later summaries see the previous summary so they can merge it
+        assert any(m.metadata and m.metadata.get(SUMMARY_KEY) for m in calls[-1])
+
+
+class TestAgentIntegration:
+    """Test BaseAgent wiring."""
+
+    def test_add_message_respects_context_budget(self):
+        """BaseAgent.add_message should enforce context.history_budget."""
+        agent = EchoAgent(AgentContext(history_budget=50))
+        for i in range(500):
+            agent.add_message("user", "x" * 40)
+        assert agent.history.total_tokens <= 50
+        assert agent.context.messages is agent.history.messages
+        assert agent.history.system_prompt == "You are echo, an echo agent."
+
+    def test_clear_history_rebinds(self):
+        """Clearing should reset history and keep tracking the new list."""
+        agent = EchoAgent()
+        agent.add_message("user", "hello")
+        agent.clear_history()
+        agent.add_message("user", "again")
+        assert [m.content for m in agent.context.messages] == ["again"]
+        assert agent.history.messages is agent.context.messages
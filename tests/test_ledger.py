@@ -0,0 +1,160 @@
+"""Tests for the persistent usage ledger."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from utils.ledger import UsageLedger, default_ledger_path
+from utils.license import LicenseManager, LicenseTier
+
+
+def _acquire_many(path, attempts, limit):
+    """Worker: try to take ``attempts`` runs and report how many were granted."""
+    ledger = UsageLedger(path)
+    granted = sum(ledger.try_acquire("free", limit)[0] for _ in range(attempts))
+    ledger.close()
+    return granted
+
+
+class TestUsageLedger:
+    """Test check-and-increment semantics."""
+
+    def test_limit_enforced(self, tmp_path):
+        """Runs beyond the daily limit should be refused."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        results = [ledger.try_acquire("free", 3) for _ in range(5)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False, False]
+        assert results[2][1] == 3
+
+    def test_unlimited(self, tmp_path):
+        """A limit of -1 should never refuse."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        for _ in range(50):
+            assert ledger.try_acquire("enterprise", -1)[0] is True
+        assert ledger.runs_today("enterprise") == 50
+
+    def test_persists_across_instances(self, tmp_path):
+        """A fresh process should see runs recorded by earlier ones."""
+        path = tmp_path / "usage.db"
+        with UsageLedger(path) as ledger:
+            ledger.try_acquire("free", 5)
+            ledger.try_acquire("free", 5)
+        assert UsageLedger(path).runs_today("free") == 2
+
+    def test_per_day_buckets(self, tmp_path):
+        """Each day should get its own bucket."""
+        today = [date(2026, 1, 1)]
+        ledger = UsageLedger(tmp_path / "usage.db", today=lambda: today[0])
+        assert ledger.try_acquire("free", 1)[0] is True
+        assert ledger.try_acquire("free", 1)[0] is False
+        today[0] = date(2026, 1, 2)
+        assert ledger.try_acquire("free", 1)[0] is True
+
+    def test_accounts_are_separate(self, tmp_path):
+        """Different accounts should not share a bucket."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        assert ledger.try_acquire("free", 1)[0] is True
+        assert ledger.try_acquire("pro", 1)[0] is True
+
+    def test_bulk_reserve_partial(self, tmp_path):
+        """Bulk reservations should be capped at the remaining budget."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        assert ledger.reserve("pro", 10, 4) == (4, 4)
+        assert ledger.reserve("pro", 10, 20) == (6, 10)
+        assert ledger.reserve("pro", 10, 1) == (0, 10)
+
+    def test_invalid_lease_size(self, tmp_path):
+        """Lease size must be positive."""
+        with pytest.raises(ValueError):
+            UsageLedger(tmp_path / "usage.db", lease_size=0)
+
+
+class TestLeasedLedger:
+    """Test batched (leased) reservations."""
+
+    def test_lease_batches_writes(self, tmp_path):
+        """Leased runs should be handed out without touching the database."""
+        path = tmp_path / "usage.db"
+        ledger = UsageLedger(path, lease_size=10)
+        assert ledger.try_acquire("pro", 100) == (True, 1)
+        # The whole block is reserved in the shared ledger up front
+        assert UsageLedger(path).runs_today("pro") == 10
+        for _ in range(4):
+            ledger.try_acquire("pro", 100)
+        assert ledger.runs_today("pro") == 5
+
+    def test_close_returns_unused_lease(self, tmp_path):
+        """Closing should give unused leased runs back."""
+        path = tmp_path / "usage.db"
+        ledger = UsageLedger(path, lease_size=10)
+        for _ in range(3):
+            ledger.try_acquire("pro", 100)
+        ledger.close()
+        assert UsageLedger(path).runs_today("pro") == 3
+
+    def test_release_returns_unused_runs(self, tmp_path):
+        """Released runs should be reused, then returned on close."""
+        path = tmp_path / "usage.db"
+        ledger = UsageLedger(path)
+        assert ledger.reserve("free", 5, 5)[0] == 5
+        ledger.release("free", 3)
+        assert ledger.try_acquire("free", 5)[0] is True
+        ledger.close()
+        assert UsageLedger(path).runs_today("free") == 3
+
+    def test_lease_respects_limit(self, tmp_path):
+        """A lease should never reserve past the daily limit."""
+        ledger = UsageLedger(tmp_path / "usage.db", lease_size=10)
+        granted = sum(ledger.try_acquire("free", 5)[0] for _ in range(8))
+        assert granted == 5
+
+
+class TestMultiProcess:
+    """The limit must hold across concurrent worker processes."""
+
+    def test_concurrent_workers_share_limit(self, tmp_path):
+        """Workers racing for runs should never exceed the limit together."""
+        path = str(tmp_path / "usage.db")
+        UsageLedger(path).runs_today("free")  # create schema up front
+        with ProcessPoolExecutor(max_workers=8) as pool:
+            granted = list(pool.map(_acquire_many, [path] * 8, [10] * 8, [25] * 8))
+        assert sum(granted) == 25
+        assert UsageLedger(path).runs_today("free") == 25
+
+
+class TestLicenseManagerLedger:
+    """Test LicenseManager backed by a ledger."""
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_limit_shared_between_managers(self, tmp_path):
+        """Two managers on one ledger should share the free tier limit."""
+        path = tmp_path / "usage.db"
+        first = LicenseManager(ledger=UsageLedger(path))
+        second = LicenseManager(ledger=UsageLedger(path))
+        assert first.tier == LicenseTier.FREE
+        for _ in range(3):
+            assert first.can_run()[0] is True
+        for _ in range(2):
+            assert second.can_run()[0] is True
+        can_run, msg = second.can_run()
+        assert can_run is False
+        assert "Daily limit reached (5/5 runs)" in msg
+        assert first.can_run()[0] is False
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_reserve_runs_in_bulk(self, tmp_path):
+        """Bulk reservations should be capped by, and count towards, the limit."""
+        manager = LicenseManager(ledger=UsageLedger(tmp_path / "usage.db"))
+        assert manager.reserve_runs(4) == 4
+        assert manager.reserve_runs(4) == 1
+        manager.release_runs(2)
+        assert manager.daily_runs == 3
+        assert manager.can_run()[0] is True
+
+    def test_default_path_from_env(self, tmp_path, monkeypatch):
+        """TERMINAL221B_LEDGER should override the default location."""
+        monkeypatch.setenv("TERMINAL221B_LEDGER", str(tmp_path / "x.db"))
+        assert default_ledger_path() == tmp_path / "x.db"
@@ -0,0 +1,233 @@
+"""Tests for signed license tokens."""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from utils import license_token
+from utils.license import LicenseManager, LicenseTier
+from utils.license_token import (
+    LicenseCache,
+    LicenseClaims,
+    LicenseError,
+    LicenseVerifier,
+    http_endpoint,
+    public_key_for,
+    sign_token,
+)
+
+SEED = bytes(range(32))
+OTHER_SEED = bytes(range(1, 33))
+
+
+def token(tier="pro", expires_at=None, seed=SEED, subject="sherlock@example.com"):
+    return sign_token(LicenseClaims(tier, subject, issued_at=1, expires_at=expires_at), seed)
+
+
+@pytest.fixture
+def verifier(tmp_path):
+    return LicenseVerifier(public_keys=[public_key_for(SEED)], cache=LicenseCache(tmp_path / "cache.json"))
+
+
+@pytest.fixture
+def stub_server():
+    """License refresh server answering with whatever ``reply`` holds."""
+    state = {"reply": {}, "requests": [], "delay": 0.0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            state["requests"].append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            time.sleep(state["delay"])
+            body = json.dumps(state["reply"]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/refresh"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+class TestSignatures:
+    """Test ed25519 signing and verification."""
+
+    def test_rfc8032_vector(self):
+        seed = bytes.fromhex("9d61b19deffd5a60ba844af492ec2cc44449c5697b326919703bac031cae7f60")
+        public = bytes.fromhex("d75a980182b10ab7d54bfed3c964073a0ee172f3daa62325af021a68f707511a")
+        signature = license_token._py_sign(seed, b"")
+        assert license_token._py_public_key(seed) == public
+        assert signature.hex().startswith("e5564300c360ac72")
+        assert license_token._py_verify(public, b"", signature)
+        assert not license_token._py_verify(public, b"x", signature)
+
+    def test_round_trip(self, verifier):
+        claims = verifier.verify(token(expires_at=int(time.time()) + 60))
+        assert (claims.tier, claims.subject) == ("pro", "sherlock@example.com")
+
+    def test_rejects_forgeries(self, verifier):
+        good = token()
+        body, signature = good[len("t221b1."):].split(".")
+        tampered = license_token._b64encode(
+            json.dumps({"tier": "enterprise", "subject": "", "issued_at": 1, "expires_at": None}).encode()
+        )
+        with pytest.raises(LicenseError, match="signature"):
+            verifier.verify(f"t221b1.{tampered}.{signature}")
+        with pytest.raises(LicenseError, match="signature"):
+            verifier.verify(token(seed=OTHER_SEED))
+        with pytest.raises(LicenseError, match="Malformed"):
+            verifier.verify("t221b1.nonsense")
+        with pytest.raises(LicenseError, match="expired"):
+            verifier.verify(token(expires_at=int(time.time()) - 1))
+
+
+class TestCache:
+    """Test the on-disk verification cache."""
+
+    def test_cache_is_never_trusted_for_claims(self, verifier):
+        forged = "t221b1.AAAA.BBBB"
+        verifier.cache.path.write_text(json.dumps({verifier.cache.key_for(forged): {
+            "claims": {"tier": "enterprise"}, "token": forged, "refreshed_at": time.time(),
+        }}))
+        with pytest.raises(LicenseError):
+            verifier.check(forged)
+
+    def test_cached_renewal_must_verify(self, verifier):
+        key = token()
+        verifier.check(key)
+        verifier.cache.put(key, {"token": token(tier="enterprise", seed=OTHER_SEED), "refreshed_at": 0})
+        with pytest.raises(LicenseError, match="signature"):
+            verifier.check(key)
+        assert verifier.check(key).tier == "pro"  # bad entry dropped
+
+    def test_expiry_is_checked_on_every_call(self, verifier):
+        now = [1000.0]
+        verifier._clock = lambda: now[0]
+        key = token(expires_at=5000)
+        verifier.check(key)
+        now[0] = 6000.0
+        with pytest.raises(LicenseError, match="expired"):
+            verifier.check(key)
+        assert verifier.cache.get(key) is None
+
+    def test_corrupt_cache_is_ignored(self, verifier):
+        verifier.cache.path.write_text("{not json")
+        assert verifier.check(token()).tier == "pro"
+
+
+class TestRefresh:
+    """Test online refresh against a stub server."""
+
+    def test_renewal(self, verifier, stub_server):
+        key = token(expires_at=int(time.time()) + 60)
+        verifier.endpoint = http_endpoint(stub_server["url"])
+        verifier.check(key)
+        stub_server["reply"] = {"token": token(tier="enterprise", expires_at=int(time.time()) + 3600)}
+        verifier.refresh_in_background(key).join(5)
+        assert stub_server["requests"] == [{"token": key}]
+        assert verifier.check(key).tier == "enterprise"
+        assert verifier.refresh_in_background(key) is None  # not due again yet
+
+    def test_revocation(self, verifier, stub_server):
+        key = token()
+        verifier.endpoint = http_endpoint(stub_server["url"])
+        verifier.check(key)
+        stub_server["reply"] = {"revoked": True}
+        assert verifier.refresh(key) is None
+        with pytest.raises(LicenseError, match="revoked"):
+            verifier.check(key)  # the signature is still valid offline
+        stub_server["reply"] = {"token": key}
+        assert verifier.refresh(key).tier == "pro"  # reinstated by the server
+        assert verifier.check(key).tier == "pro"
+
+    def test_refresh_finishes_when_process_exits_right_away(self, tmp_path, stub_server):
+        """A short CLI command exiting mid-refresh should still apply the server's reply."""
+        key = token(expires_at=int(time.time()) + 60)
+        stub_server["reply"] = {"token": token(tier="enterprise", expires_at=int(time.time()) + 3600)}
+        stub_server["delay"] = 0.5
+        cache = tmp_path / "cache.json"
+        script = (
+            "import sys\n"
+            "from utils.license_token import LicenseCache, LicenseVerifier, http_endpoint, public_key_for\n"
+            "v = LicenseVerifier([public_key_for(bytes(range(32)))], LicenseCache(sys.argv[1]),"
+            " http_endpoint(sys.argv[2]))\n"
+            "v.check(sys.argv[3])\n"
+            "v.refresh_in_background(sys.argv[3])\n"
+        )
+        subprocess.run([sys.executable, "-c", script, str(cache), stub_server["url"], key],
+                       cwd=Path(__file__).parent.parent, check=True, timeout=30)
+        verifier = LicenseVerifier(public_keys=[public_key_for(SEED)], cache=LicenseCache(cache))
+        assert verifier.check(key).tier == "enterprise"
+        assert not verifier.refresh_due(key)
+
+    def test_failed_attempt_is_not_retried_every_start(self, verifier):
+        key = token()
+        def offline(key):
+            raise OSError("network unreachable")
+
+        verifier.endpoint = offline
+        verifier.check(key)
+        verifier.refresh_in_background(key).join(5)
+        assert verifier.cache.get(key)["refreshed_at"] == 0
+        assert verifier.refresh_in_background(key) is None
+
+    def test_offline_keeps_cache(self, verifier):
+        key = token()
+        verifier.endpoint = http_endpoint("http://127.0.0.1:9/unreachable", timeout=1)
+        verifier.check(key)
+        assert verifier.refresh(key) is None
+        assert verifier.cache.get(key) is not None
+
+
+class TestLicenseManager:
+    """Test signed tokens through LicenseManager."""
+
+    def test_signed_token_activates_tier(self, verifier, monkeypatch):
+        monkeypatch.setenv("LICENSE_KEY", token(tier="enterprise"))
+        gate = threading.Event()
+        verifier.endpoint = lambda key: gate.wait(5) and {}
+        start = time.perf_counter()
+        manager = LicenseManager(verifier=verifier)
+        assert time.perf_counter() - start < 1  # refresh never blocks startup
+        assert manager.tier == LicenseTier.ENTERPRISE
+        assert manager.refresh_thread.is_alive()
+        gate.set()
+        manager.refresh_thread.join(5)
+
+    def test_invalid_token_falls_back_to_free(self, verifier, monkeypatch):
+        monkeypatch.setenv("LICENSE_KEY", token(seed=OTHER_SEED))
+        manager = LicenseManager(verifier=verifier)
+        assert manager.tier == LicenseTier.FREE
+        assert manager.claims is None
+
+    def test_revoked_token_falls_back_to_free(self, verifier, monkeypatch):
+        key = token(tier="enterprise")
+        verifier.endpoint = lambda k: {"revoked": True}
+        verifier.check(key)
+        verifier.refresh(key)
+        monkeypatch.setenv("LICENSE_KEY", key)
+        assert LicenseManager(verifier=verifier).tier == LicenseTier.FREE
+
+    def test_untrusted_by_default(self, monkeypatch):
+        """Tokens not signed by the shipped key are rejected."""
+        monkeypatch.setenv("LICENSE_KEY", token())
+        assert LicenseManager().tier == LicenseTier.FREE
+
+    def test_keys_from_environment(self, monkeypatch):
+        monkeypatch.setenv("TERMINAL221B_LICENSE_KEYS", f" {public_key_for(SEED).hex()} ,")
+        monkeypatch.setenv("LICENSE_KEY", token())
+        assert LicenseManager().tier == LicenseTier.PRO
@@ -0,0 +1,88 @@
+"""Tests for the compact message log."""
+
+import io
+
+import pytest
+
+from src.agents.base import AgentMessage
+from src.agents.message_log import MessageLog, MessageView
+
+
+def sample():
+    return [
+        AgentMessage(role="system", content="You are analyst."),
+        AgentMessage(role="user", content="Héllo wörld ✓"),
+        AgentMessage(role="assistant", content="", metadata={"tokens": 0}),
+        AgentMessage(role="user", content="second turn"),
+    ]
+
+
+class TestStorage:
+    """Test buffers and views."""
+
+    def test_views_match_messages(self):
+        """Views should expose the same fields as the original messages."""
+        messages = sample()
+        log = MessageLog(messages)
+        assert len(log) == 4
+        for view, message in zip(log, messages):
+            assert isinstance(view, MessageView)
+            assert view == message
+            assert view.to_message() == message
+
+    def test_roles_interned_and_metadata_sparse(self):
+        """Roles should be stored once and metadata only where present."""
+        log = MessageLog()
+        for i in range(1000):
+            log.append("user" if i % 2 else "assistant", f"msg {i}")
+        log.append("user", "tagged", {"id": 7})
+        assert log._roles == ["assistant", "user"]
+        assert list(log._metadata) == [1000]
+        assert log[-1].metadata == {"id": 7}
+        assert log[3].metadata is None
+
+    def test_indexing(self):
+        """Negative indices and slices should work; out of range should raise."""
+        log = MessageLog(sample())
+        assert log[-1].content == "second turn"
+        assert [v.role for v in log[1:3]] == ["user", "assistant"]
+        with pytest.raises(IndexError):
+            log[4]
+
+    def test_model_dump_shape(self):
+        """model_dump should match AgentMessage.model_dump."""
+        message = sample()[2]
+        assert MessageLog([message])[0].model_dump() == message.model_dump()
+
+    def test_nbytes_smaller_than_content_plus_overhead(self):
+        """Storage should be close to the raw content size."""
+        log = MessageLog()
+        for i in range(100):
+            log.append("user", "x" * 10)
+        assert log.nbytes == 1000 + 8 * 101 + 2 * 100
+
+
+class TestSerialization:
+    """Test bulk JSONL and msgpack round trips."""
+
+    def test_jsonl_round_trip(self):
+        """JSONL dumps should load back identically."""
+        log = MessageLog(sample())
+        buf = io.StringIO()
+        log.dump_jsonl(buf)
+        assert len(buf.getvalue().splitlines()) == 4
+        buf.seek(0)
+        loaded = MessageLog.load_jsonl(buf)
+        assert loaded.to_messages() == sample()
+
+    def test_msgpack_round_trip(self):
+        """msgpack dumps should load back identically."""
+        pytest.importorskip("msgpack")
+        log = MessageLog(sample())
+        buf = io.BytesIO()
+        log.dump_msgpack(buf)
+        buf.seek(0)
+        loaded = MessageLog.load_msgpack(buf)
+        assert loaded.to_messages() == sample()
+        loaded.append("user", "more")
+        assert loaded._roles.count("user") == 1
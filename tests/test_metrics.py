@@ -0,0 +1,171 @@
+"""Tests for hot-path metrics."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.fake import FakeAgent, FakeProviderError
+from src.main import cli
+from utils import metrics
+from utils.license import LicenseManager
+from utils.metrics import Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def recording():
+    """Enable metrics for one test and reset afterwards."""
+    metrics.registry.clear()
+    metrics.enable(True)
+    yield metrics.registry
+    metrics.enable(False)
+    metrics.registry.clear()
+
+
+class TestHistogram:
+    """Test bucketed histograms."""
+
+    def test_percentiles_from_buckets(self):
+        hist = Histogram((1, 2, 5, 10))
+        for value in [0.5] * 50 + [4] * 45 + [20] * 5:
+            hist.observe(value)
+        assert hist.count == 100
+        assert hist.percentile(50) == 1
+        assert hist.percentile(95) == 5
+        assert hist.percentile(99) == 20
+        assert hist.mean == pytest.approx((25 + 180 + 100) / 100)
+
+    def test_merge(self):
+        a, b = Histogram((1, 2)), Histogram((1, 2))
+        a.observe(0.5)
+        b.observe(1.5)
+        a.merge(b)
+        assert a.counts == [1, 1, 0]
+        assert (a.min, a.max) == (0.5, 1.5)
+        with pytest.raises(ValueError):
+            a.merge(Histogram((1,)))
+
+    def test_round_trip(self):
+        hist = Histogram()
+        hist.observe(0.003)
+        again = Histogram.from_dict(hist.to_dict())
+        assert again.to_dict() == hist.to_dict()
+
+
+class TestRegistry:
+    """Test labels, snapshots and export."""
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry()
+        registry.default_labels = {"tier": "pro"}
+        registry.observe("agent_latency_seconds", 0.01, agent="fake")
+        text = registry.to_prometheus()
+        assert "# TYPE terminal221b_agent_latency_seconds histogram" in text
+        assert 'terminal221b_agent_latency_seconds_bucket{agent="fake",tier="pro",le="+Inf"} 1' in text
+        assert 'terminal221b_agent_latency_seconds_count{agent="fake",tier="pro"} 1' in text
+        assert text.endswith("# EOF\n")
+
+    def test_snapshot_merges_across_processes(self, recording, tmp_path):
+        """Saved snapshots should accumulate rather than overwrite."""
+        path = tmp_path / "m.json"
+        for _ in range(2):
+            metrics.observe("cli_startup_seconds", 0.05)
+            metrics.save_snapshot(path)
+        loaded = metrics.load_snapshot(path)
+        assert loaded.histogram("cli_startup_seconds").count == 2
+
+
+class TestInstrumentation:
+    """Test instrumented hot paths."""
+
+    def test_disabled_is_passthrough(self):
+        """With metrics off nothing should be recorded."""
+        metrics.registry.clear()
+        metrics.observe("cli_startup_seconds", 1.0)
+        with metrics.timer("cli_startup_seconds"):
+            pass
+        assert not metrics.registry.histograms
+
+    @pytest.mark.asyncio
+    async def test_agent_execute_and_stream(self, recording):
+        """Agent calls should record latency, TTFT and token metrics."""
+        agent = FakeAgent(output_tokens=8)
+        await agent.execute("p")
+        chunks = [c async for c in agent.stream("p")]
+        assert len(chunks) == 8
+        latency = recording.histogram("agent_latency_seconds", agent="fake")
+        assert latency.count == 2
+        assert recording.histogram("agent_ttft_seconds", agent="fake").count == 1
+        assert recording.histogram("agent_tokens_used", agent="fake").sum == 16
+
+    @pytest.mark.asyncio
+    async def test_super_call_counted_once(self, recording):
+        """An override calling super().execute should be counted once."""
+
+        class Wrapped(FakeAgent):
+            name = "wrapped"
+
+            async def execute(self, prompt):
+                return await super().execute(prompt)
+
+        await Wrapped().execute("p")
+        assert recording.histogram("agent_latency_seconds", agent="wrapped").count == 1
+        assert recording.histogram("agent_latency_seconds", agent="fake").count == 0
+
+    @pytest.mark.asyncio
+    async def test_super_stream_counted_once(self, recording):
+        """An override delegating to super().stream should be counted once."""
+
+        class Wrapped(FakeAgent):
+            name = "wrapped"
+
+            async def stream(self, prompt):
+                async for chunk in super().stream(prompt):
+                    yield chunk
+
+        other = FakeAgent()
+        async for _ in Wrapped(output_tokens=4).stream("p"):
+            await other.execute("between chunks")  # the consumer's own calls still count
+        assert recording.histogram("agent_latency_seconds", agent="wrapped").count == 1
+        assert recording.histogram("agent_tokens_used", agent="wrapped").sum == 4
+        assert recording.histogram("agent_latency_seconds", agent="fake").count == 4
+
+    @pytest.mark.asyncio
+    async def test_failures_record_latency(self, recording):
+        agent = FakeAgent(error_rate=1.0)
+        with pytest.raises(FakeProviderError):
+            await agent.execute("p")
+        with pytest.raises(FakeProviderError):
+            async for _ in agent.stream("p"):
+                pass
+        assert recording.histogram("agent_latency_seconds", agent="fake").count == 2
+        assert recording.histogram("agent_tokens_used", agent="fake").count == 0
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_can_run_timed(self, recording):
+        manager = LicenseManager()
+        manager.can_run()
+        assert recording.histogram("license_can_run_seconds", tier="free").count == 1
+
+
+class TestStatsCommand:
+    """Test `terminal221b stats`."""
+
+    def test_empty(self):
+        result = CliRunner().invoke(cli, ["stats"], obj={})
+        assert result.exit_code == 0
+        assert "No metrics recorded" in result.output
+
+    def test_table_and_export(self, recording, tmp_path):
+        metrics.observe("agent_latency_seconds", 0.02, agent="fake")
+        metrics.save_snapshot()
+        result = CliRunner().invoke(cli, ["stats"], obj={})
+        assert result.exit_code == 0
+        assert "20.00ms" in result.output
+        out = tmp_path / "t221b.prom"
+        result = CliRunner().invoke(cli, ["stats", "--prometheus", str(out)], obj={})
+        assert result.exit_code == 0
+        assert "terminal221b_agent_latency_seconds_count" in out.read_text()
+        CliRunner().invoke(cli, ["stats", "--reset"], obj={})
+        assert not metrics.snapshot_path().exists()
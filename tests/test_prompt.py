@@ -0,0 +1,95 @@
+"""Tests for prefix-stable prompt assembly."""
+
+import pytest
+
+from src.agents.base import AgentContext, AgentMessage
+from src.agents.prompt import PromptAssembler
+from src.agents.tokens import TokenCounter
+from src.providers.chat import ChatCompletionsProvider
+
+SYSTEM = "You are Sherlock Holmes."
+
+
+def turn(history, prompt, reply):
+    history.append(AgentMessage(role="user", content=prompt))
+    history.append(AgentMessage(role="assistant", content=reply))
+
+
+@pytest.fixture
+def assembler():
+    return PromptAssembler(count_tokens=TokenCounter("estimate"))
+
+
+class TestAssembly:
+    """Test layout, fingerprints and breakpoints."""
+
+    def test_layout_and_breakpoints(self, assembler):
+        prompt = assembler.assemble(SYSTEM, [], "Who?")
+        assert [(m.role, m.content) for m in prompt.messages] == [("system", SYSTEM), ("user", "Who?")]
+        assert prompt.breakpoints == [0, 1]
+        assert prompt.cached_segments == 0
+
+    def test_prefix_is_reused_across_turns(self, assembler):
+        history = []
+        first = assembler.assemble(SYSTEM, history, "Who?")
+        turn(history, "Who?", "Moriarty.")
+        second = assembler.assemble(SYSTEM, history, "Where?")
+        # System prompt and the previous user turn were the last prompt's breakpoints
+        assert second.cached_segments == 2
+        assert second.messages[0] is first.messages[0]  # byte-stable, same object
+        assert second.segments[1].fingerprint == first.segments[1].fingerprint
+        assert second.breakpoints == [0, 1, 3]
+        assert second.cached_tokens == sum(s.tokens for s in first.segments)
+
+    def test_changed_history_breaks_only_the_suffix(self, assembler):
+        history = []
+        turn(history, "a", "b")
+        turn(history, "c", "d")
+        assembler.assemble(SYSTEM, history, "e")
+        history[2] = AgentMessage(role="user", content="edited")
+        prompt = assembler.assemble(SYSTEM, history, "e")
+        assert prompt.cached_segments == 1  # only the system prompt survives
+        assembler.assemble("A different persona.", history, "e")
+        assert assembler.stats.requests == 3
+        assert assembler.stats.hits == 1
+
+    def test_fingerprints_depend_on_the_whole_prefix(self, assembler):
+        a = assembler.assemble(SYSTEM, [AgentMessage(role="user", content="x")], "y")
+        b = PromptAssembler(count_tokens=TokenCounter("estimate")).assemble(
+            "Other.", [AgentMessage(role="user", content="x")], "y"
+        )
+        assert a.segments[-1].fingerprint != b.segments[-1].fingerprint
+        assert a.prefix_key != b.prefix_key
+
+    def test_stats_over_a_session(self, assembler):
+        history = []
+        for i in range(5):
+            assembler.assemble(SYSTEM, history, f"q{i}")
+            turn(history, f"q{i}", f"a{i}")
+        stats = assembler.stats
+        assert (stats.requests, stats.hits) == (5, 4)
+        assert 0.5 < stats.token_hit_rate < 1
+        assert "prefix hits 4/5" in stats.summary()
+
+    def test_breakpoint_limit(self):
+        assembler = PromptAssembler(count_tokens=TokenCounter("estimate"), max_breakpoints=1)
+        assert assembler.assemble(SYSTEM, [], "x").breakpoints == [1]
+
+
+class TestProviderPayload:
+    """Test how breakpoints reach the provider."""
+
+    def test_cache_control_and_key(self, assembler):
+        provider = ChatCompletionsProvider(None, "stub", cache_control=True, prompt_cache_key=True)
+        prompt = assembler.assemble(SYSTEM, [], "Who?")
+        payload = provider._payload(prompt, AgentContext(), False)
+        assert payload["messages"][0]["content"] == [
+            {"type": "text", "text": SYSTEM, "cache_control": {"type": "ephemeral"}}
+        ]
+        assert payload["prompt_cache_key"] == prompt.prefix_key
+
+    def test_plain_by_default(self, assembler):
+        provider = ChatCompletionsProvider(None, "stub")
+        payload = provider._payload(assembler.assemble(SYSTEM, [], "Who?"), AgentContext(), False)
+        assert payload["messages"][0] == {"role": "system", "content": SYSTEM}
+        assert "prompt_cache_key" not in payload
@@ -0,0 +1,178 @@
+"""Tests for the pooled provider transport against a local stub server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from src.agents.base import AgentContext
+from src.providers import (
+    ChatCompletionsProvider,
+    ProviderAgent,
+    ProviderTransport,
+    RetryPolicy,
+    close_transports,
+    get_transport,
+    iter_sse,
+)
+from src.providers.transport import connection_limit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.peers.append(self.client_address)
+        server.payloads.append(payload)
+        if server.failures > 0:
+            server.failures -= 1
+            self._send(503, '{"error": "busy"}')
+            return
+        words = ["Hello", ", ", "Watson"]
+        if payload.get("stream"):
+            events = [
+                "data: " + json.dumps({"choices": [{"delta": {"content": w}}]}) + "\n\n"
+                for w in words
+            ]
+            self._send(200, ": keep-alive\n\n" + "".join(events) + "data: [DONE]\n\n", "text/event-stream")
+        else:
+            self._send(200, json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": "".join(words)}}],
+                "usage": {"total_tokens": 12},
+            }))
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.peers, server.payloads, server.failures = [], [], 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_transport(server, **kwargs):
+    host, port = server.server_address
+    retry = RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002)
+    return ProviderTransport(f"http://{host}:{port}/v1", http2=False, retry=retry, seed=0, **kwargs)
+
+
+class TestSSE:
+    """Test the SSE parser."""
+
+    @pytest.mark.asyncio
+    async def test_parses_fields_and_multiline_data(self):
+        async def lines():
+            for line in ["event: delta", "id: 7", "data: a", "data: b", "", ": comment", "data:c", ""]:
+                yield line
+
+        events = [e async for e in iter_sse(lines())]
+        assert [(e.event, e.id, e.data) for e in events] == [("delta", "7", "a\nb"), ("message", "7", "c")]
+
+
+class TestTransport:
+    """Test pooling and retries."""
+
+    @pytest.mark.asyncio
+    async def test_connections_reused(self, stub_server):
+        """Sequential calls should reuse one keep-alive connection."""
+        transport = make_transport(stub_server)
+        provider = ChatCompletionsProvider(transport, "stub")
+        for _ in range(5):
+            text, tokens = await provider.complete([], AgentContext())
+        await transport.aclose()
+        assert text == "Hello, Watson"
+        assert tokens == 12
+        assert len(set(stub_server.peers)) == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, stub_server):
+        """Retryable statuses should be retried until success."""
+        stub_server.failures = 2
+        transport = make_transport(stub_server)
+        response = await transport.post("/chat/completions", {"model": "stub"})
+        await transport.aclose()
+        assert response.status_code == 200
+        assert len(stub_server.payloads) == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_attempts(self, stub_server):
+        """The final failure should surface as an HTTP error."""
+        stub_server.failures = 5
+        transport = make_transport(stub_server)
+        with pytest.raises(httpx.HTTPStatusError):
+            await transport.post("/chat/completions", {"model": "stub"})
+        await transport.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_retries_before_first_event(self, stub_server):
+        """Streaming should retry a failed start and then deliver every event."""
+        stub_server.failures = 1
+        transport = make_transport(stub_server)
+        provider = ChatCompletionsProvider(transport, "stub")
+        chunks = [c async for c in provider.stream([], AgentContext())]
+        await transport.aclose()
+        assert chunks == ["Hello", ", ", "Watson"]
+
+    def test_connection_limit_follows_max_agents(self):
+        assert connection_limit(3) == 3
+        assert connection_limit(-1) == 100
+
+    @pytest.mark.asyncio
+    async def test_shared_transport_registry(self):
+        """One transport should exist per provider name."""
+        first = get_transport("stub", "http://127.0.0.1:1")
+        assert get_transport("stub", "http://other") is first
+        await close_transports()
+        assert get_transport("stub", "http://other") is not first
+        await close_transports()
+
+
+class TestProviderAgent:
+    """Test the agent on top of the provider."""
+
+    @pytest.mark.asyncio
+    async def test_execute_and_stream_share_client(self, stub_server):
+        """Agents should send history and reuse the pooled client."""
+        transport = make_transport(stub_server)
+        agent = ProviderAgent(ChatCompletionsProvider(transport, "stub"))
+        result = await agent.execute("Who?")
+        streamed = [c async for c in agent.stream("Again?")]
+        await transport.aclose()
+        assert result.success and result.output == "Hello, Watson"
+        assert "".join(streamed) == "Hello, Watson"
+        last = stub_server.payloads[-1]
+        assert last["stream"] is True
+        assert [m["role"] for m in last["messages"]] == ["system", "user", "assistant", "user"]
+        assert len(set(stub_server.peers)) == 1
+        assert (agent.prompts.stats.requests, agent.prompts.stats.hits) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_execute_reports_failure(self, stub_server):
+        """Provider errors should become unsuccessful results."""
+        stub_server.failures = 5
+        transport = make_transport(stub_server)
+        agent = ProviderAgent(ChatCompletionsProvider(transport, "stub"))
+        result = await agent.execute("Who?")
+        await transport.aclose()
+        assert result.success is False
+        assert "503" in result.error
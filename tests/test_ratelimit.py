@@ -0,0 +1,132 @@
+"""Tests for the async tier rate limiter."""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.license import LicenseLimits, LicenseTier
+from utils.ratelimit import (
+    TIER_RATE_LIMITS,
+    RateLimits,
+    TierRateLimiter,
+    TokenBucket,
+    TokenBudgetExceededError,
+    get_rate_limiter,
+)
+
+
+class TestTokenBucket:
+    """Test token bucket behaviour."""
+
+    def test_starts_full_and_drains(self):
+        """A new bucket should allow a full burst, then refuse."""
+        bucket = TokenBucket(rate=1, capacity=3, clock=lambda: 0.0)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_zero_rate_rejected(self):
+        """A bucket that can never refill should be refused up front."""
+        with pytest.raises(ValueError, match="rate must be positive"):
+            TokenBucket(rate=0, capacity=3)
+
+    def test_refills_over_time(self):
+        """Tokens should refill at the configured rate up to capacity."""
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=4, clock=lambda: now[0])
+        assert bucket.try_acquire(4)
+        now[0] = 1.0
+        assert bucket.available() == pytest.approx(2)
+        now[0] = 100.0
+        assert bucket.available() == pytest.approx(4)
+
+    def test_unlimited(self):
+        """A negative rate should never limit."""
+        bucket = TokenBucket(rate=-1, capacity=-1)
+        assert all(bucket.try_acquire(10**6) for _ in range(10))
+
+    @pytest.mark.asyncio
+    async def test_oversized_acquire_rejected(self):
+        """Asking for more than capacity can never succeed."""
+        bucket = TokenBucket(rate=1, capacity=2)
+        with pytest.raises(ValueError):
+            await bucket.acquire(3)
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_order(self):
+        """Many waiters should be served FIFO at the configured rate."""
+        bucket = TokenBucket(rate=5000, capacity=10)
+        order = []
+
+        async def worker(i):
+            await bucket.acquire()
+            order.append(i)
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(1000)))
+        elapsed = time.monotonic() - start
+        assert order == list(range(1000))
+        # 990 tokens beyond the initial burst at 5000/s
+        assert elapsed >= 0.15
+        assert elapsed < 2.0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_skipped(self):
+        """Cancelled waiters should not consume tokens."""
+        bucket = TokenBucket(rate=100, capacity=1)
+        assert bucket.try_acquire()
+        first = asyncio.ensure_future(bucket.acquire())
+        second = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1)
+        assert first.cancelled()
+        assert bucket.waiting == 0
+
+
+class TestTierRateLimiter:
+    """Test per-tier run and token limits."""
+
+    def test_tier_defaults(self):
+        """Enterprise should be unlimited, other tiers bounded."""
+        assert TIER_RATE_LIMITS[LicenseTier.ENTERPRISE].runs_per_minute == -1
+        assert TIER_RATE_LIMITS[LicenseTier.FREE].token_burst == 1000
+        assert get_rate_limiter(LicenseTier.PRO) is get_rate_limiter(LicenseTier.PRO)
+
+    @pytest.mark.asyncio
+    async def test_max_tokens_per_run_enforced(self):
+        """Consuming past max_tokens_per_run should raise."""
+        limiter = TierRateLimiter(LicenseTier.FREE)
+        async with limiter.run() as budget:
+            await budget.consume(600)
+            assert budget.remaining == 400
+            with pytest.raises(TokenBudgetExceededError):
+                await budget.consume(401)
+            assert budget.tokens_used == 600
+
+    @pytest.mark.asyncio
+    async def test_consume_larger_than_burst(self):
+        """A charge bigger than the token burst should be split, not refused."""
+        limits = LicenseLimits(
+            max_runs_per_day=-1,
+            max_tokens_per_run=-1,
+            max_agents=-1,
+            blockchain_enabled=False,
+            priority_support=False,
+        )
+        rates = RateLimits(runs_per_minute=-1, run_burst=-1, tokens_per_second=10000, token_burst=50)
+        limiter = TierRateLimiter(LicenseTier.PRO, rates=rates, limits=limits)
+        async with limiter.run() as budget:
+            await budget.consume(200)
+            assert budget.remaining == -1
+        assert budget.tokens_used == 200
+
+    @pytest.mark.asyncio
+    async def test_runs_wait_for_capacity(self):
+        """Runs beyond the burst should wait rather than fail."""
+        rates = RateLimits(runs_per_minute=6000, run_burst=1, tokens_per_second=-1, token_burst=-1)
+        limiter = TierRateLimiter(LicenseTier.PRO, rates=rates)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire_run()
+        # two refills at 100 runs/s
+        assert time.monotonic() - start >= 0.015
@@ -0,0 +1,150 @@
+"""Tests for the agent registry, capability masks and agent pools."""
+
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.base import AgentCapability, AgentContext, capability_mask
+from src.agents.fake import FakeAgent
+from src.agents.sessions import SessionStore
+from src.agents.registry import (
+    BUILTIN_AGENTS,
+    TIER_CAPABILITY_MASKS,
+    AgentPool,
+    AgentRegistry,
+    AgentSpec,
+)
+from src.main import cli
+from utils.license import LicenseTier
+
+
+class CoderAgent(FakeAgent):
+    """Fake agent that needs a Pro capability."""
+
+    name = "coder"
+    description = "writes code"
+    required_capabilities = [AgentCapability.CODE_GENERATION, AgentCapability.TEXT_GENERATION]
+
+
+def make_registry(*extra):
+    return AgentRegistry(BUILTIN_AGENTS + extra, discover=False)
+
+
+class TestCapabilityMask:
+    """Test bitmask capability validation."""
+
+    def test_mask_bits(self):
+        assert capability_mask([]) == 0
+        assert capability_mask([AgentCapability.TEXT_GENERATION]) == 1
+        assert capability_mask(AgentCapability) == (1 << len(AgentCapability)) - 1
+
+    def test_required_mask_precomputed(self):
+        assert CoderAgent._required_mask == capability_mask(CoderAgent.required_capabilities)
+
+    def test_missing_capability_rejected(self):
+        context = AgentContext(capabilities=[AgentCapability.TEXT_GENERATION])
+        with pytest.raises(PermissionError, match="code_generation"):
+            CoderAgent(context)
+
+    def test_context_mask_follows_list_changes(self):
+        context = AgentContext(capabilities=[AgentCapability.TEXT_GENERATION])
+        assert context.capability_mask == 1
+        context.capabilities.append(AgentCapability.CODE_GENERATION)
+        assert CoderAgent(context).context is context
+        context.capabilities = []
+        assert context.capability_mask == 0
+
+    def test_tier_masks(self):
+        assert TIER_CAPABILITY_MASKS[LicenseTier.FREE] & CoderAgent._required_mask != CoderAgent._required_mask
+        assert TIER_CAPABILITY_MASKS[LicenseTier.PRO] & CoderAgent._required_mask == CoderAgent._required_mask
+
+
+class TestAgentRegistry:
+    """Test lookup, tier gating and plugin discovery."""
+
+    def test_builtins(self):
+        registry = make_registry()
+        assert registry.names() == ["analyst", "artist", "engineer", "writer"]
+        assert registry.allowed("analyst", LicenseTier.FREE)
+        assert not registry.allowed("engineer", LicenseTier.FREE)
+        assert registry.allowed("engineer", LicenseTier.ENTERPRISE)
+        with pytest.raises(KeyError, match="Unknown agent"):
+            registry.get("nobody")
+
+    def test_create_checks_tier(self):
+        registry = make_registry(AgentSpec("coder", f"{__name__}:CoderAgent"))
+        agent = registry.create("coder", LicenseTier.PRO)
+        assert isinstance(agent, CoderAgent)
+        with pytest.raises(PermissionError, match="free tier"):
+            registry.create("coder", LicenseTier.FREE)
+
+    def test_context_budgets_history_by_tier(self):
+        registry = make_registry(AgentSpec("coder", f"{__name__}:CoderAgent"))
+        assert registry.context_for(LicenseTier.PRO, max_tokens=2000).history_budget == 8000
+        assert registry.context_for(LicenseTier.ENTERPRISE).history_budget is None
+        assert registry.context_for(LicenseTier.PRO, history_budget=50).history_budget == 50
+        assert registry.create("coder", LicenseTier.PRO).context.history_budget == 9000
+
+    def test_plugins_discovered_lazily(self):
+        ep = EntryPoint("coder", f"{__name__}:CoderAgent", "terminal221b.agents")
+        shadow = EntryPoint("analyst", "elsewhere:Analyst", "terminal221b.agents")
+        with patch("src.agents.registry.entry_points", return_value=[ep, shadow]) as found:
+            registry = AgentRegistry()
+            assert not found.called
+            assert "coder" in registry.names()
+            registry.names()
+        assert found.call_count == 1
+        assert registry.get("analyst").target == "src.agents.analyst:AnalystAgent"
+        assert registry.describe("coder") == "writes code"
+        assert registry.load("coder") is CoderAgent
+
+
+class TestAgentPool:
+    """Test warm instance reuse."""
+
+    def test_reuses_and_resets(self):
+        registry = make_registry(AgentSpec("coder", f"{__name__}:CoderAgent"))
+        pool = registry.pool("coder", LicenseTier.PRO)
+        assert registry.pool("coder", LicenseTier.PRO) is pool
+        with pool.lease() as agent:
+            agent.add_message("user", "hello")
+        with pool.lease() as again:
+            assert again is agent
+            assert again.context.messages == []
+        assert (pool.created, pool.reused) == (1, 1)
+
+    def test_release_detaches_session(self, tmp_path):
+        pool = AgentPool(FakeAgent)
+        with SessionStore(tmp_path) as store:
+            with pool.lease() as agent:
+                agent.attach_session(store.open("watson"))
+                agent.add_message("user", "hello")
+            with pool.lease() as again:
+                assert again is agent
+                again.add_message("user", "someone else")
+            assert [m.content for m in store.open("watson").tail()] == ["hello"]
+
+    def test_max_idle(self):
+        pool = AgentPool(FakeAgent, max_idle=1)
+        agents = [pool.acquire() for _ in range(3)]
+        for agent in agents:
+            pool.release(agent)
+        assert pool.idle == 1
+
+
+class TestRegistryCommands:
+    """Test CLI commands backed by the registry."""
+
+    def test_agents_listing(self):
+        result = CliRunner().invoke(cli, ["agents"], obj={})
+        assert result.exit_code == 0
+        assert "analyst" in result.output and "Free+" in result.output
+        assert "Pro+" in result.output
+
+    def test_free_tier_rejects_pro_agent(self, monkeypatch):
+        monkeypatch.delenv("LICENSE_KEY", raising=False)
+        result = CliRunner().invoke(cli, ["run", "--agent", "writer"], obj={})
+        assert result.exit_code == 1
+        assert "Free tier only supports the analyst agent." in result.output
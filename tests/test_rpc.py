@@ -0,0 +1,202 @@
+"""Tests for the Solana RPC client against a local stub node."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pytest_asyncio
+
+from src.blockchain import RPCError, SolanaRPC, get_rpc
+from src.providers.transport import ProviderTransport, RetryPolicy, close_transports
+
+
+class StubNode(BaseHTTPRequestHandler):
+    """JSON-RPC endpoint with in-memory balances and transactions."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.peers.add(self.client_address)
+        server.requests.append(payload)
+        requests = payload if isinstance(payload, list) else [payload]
+        replies = [self._answer(request) for request in requests]
+        body = json.dumps(replies if isinstance(payload, list) else replies[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _answer(self, request):
+        server, method, params = self.server, request["method"], request["params"]
+        reply = {"jsonrpc": "2.0", "id": request["id"]}
+        if method == "getBalance":
+            if params[0] not in server.balances:
+                reply["error"] = {"code": -32602, "message": "Invalid param: WrongSize"}
+            else:
+                reply["result"] = {"context": {"slot": 1}, "value": server.balances[params[0]]}
+        elif method == "getAccountInfo":
+            reply["result"] = {"context": {"slot": 1}, "value": None}
+        elif method == "sendTransaction":
+            signature = "sig-" + params[0]
+            server.statuses[signature] = 0
+            reply["result"] = signature
+        elif method == "getSignatureStatuses":
+            value = []
+            for signature in params[0]:
+                polls = server.statuses.get(signature)
+                if polls is None:
+                    value.append(None)
+                    continue
+                server.statuses[signature] = polls + 1
+                level = "processed" if polls == 0 else "confirmed"
+                value.append({"slot": 1, "confirmations": polls, "err": None, "confirmationStatus": level})
+            reply["result"] = {"context": {"slot": 1}, "value": value}
+        else:
+            reply["error"] = {"code": -32601, "message": "Method not found"}
+        return reply
+
+
+@pytest.fixture
+def node():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubNode)
+    server.peers, server.requests, server.statuses = set(), [], {}
+    server.balances = {f"wallet{i}": i * 1000 for i in range(200)}
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture
+async def rpc(node):
+    host, port = node.server_address
+    retry = RetryPolicy(attempts=2, base_delay=0.001, max_delay=0.002)
+    client = SolanaRPC(ProviderTransport(f"http://{host}:{port}", http2=False, retry=retry), max_batch_size=64)
+    yield client
+    await client.aclose()
+
+
+class TestBatching:
+    """Test JSON-RPC batching and connection reuse."""
+
+    @pytest.mark.asyncio
+    async def test_many_wallets_few_round_trips(self, rpc, node):
+        wallets = [f"wallet{i}" for i in range(200)]
+        balances = await rpc.get_balances(wallets)
+        assert balances["wallet7"] == 7000 and len(balances) == 200
+        assert len(node.requests) == 4  # 200 calls in batches of 64
+        assert all(isinstance(batch, list) for batch in node.requests)
+        assert rpc.stats.round_trips == 4
+        assert rpc.stats.calls_per_round_trip == 50
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, rpc, node):
+        for i in range(3):
+            await rpc.get_balance(f"wallet{i}")
+        assert len(node.peers) == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_per_call(self, rpc, node):
+        good, bad = await asyncio.gather(
+            rpc.get_balance("wallet1"), rpc.get_balance("nope"), return_exceptions=True
+        )
+        assert good == 1000
+        assert isinstance(bad, RPCError) and bad.code == -32602
+        assert len(node.requests) == 1
+        with pytest.raises(RPCError, match="Method not found"):
+            await rpc.call("getNothing")
+
+
+class TestCache:
+    """Test the short-TTL read cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_reads_are_cached(self, rpc, node):
+        assert await rpc.get_balance("wallet3") == 3000
+        node.balances["wallet3"] = 1
+        assert await rpc.get_balance("wallet3") == 3000
+        assert await rpc.get_account_info("wallet3") is None
+        assert await rpc.get_account_info("wallet3") is None
+        assert len(node.requests) == 2
+        assert rpc.stats.cache_hits == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, node, rpc):
+        rpc.cache.ttl = 0.05
+        await rpc.get_balance("wallet3")
+        node.balances["wallet3"] = 1
+        time.sleep(0.1)
+        assert await rpc.get_balance("wallet3") == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_inflight_reads_share_a_call(self, rpc, node):
+        results = await asyncio.gather(*(rpc.get_balance("wallet5") for _ in range(10)))
+        assert results == [5000] * 10
+        assert len(node.requests[0]) == 1
+        assert rpc.stats.coalesced == 9
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_first_caller_spares_the_others(self, rpc, node):
+        first = asyncio.ensure_future(rpc.get_balance("wallet5"))
+        second = asyncio.ensure_future(rpc.get_balance("wallet5"))
+        await asyncio.sleep(0)  # both waiting on the shared lookup
+        first.cancel()
+        assert await second == 5000
+        assert first.cancelled()
+        assert await rpc.get_balance("wallet5") == 5000  # result was still cached
+        assert len(node.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_sending_invalidates(self, rpc, node):
+        await rpc.get_balance("wallet3")
+        node.balances["wallet3"] = 1
+        await rpc.send_transaction("tx")
+        assert await rpc.get_balance("wallet3") == 1
+
+
+class TestTransactions:
+    """Test pipelined submission and bulk confirmation."""
+
+    @pytest.mark.asyncio
+    async def test_pipelined_send_and_confirm(self, rpc, node):
+        transactions = [f"tx{i}" for i in range(100)]
+        signatures = await rpc.send_transactions(transactions)
+        assert signatures == [f"sig-{tx}" for tx in transactions]
+        assert len(node.requests) < 10  # not one round-trip per transaction
+        sent = len(node.requests)
+
+        statuses = await rpc.confirm_transactions(signatures, timeout=1, poll_interval=0.01)
+        assert all(statuses[s]["confirmationStatus"] == "confirmed" for s in signatures)
+        assert len(node.requests) - sent == 2  # processed, then confirmed; one batched call each
+        assert rpc.stats.sent_transactions == 100
+
+    @pytest.mark.asyncio
+    async def test_unknown_signature_times_out(self, rpc):
+        start = time.perf_counter()
+        statuses = await rpc.confirm_transactions(["unknown"], timeout=0.1, poll_interval=0.02)
+        assert statuses == {"unknown": None}
+        assert time.perf_counter() - start < 1
+
+
+class TestGetRpc:
+    """Test the shared-transport factory."""
+
+    @pytest.mark.asyncio
+    async def test_one_transport_per_endpoint(self):
+        try:
+            mainnet, devnet = get_rpc("http://mainnet.invalid"), get_rpc("http://devnet.invalid")
+            assert mainnet.transport.base_url == "http://mainnet.invalid"
+            assert devnet.transport.base_url == "http://devnet.invalid"
+            assert get_rpc("http://devnet.invalid").transport is devnet.transport
+        finally:
+            await close_transports()
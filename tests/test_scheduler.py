@@ -0,0 +1,111 @@
+"""Tests for the tier-aware admission scheduler."""
+
+import asyncio
+
+import pytest
+
+from utils.license import LicenseTier
+from utils.ratelimit import TokenBudgetExceededError
+from utils.scheduler import AdmissionScheduler
+
+FREE, PRO, ENTERPRISE = LicenseTier.FREE, LicenseTier.PRO, LicenseTier.ENTERPRISE
+
+
+async def admission_order(scheduler, jobs):
+    """Queue ``jobs`` (tier, tokens) behind one running run and record admission order."""
+    order = []
+    blocker = await scheduler.acquire(FREE)
+
+    async def job(i, tier, tokens):
+        async with scheduler.admit(tier, tokens):
+            order.append(i)
+            await asyncio.sleep(0)
+
+    tasks = [asyncio.ensure_future(job(i, tier, tokens)) for i, (tier, tokens) in enumerate(jobs)]
+    await asyncio.sleep(0)
+    scheduler.release(blocker)
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestAdmission:
+    """Test ordering and fairness."""
+
+    @pytest.mark.asyncio
+    async def test_immediate_when_idle(self):
+        scheduler = AdmissionScheduler(max_concurrent=2)
+        async with scheduler.admit(FREE) as ticket:
+            assert ticket.waited < 0.01
+            assert scheduler.active == 1
+        assert scheduler.active == 0
+
+    @pytest.mark.asyncio
+    async def test_higher_tiers_go_first(self):
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        order = await admission_order(scheduler, [(FREE, 0), (PRO, 0), (ENTERPRISE, 0)])
+        assert order == [2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_free_is_not_starved(self):
+        """Under a steady Enterprise backlog, Free still gets its weighted share."""
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        jobs = [(ENTERPRISE, 0)] * 40 + [(FREE, 0)] * 4
+        order = await admission_order(scheduler, jobs)
+        first_free = min(order.index(i) for i in range(40, 44))
+        assert first_free <= 9  # weights 8:1
+        assert [i for i in order[:20] if i >= 40]  # not pushed behind the whole backlog
+
+    @pytest.mark.asyncio
+    async def test_fifo_within_tier(self):
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        order = await admission_order(scheduler, [(PRO, 0)] * 5)
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiters_are_skipped(self):
+        scheduler = AdmissionScheduler(max_concurrent=1)
+        blocker = await scheduler.acquire(PRO)
+        waiter = asyncio.ensure_future(scheduler.acquire(PRO))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release(blocker)
+        async with scheduler.admit(FREE):
+            assert scheduler.active == 1
+        assert scheduler.depth() == 0
+
+
+class TestTokenAdmission:
+    """Test token budget accounting."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_tier_limit(self):
+        scheduler = AdmissionScheduler()
+        with pytest.raises(TokenBudgetExceededError, match="free tier"):
+            await scheduler.acquire(FREE, tokens=1001)
+        await scheduler.acquire(ENTERPRISE, tokens=10**6)
+        assert scheduler.stats()["free"]["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_defers_until_tokens_free_up(self):
+        scheduler = AdmissionScheduler(max_concurrent=4, token_capacity=1000)
+        first = await scheduler.acquire(PRO, tokens=800)
+        waiter = asyncio.ensure_future(scheduler.acquire(PRO, tokens=500))
+        await asyncio.sleep(0)
+        assert not waiter.done() and scheduler.depth(PRO) == 1
+        scheduler.release(first)
+        ticket = await waiter
+        assert scheduler.tokens_in_flight == 500
+        assert ticket.waited >= 0
+        with pytest.raises(ValueError):
+            await scheduler.acquire(ENTERPRISE, tokens=2000)
+
+
+@pytest.mark.asyncio
+async def test_stats():
+    scheduler = AdmissionScheduler(max_concurrent=1)
+    await admission_order(scheduler, [(FREE, 0), (PRO, 0)])
+    stats = scheduler.stats()
+    assert stats["free"]["admitted"] == 2 and stats["pro"]["admitted"] == 1
+    assert stats["enterprise"]["admitted"] == 0
+    assert stats["free"]["wait_p99"] >= stats["pro"]["wait_p50"]
@@ -0,0 +1,216 @@
+"""Tests for the memory-mapped session store."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.agents.base import AgentMessage
+from src.agents.fake import FakeAgent
+from src.agents.sessions import ENTRY, IDX_HEADER, SessionLog, SessionStore
+
+
+def msg(i, role="user"):
+    return AgentMessage(role=role, content=f"message {i} " + "x" * (i % 7))
+
+
+def ten_tokens(message):
+    return 10
+
+
+class TestSessionLog:
+    """Test append, random access and resume."""
+
+    def test_append_and_random_access(self, tmp_path):
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            for i in range(100):
+                assert log.append(msg(i)) == i
+            assert len(log) == 100
+            assert log[57] == msg(57)
+            assert log[-1] == msg(99)
+            assert log.tokens(3) == 10
+            with pytest.raises(IndexError):
+                log[100]
+            with log.raw(5) as payload:
+                assert bytes(payload).startswith(b'{"role":"user"')
+
+    def test_metadata_round_trip(self, tmp_path):
+        with SessionLog(tmp_path / "s") as log:
+            log.append(AgentMessage(role="assistant", content="hi", metadata={"k": [1, 2]}))
+        with SessionLog(tmp_path / "s") as log:
+            assert log[0].metadata == {"k": [1, 2]}
+
+    def test_tail_respects_budget_and_resets(self, tmp_path):
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            for i in range(20):
+                log.append(msg(i))
+            assert log.tail(45) == [msg(i) for i in range(16, 20)]
+            assert len(log.tail()) == 20
+            log.reset()
+            assert log.tail() == []
+            log.append(msg(100))
+            log.append(msg(101))
+            assert log.tail(1000) == [msg(100), msg(101)]
+            assert log.live_start == 20
+
+    def test_resume_after_reopen(self, tmp_path):
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            for i in range(10):
+                log.append(msg(i))
+            log.reset()
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            assert len(log) == 10
+            assert log.tail() == []
+            log.append(msg(10))
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            assert log.tail() == [msg(10)]
+            assert log.live_start == 10
+
+    def test_tail_reads_only_the_tail(self, tmp_path):
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            for i in range(50_000):
+                log.append(msg(i))
+        start = time.perf_counter()
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            tail = log.tail(100)
+        assert time.perf_counter() - start < 0.1
+        assert tail == [msg(i) for i in range(49_990, 50_000)]
+
+
+class TestRecovery:
+    """Test repair after crashes mid-write."""
+
+    def test_torn_record_truncated(self, tmp_path):
+        with SessionLog(tmp_path / "s") as log:
+            for i in range(5):
+                log.append(msg(i))
+            size = log.size
+        with open(tmp_path / "s.log", "ab") as fh:
+            fh.write(b"\x40\x00\x00\x00garbage")
+        with SessionLog(tmp_path / "s") as log:
+            assert len(log) == 5 and log.size == size
+            log.append(msg(5))
+            assert log[5] == msg(5)
+
+    def test_missing_index_entries_rebuilt(self, tmp_path):
+        with SessionLog(tmp_path / "s") as log:
+            for i in range(8):
+                log.append(msg(i))
+            log.reset()
+        with open(tmp_path / "s.idx", "r+b") as fh:
+            fh.truncate(IDX_HEADER.size + 3 * ENTRY.size + 5)
+        with SessionLog(tmp_path / "s") as log:
+            assert len(log) == 8
+            assert log[7] == msg(7)
+            assert log.tail() == []
+
+    def test_index_deleted(self, tmp_path):
+        with SessionLog(tmp_path / "s") as log:
+            for i in range(8):
+                log.append(msg(i))
+        os.unlink(tmp_path / "s.idx")
+        with SessionLog(tmp_path / "s") as log:
+            assert [m.content for m in log.tail()] == [msg(i).content for i in range(8)]
+
+    def test_rejects_foreign_file(self, tmp_path):
+        (tmp_path / "s.log").write_bytes(b"not a session log at all")
+        with pytest.raises(ValueError, match="not a session log"):
+            SessionLog(tmp_path / "s")
+
+
+class TestCompaction:
+    """Test dropping messages before the last reset."""
+
+    def test_compact_keeps_numbering(self, tmp_path):
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            for i in range(100):
+                log.append(msg(i))
+            log.reset()
+            log.append(msg(100))
+            before = log.size
+            assert log.dead_bytes > 0
+            assert log.compact() is True
+            assert log.size < before / 10
+            assert len(log) == 101
+            assert log[100] == msg(100)
+            with pytest.raises(IndexError, match="compaction"):
+                log[5]
+            assert log.compact() is False
+            log.append(msg(101))
+        with SessionLog(tmp_path / "s", count_tokens=ten_tokens) as log:
+            assert log.tail() == [msg(100), msg(101)]
+
+    def test_compact_with_trailing_reset(self, tmp_path):
+        with SessionLog(tmp_path / "s") as log:
+            for i in range(10):
+                log.append(msg(i))
+            log.reset()
+            assert log.compact()
+            assert log.tail() == [] and len(log) == 10
+        with SessionLog(tmp_path / "s") as log:
+            log.append(msg(10))
+            assert log.tail() == [msg(10)]
+
+    def test_background_compaction_after_reset(self, tmp_path):
+        with ThreadPoolExecutor(1) as pool:
+            log = SessionLog(tmp_path / "s", executor=pool, compact_min_bytes=1)
+            for i in range(200):
+                log.append(msg(i))
+            log.reset()
+            for i in range(200, 210):
+                log.append(msg(i))
+            log.wait_for_compaction()
+            assert log.dead_bytes == 0
+            assert log.tail() == [msg(i) for i in range(200, 210)]
+            log.close()
+
+
+    def test_appends_during_compaction_survive(self, tmp_path):
+        with ThreadPoolExecutor(1) as pool:
+            log = SessionLog(tmp_path / "s")
+            for i in range(5000):
+                log.append(msg(i))
+            log.reset()
+            future = pool.submit(log.compact)
+            for i in range(5000, 5300):
+                log.append(msg(i))
+            assert future.result() is True
+            for i in range(5300, 5310):
+                log.append(msg(i))
+            assert log.tail() == [msg(i) for i in range(5000, 5310)]
+            log.close()
+
+
+class TestSessionStore:
+    """Test the sharded session directory."""
+
+    def test_open_list_delete(self, tmp_path):
+        with SessionStore(tmp_path) as store:
+            for name in ("alpha", "beta", "gamma"):
+                store.open(name).append(msg(0))
+            assert store.open("alpha") is store.open("alpha")
+            assert sorted(store.sessions()) == ["alpha", "beta", "gamma"]
+            assert store.path_for("alpha").parent.parent == tmp_path
+            store.delete("beta")
+            assert not store.exists("beta")
+            assert sorted(store.sessions()) == ["alpha", "gamma"]
+
+    def test_rejects_unsafe_ids(self, tmp_path):
+        store = SessionStore(tmp_path, background_compaction=False)
+        for bad in ("../x", "", "a/b", ".hidden"):
+            with pytest.raises(ValueError):
+                store.path_for(bad)
+
+    def test_agent_session_persists(self, tmp_path):
+        with SessionStore(tmp_path) as store:
+            agent = FakeAgent()
+            agent.attach_session(store.open("chat"))
+            agent.add_message("user", "hello")
+            agent.add_message("assistant", "hi there")
+        with SessionStore(tmp_path) as store:
+            resumed = FakeAgent()
+            resumed.attach_session(store.open("chat"))
+            assert [m.content for m in resumed.context.messages] == ["hello", "hi there"]
+            resumed.clear_history()
+            assert store.open("chat").tail() == []
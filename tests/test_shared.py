@@ -0,0 +1,125 @@
+"""Tests for the copy-on-write shared context."""
+
+import time
+
+import pytest
+
+from src.agents import AgentCoordinator, Blackboard, CowMessages, PVector
+from src.agents.base import AgentMessage, AgentResult, BaseAgent
+from src.agents.history import ConversationHistory
+
+
+def msg(i, role="user"):
+    return AgentMessage(role=role, content=f"m{i}")
+
+
+class NoteAgent(BaseAgent):
+    """Agent that records the prompt and its answer in its history."""
+
+    name = "note"
+
+    async def execute(self, prompt):
+        self.add_message("user", prompt)
+        self.add_message("assistant", prompt.upper())
+        return AgentResult(success=True, output=prompt.upper())
+
+    async def stream(self, prompt):
+        yield prompt
+
+
+class TestPVector:
+    """Test the persistent vector."""
+
+    @pytest.mark.parametrize("size", [0, 1, 31, 32, 33, 64, 1024, 1056, 1057, 5000])
+    def test_matches_list_across_levels(self, size):
+        vector = PVector(range(size))
+        assert len(vector) == size
+        assert list(vector) == list(range(size))
+        assert [vector[i] for i in range(size)] == list(range(size))
+        if size:
+            assert vector[-1] == size - 1
+            assert vector[size // 3:size // 2] == list(range(size))[size // 3:size // 2]
+        with pytest.raises(IndexError):
+            vector[size]
+
+    def test_old_versions_unchanged(self):
+        base = PVector(range(100))
+        a, b = base.append("a"), base.append("b")
+        assert (len(base), a[100], b[100]) == (100, "a", "b")
+        assert a._root is b._root  # structure shared between versions
+
+
+class TestCowMessages:
+    """Test per-agent forks."""
+
+    def test_fork_of_large_context_is_cheap(self):
+        board = Blackboard(msg(i) for i in range(10_000))
+        start = time.perf_counter()
+        forks = [board.fork() for _ in range(100)]
+        assert time.perf_counter() - start < 0.05
+        assert all(len(f) == 10_000 and f[9_999].content == "m9999" for f in forks)
+        assert all(f.base is board.messages for f in forks)
+
+    def test_writes_stay_private(self):
+        board = Blackboard([msg(0), msg(1)])
+        a, b = board.fork(), board.fork()
+        a.append(msg("a"))
+        a[0] = msg("x")
+        assert [m.content for m in a] == ["mx", "m1", "ma"]
+        assert [m.content for m in b] == ["m0", "m1"]
+        assert [m.content for m in board.messages] == ["m0", "m1"]
+
+    def test_front_deletion_and_insert_keep_sharing(self):
+        fork = Blackboard(msg(i) for i in range(100)).fork()
+        fork.append(msg("new"))
+        del fork[:40]
+        fork.insert(0, msg("summary", role="system"))
+        assert len(fork) == 62
+        assert fork.shared == 60
+        assert [fork[0].content, fork[1].content, fork[-1].content] == ["msummary", "m40", "mnew"]
+
+    def test_history_compaction(self):
+        """ConversationHistory should evict from a fork without copying the shared part."""
+        fork = Blackboard(msg(i) for i in range(50)).fork()
+        history = ConversationHistory(fork, budget=20, count_tokens=lambda text: 1)
+        history.append(msg("last"))
+        assert history.total_tokens <= 20
+        assert fork[-1].content == "mlast"
+        assert fork.shared == len(fork) - 1
+        assert [m.content for m in history.prompt_messages()][-1] == "mlast"
+
+    def test_clear_and_arbitrary_edits(self):
+        fork = Blackboard(msg(i) for i in range(5)).fork()
+        del fork[2]
+        assert [m.content for m in fork] == ["m0", "m1", "m3", "m4"]
+        fork.clear()
+        assert len(fork) == 0 and list(fork) == []
+
+
+class TestBlackboard:
+    """Test merging results back."""
+
+    def test_merge_appends_new_messages_once(self):
+        board = Blackboard([msg(0)])
+        fork = board.fork()
+        fork.extend([msg(1), msg(2)])
+        assert board.merge(fork, agent="writer") == 2
+        assert board.merge(fork) == 0
+        fork.append(msg(3))
+        assert board.merge(fork) == 1
+        assert [m.content for m in board.messages] == ["m0", "m1", "m2", "m3"]
+        assert board.messages[1].metadata == {"agent": "writer"}
+        assert fork[1].metadata is None
+
+    @pytest.mark.asyncio
+    async def test_coordinator_merges_successful_tasks(self):
+        board = Blackboard([AgentMessage(role="system", content="brief")])
+        coordinator = AgentCoordinator(blackboard=board)
+        first, second = NoteAgent(), NoteAgent()
+        coordinator.add_task("a", first, "alpha")
+        coordinator.add_task("b", second, lambda r: r["a"].output, depends_on=["a"])
+        await coordinator.run()
+        assert isinstance(second.context.messages, CowMessages)
+        # b forked after a merged, so it saw a's exchange
+        assert [m.content for m in second.context.messages][:3] == ["brief", "alpha", "ALPHA"]
+        assert [m.metadata["agent"] for m in list(board.messages)[1:]] == ["a", "a", "b", "b"]
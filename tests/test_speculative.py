@@ -0,0 +1,88 @@
+"""Tests for speculative fan-out."""
+
+import asyncio
+
+import pytest
+
+from src.agents import speculate
+from src.agents.fake import FakeAgent
+from utils.license import TIER_LIMITS, LicenseTier
+
+
+class Racer(FakeAgent):
+    """FakeAgent that records whether its call was cancelled."""
+
+    def __init__(self, name, latency, output_tokens=16, error_rate=0.0):
+        super().__init__(latency=latency, output_tokens=output_tokens, error_rate=error_rate)
+        self.name = name
+        self.cancelled = False
+
+    async def execute(self, prompt):
+        try:
+            return await super().execute(prompt)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.mark.asyncio
+async def test_first_result_wins_and_rest_are_cancelled():
+    fast, slow, slower = Racer("fast", 0.01), Racer("slow", 1), Racer("slower", 2)
+    report = await speculate([slow, fast, slower], "p", limits=TIER_LIMITS[LicenseTier.PRO])
+    assert report.winner == "fast"
+    assert report.result.success
+    assert report.elapsed < 0.5
+    assert slow.cancelled and slower.cancelled
+    assert [a.status for a in report.attempts] == ["cancelled", "accepted", "cancelled"]
+    assert (report.tokens_used, report.tokens_wasted, report.tokens_saved) == (16, 0, 32)
+    assert report.within_limit
+    assert "winner=fast" in report.summary()
+
+
+@pytest.mark.asyncio
+async def test_rejected_and_failed_results_are_skipped():
+    short = Racer("short", 0.01, output_tokens=2)
+    broken = Racer("broken", 0.0, error_rate=1.0)
+    long = Racer("long", 0.05, output_tokens=20)
+    report = await speculate(
+        [short, broken, long], "p", accept=lambda r: len(r.output.split()) >= 10
+    )
+    assert report.winner == "long"
+    statuses = {a.agent: a.status for a in report.attempts}
+    assert statuses == {"short": "rejected", "broken": "failed", "long": "accepted"}
+    assert report.tokens_wasted == 2
+    assert report.tokens_saved == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_everything():
+    agents = [Racer("a", 1), Racer("b", 1)]
+    report = await speculate(agents, "p", deadline=0.05, limits=TIER_LIMITS[LicenseTier.FREE])
+    assert report.winner is None
+    assert not report.result.success
+    assert "deadline" in report.result.error
+    assert all(agent.cancelled for agent in agents)
+    assert report.max_tokens_per_run == 1000
+
+
+@pytest.mark.asyncio
+async def test_nothing_acceptable():
+    report = await speculate([Racer("a", 0), Racer("b", 0)], "p", accept=lambda r: False)
+    assert not report.result.success
+    assert report.tokens_wasted == 32
+    assert report.winner is None and report.within_limit
+
+
+@pytest.mark.asyncio
+async def test_over_limit_is_reported():
+    agents = [Racer("a", 0, output_tokens=600), Racer("b", 0, output_tokens=600)]
+    report = await speculate(
+        agents, "p", accept=lambda r: r.tokens_used > 1000, limits=TIER_LIMITS[LicenseTier.FREE]
+    )
+    assert report.tokens_spent == 1200
+    assert not report.within_limit
+
+
+def test_requires_agents():
+    with pytest.raises(ValueError):
+        asyncio.run(speculate([], "p"))
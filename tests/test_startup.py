@@ -0,0 +1,102 @@
+"""Cold-start budget tests for the CLI entry point."""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from src.main import cli
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Budgets for `terminal221b --version`. Wall-clock includes interpreter startup;
+# the best of several runs is compared to keep CI noise out of the result.
+STARTUP_WALL_CLOCK_BUDGET = 1.0  # seconds
+STARTUP_MODULE_BUDGET = 150  # entries in sys.modules after the command ran
+STARTUP_RUNS = 3
+
+_PROBE = """
+import json, sys
+sys.argv = ["terminal221b", "--version"]
+from src.main import main
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _run_version_probe():
+    """Run `--version` in a fresh interpreter and return (seconds, modules)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    lines = proc.stdout.strip().splitlines()
+    assert lines[0].startswith("Terminal221b v")
+    return elapsed, json.loads(lines[-1])
+
+
+@pytest.fixture(scope="module")
+def probe():
+    """Best wall-clock time and module list over several `--version` runs."""
+    runs = [_run_version_probe() for _ in range(STARTUP_RUNS)]
+    return min(r[0] for r in runs), runs[0][1]
+
+
+class TestStartupBudget:
+    """`terminal221b --version` must stay within its cold-start budget."""
+
+    def test_wall_clock_budget(self, probe):
+        """--version should finish within the wall-clock budget."""
+        elapsed, _ = probe
+        assert elapsed < STARTUP_WALL_CLOCK_BUDGET, f"--version took {elapsed:.3f}s"
+
+    def test_module_count_budget(self, probe):
+        """--version should import no more modules than budgeted."""
+        _, modules = probe
+        assert len(modules) <= STARTUP_MODULE_BUDGET, f"{len(modules)} modules loaded"
+
+    def test_heavy_modules_not_loaded(self, probe):
+        """--version should not load Rich, licensing or subcommand modules."""
+        _, modules = probe
+        for name in ("rich", "utils.license", "src.commands.run", "pydantic"):
+            assert name not in modules, f"{name} imported by --version"
+
+
+class TestLazyCommands:
+    """Subcommands resolve lazily and only build what they need."""
+
+    def test_help_lists_all_commands(self):
+        """--help should list every lazily registered command."""
+        result = CliRunner().invoke(cli, ["--help"], obj={})
+        assert result.exit_code == 0
+        for name in ("run", "tui", "agents", "wallet"):
+            assert name in result.output
+
+    def test_agents_skips_license_manager(self):
+        """The agents listing should not initialize licensing."""
+        obj = {}
+        result = CliRunner().invoke(cli, ["agents"], obj=obj)
+        assert result.exit_code == 0
+        assert "analyst" in result.output
+        assert "license_manager" not in obj
+
+    def test_run_initializes_license_manager(self, monkeypatch):
+        """Commands that check limits still get a license manager."""
+        monkeypatch.delenv("LICENSE_KEY", raising=False)
+        obj = {}
+        result = CliRunner().invoke(cli, ["run"], obj=obj)
+        assert result.exit_code == 0
+        assert "Starting analyst agent" in result.output
+        assert "license_manager" in obj
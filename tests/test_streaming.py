@@ -0,0 +1,126 @@
+"""Tests for the streaming pipeline."""
+
+import asyncio
+import io
+
+import pytest
+
+from src.agents.streaming import (
+    FileSink,
+    StreamPipeline,
+    StreamSink,
+    TerminalSink,
+    TokenCounterSink,
+)
+
+
+async def chunks(items, delay=0.0, produced=None):
+    """Async chunk source, optionally recording how many chunks were emitted."""
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        if produced is not None:
+            produced.append(item)
+        yield item
+
+
+class RecordingSink(StreamSink):
+    """Sink that records chunks, optionally slowly."""
+
+    def __init__(self, name, delay=0.0, produced=None):
+        self.name = name
+        self.delay = delay
+        self.produced = produced
+        self.received = []
+        self.lag = 0
+
+    async def write(self, chunk):
+        if self.produced is not None:
+            self.lag = max(self.lag, len(self.produced) - len(self.received))
+        await asyncio.sleep(self.delay)
+        self.received.append(chunk)
+
+
+class FailingSink(StreamSink):
+    name = "failing"
+
+    async def write(self, chunk):
+        raise IOError("disk full")
+
+
+class TestFanOut:
+    """Test delivery to multiple sinks."""
+
+    @pytest.mark.asyncio
+    async def test_all_sinks_receive_same_objects(self):
+        """Every sink should get every chunk, without copies."""
+        items = [f"tok{i} " for i in range(20)]
+        a, b = RecordingSink("a"), RecordingSink("b")
+        await StreamPipeline([a, b], maxsize=4).run(chunks(items))
+        assert a.received == items
+        assert all(x is y for x, y in zip(a.received, b.received))
+
+    @pytest.mark.asyncio
+    async def test_builtin_sinks(self, tmp_path):
+        """Terminal, file and counter sinks should see the whole stream."""
+        out = io.StringIO()
+        counter = TokenCounterSink()
+        path = tmp_path / "out.txt"
+        sinks = [TerminalSink(out), FileSink(path), counter]
+        stats = await StreamPipeline(sinks).run(chunks(["Hello", ", ", "world"]))
+        assert out.getvalue() == "Hello, world"
+        assert path.read_text() == "Hello, world"
+        assert counter.tokens == 3
+        assert counter.characters == 12
+        assert stats.stages["tokens"].chunks == 3
+
+
+class TestBackpressure:
+    """Slow consumers should throttle the producer."""
+
+    @pytest.mark.asyncio
+    async def test_slow_sink_bounds_buffering(self):
+        """The producer should never get far ahead of the slowest sink."""
+        produced = []
+        slow = RecordingSink("slow", delay=0.002, produced=produced)
+        fast = RecordingSink("fast")
+        await StreamPipeline([slow, fast], maxsize=2).run(chunks(range(50), produced=produced))
+        assert len(slow.received) == 50
+        # queue capacity + the chunk being put + the chunk being written
+        assert slow.lag <= 4
+
+    def test_invalid_maxsize(self):
+        """A queue must hold at least one chunk."""
+        with pytest.raises(ValueError):
+            StreamPipeline([TokenCounterSink()], maxsize=0)
+
+    def test_duplicate_names(self):
+        """Sink names identify stages and must be unique."""
+        with pytest.raises(ValueError):
+            StreamPipeline([TokenCounterSink(), TokenCounterSink()])
+
+
+class TestTiming:
+    """Test per-stage time-to-first-token."""
+
+    @pytest.mark.asyncio
+    async def test_ttft_per_stage(self):
+        """Each stage should report when its first chunk arrived."""
+        stats = await StreamPipeline([RecordingSink("a", delay=0.01)]).run(
+            chunks(["x", "y"], delay=0.02)
+        )
+        ttft = stats.time_to_first_token
+        assert ttft["source"] >= 0.02
+        assert ttft["a"] >= ttft["source"] + 0.01
+        assert stats.stages["a"].finished <= stats.elapsed
+
+
+class TestErrors:
+    """Sink failures should stop the stream."""
+
+    @pytest.mark.asyncio
+    async def test_sink_error_propagates(self):
+        """A failing sink should raise instead of hanging the producer."""
+        pipeline = StreamPipeline([FailingSink(), RecordingSink("ok")], maxsize=1)
+        with pytest.raises(IOError, match="disk full"):
+            await asyncio.wait_for(pipeline.run(chunks(range(100))), timeout=1)
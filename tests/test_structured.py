@@ -0,0 +1,114 @@
+"""Tests for the incremental structured-output parser."""
+
+import time
+
+import pytest
+
+from src.agents.streaming import StreamPipeline
+from src.agents.structured import (
+    CODE,
+    FIELD,
+    OBJECT,
+    StructuredParser,
+    StructuredSink,
+    parse_stream,
+)
+
+TEXT = (
+    "Findings:\n"
+    '{"suspect": "Moriarty", "confidence": 0.9, "clues": ["ash", {"kind": "tobacco"}], "note": "a \\"}\\" brace"}\n'
+    "Patch:\n"
+    "```python\n"
+    "print('{not json}')\n"
+    "  ``` still code\n"
+    "```\n"
+    "Data:\n"
+    "```json\n"
+    '{"rows": [1, 2]}\n'
+    "```\n"
+    "Prose with {braces} and [links] only.\n"
+)
+
+
+def parse(text, size):
+    parser = StructuredParser()
+    events = []
+    for i in range(0, len(text), size):
+        events += parser.feed(text[i:i + size])
+    return events + parser.close()
+
+
+async def chunks(items):
+    for item in items:
+        yield item
+
+
+class TestParser:
+    """Test event extraction."""
+
+    @pytest.mark.parametrize("size", [1, 2, 7, len(TEXT)])
+    def test_same_events_for_any_chunking(self, size):
+        events = parse(TEXT, size)
+        assert [(e.kind, e.key) for e in events] == [
+            (FIELD, "suspect"), (FIELD, "confidence"), (FIELD, "clues"), (FIELD, "note"), (OBJECT, None),
+            (CODE, None),
+            (FIELD, "rows"), (OBJECT, None), (CODE, None),
+        ]
+        assert events[4].value == {
+            "suspect": "Moriarty", "confidence": 0.9,
+            "clues": ["ash", {"kind": "tobacco"}], "note": 'a "}" brace',
+        }
+        assert (events[5].language, events[5].value) == ("python", "print('{not json}')\n  ``` still code\n")
+        assert (events[8].language, events[8].value) == ("json", '{"rows": [1, 2]}\n')
+
+    def test_fields_arrive_before_object_closes(self):
+        parser = StructuredParser()
+        assert [(e.key, e.value) for e in parser.feed('{"a": 1, "b": ')] == [("a", 1)]
+        events = parser.feed('{"x": [1]}, "c"')
+        assert [(e.key, e.value) for e in events] == [("b", {"x": [1]})]
+        assert [e.kind for e in parser.feed(": 3}")] == [FIELD, OBJECT]
+
+    def test_longer_fences_and_unterminated_block(self):
+        events = parse("````md\n```\ninner\n```\n````\n```sh\necho hi", 3)
+        assert [(e.language, e.value) for e in events] == [("md", "```\ninner\n```\n"), ("sh", "echo hi\n")]
+
+    def test_invalid_object_is_not_emitted(self):
+        events = parse('{"a": 1, "b": nope}', 4)
+        assert [e.kind for e in events] == [FIELD]
+
+    def test_stray_brace_in_prose_recovers(self):
+        events = parse('The brace "{" opens.\nThen {"a":1}\nand later {"b":2}', 3)
+        assert [(e.kind, e.key, e.value) for e in events] == [
+            (FIELD, "a", 1), (OBJECT, None, {"a": 1}), (FIELD, "b", 2), (OBJECT, None, {"b": 2}),
+        ]
+
+    def test_linear_time(self):
+        """Feeding one character at a time should not re-scan the buffer."""
+        body = ", ".join(f'"k{i}": "{"x" * 20}"' for i in range(2000))
+        text = "{" + body + "}"
+        start = time.perf_counter()
+        events = parse(text, 1)
+        elapsed = time.perf_counter() - start
+        assert len(events) == 2001 and len(events[-1].value) == 2000
+        assert elapsed < 2.0
+
+
+class TestStreaming:
+    """Test async helpers."""
+
+    @pytest.mark.asyncio
+    async def test_parse_stream(self):
+        events = [e async for e in parse_stream(chunks(['{"a"', ": 1}", "\n```\nx\n```\n"]))]
+        assert [(e.kind, e.value) for e in events] == [(FIELD, 1), (OBJECT, {"a": 1}), (CODE, "x\n")]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_sink(self):
+        seen = []
+
+        async def handler(event):
+            seen.append(event.kind)
+
+        sink = StructuredSink(on_event=handler)
+        await StreamPipeline([sink]).run(chunks(list(TEXT)))
+        assert seen == [e.kind for e in sink.events]
+        assert seen.count(OBJECT) == 2 and seen.count(CODE) == 2
@@ -0,0 +1,107 @@
+"""Tests for cached token accounting."""
+
+from src.agents.base import AgentContext, AgentMessage, AgentResult, BaseAgent
+from src.agents.history import ConversationHistory
+from src.agents.tokens import TokenCounter, estimate_tokens, get_token_counter
+from utils.license import TIER_LIMITS, LicenseTier
+
+
+class CountingEncoder:
+    """Whitespace tokenizer that records how often it was called."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return text.split()
+
+
+class EchoAgent(BaseAgent):
+    name = "echo"
+
+    async def execute(self, prompt):
+        return AgentResult(success=True, output=prompt)
+
+    async def stream(self, prompt):
+        yield prompt
+
+
+class TestTokenCounter:
+    """Test counting and caching."""
+
+    def test_custom_encoder(self):
+        """A custom encoder should be used for counts."""
+        counter = TokenCounter("words", encode=CountingEncoder())
+        assert counter.count("one two three") == 3
+        assert counter.exact is True
+
+    def test_estimate_mode(self):
+        """The estimate mode should not need tiktoken."""
+        counter = TokenCounter("estimate")
+        assert counter.count("x" * 40) == estimate_tokens("x" * 40) == 11
+        assert counter.exact is False
+
+    def test_message_count_cached(self):
+        """A message should only be tokenized once."""
+        encoder = CountingEncoder()
+        counter = TokenCounter("words", encode=encoder)
+        message = AgentMessage(role="user", content="a b c")
+        assert counter.count_message(message) == 3
+        assert counter.count_message(message) == 3
+        assert encoder.calls == 1
+
+    def test_cache_invalidated_on_content_change(self):
+        """Changing content or encoding should recount."""
+        encoder = CountingEncoder()
+        message = AgentMessage(role="user", content="a b c")
+        TokenCounter("words", encode=encoder).count_message(message)
+        message.content = "a b"
+        assert TokenCounter("words", encode=encoder).count_message(message) == 2
+        assert TokenCounter("estimate").count_message(message) == estimate_tokens("a b")
+
+    def test_batch_counts_only_missing(self):
+        """Bulk counting should skip messages with cached counts."""
+        encoder = CountingEncoder()
+        counter = TokenCounter("words", encode=encoder)
+        messages = [AgentMessage(role="user", content=f"m {i}") for i in range(10)]
+        counter.count_message(messages[0])
+        assert counter.count_messages(messages) == [2] * 10
+        assert encoder.calls == 10
+        counter.count_messages(messages)
+        assert encoder.calls == 10
+
+    def test_shared_counter_from_env(self):
+        """The shared counter should honour TERMINAL221B_TOKENIZER."""
+        assert get_token_counter() is get_token_counter()
+
+
+class TestRunningTotal:
+    """Test incremental totals in ConversationHistory."""
+
+    def test_total_tracks_appends_and_evictions(self):
+        """The running total should match a full recount after evictions."""
+        encoder = CountingEncoder()
+        counter = TokenCounter("words", encode=encoder)
+        history = ConversationHistory(budget=40, count_tokens=counter)
+        for i in range(100):
+            history.append(AgentMessage(role="user", content=f"turn {i} text"))
+        assert encoder.calls == 100
+        assert history.total_tokens == sum(counter.count_message(m) for m in history.messages)
+        assert encoder.calls == 100
+
+    def test_fits_run_limit(self):
+        """fits() should compare against max_tokens_per_run with a reserve."""
+        free = TIER_LIMITS[LicenseTier.FREE].max_tokens_per_run
+        history = ConversationHistory(count_tokens=TokenCounter("words", encode=str.split))
+        history.append(AgentMessage(role="user", content="word " * 900))
+        assert history.fits(free) is True
+        assert history.fits(free, completion_tokens=200) is False
+        assert history.fits(TIER_LIMITS[LicenseTier.ENTERPRISE].max_tokens_per_run, 10**9)
+
+    def test_agent_history_uses_shared_counter(self):
+        """BaseAgent history should cache counts on its messages."""
+        agent = EchoAgent(AgentContext(messages=[AgentMessage(role="user", content="hi")]))
+        agent.add_message("assistant", "hello there")
+        assert all(m._token_count is not None for m in agent.context.messages)
+        assert agent.history.total_tokens > 0
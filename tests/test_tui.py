@@ -0,0 +1,191 @@
+"""Tests for the TUI: frame coalescing, virtual scrollback and the Textual app."""
+
+import asyncio
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.fake import FakeAgent
+from src.main import cli
+from src.tui import FrameCoalescer, Scrollback, Terminal221bApp
+
+
+class TestFrameCoalescer:
+    """Test frame-rate-capped flushing."""
+
+    @pytest.mark.asyncio
+    async def test_merges_chunks_per_frame(self):
+        frames = []
+        coalescer = FrameCoalescer(frames.append, fps=20)
+        for i in range(100):
+            coalescer.push("a", f"{i},")
+            coalescer.push("b", "x")
+            if i % 10 == 0:
+                await asyncio.sleep(0.01)
+        coalescer.flush()
+        assert "".join(f.get("a", "") for f in frames) == "".join(f"{i}," for i in range(100))
+        assert "".join(f.get("b", "") for f in frames) == "x" * 100
+        assert len(frames) <= 4
+        assert coalescer.stats.chunks == 200
+        assert coalescer.stats.chunks_per_frame >= 50
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_after_idle_is_immediate(self):
+        frames = []
+        coalescer = FrameCoalescer(frames.append, fps=1)
+        coalescer.push("a", "hi")
+        await asyncio.sleep(0)
+        assert frames == [{"a": "hi"}]
+        coalescer.push("a", "later")
+        await asyncio.sleep(0.05)
+        assert len(frames) == 1  # held until the next frame slot
+        assert coalescer.pending == 1
+        coalescer.flush()
+        assert frames[-1] == {"a": "later"}
+
+    @pytest.mark.asyncio
+    async def test_frame_rate_cap(self):
+        stamps = []
+        coalescer = FrameCoalescer(lambda batch: stamps.append(time.monotonic()), fps=50)
+        end = time.monotonic() + 0.2
+        while time.monotonic() < end:
+            coalescer.push("a", ".")
+            await asyncio.sleep(0.001)
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        assert len(stamps) <= 12
+        assert min(gaps) >= 0.018
+
+    def test_invalid_fps(self):
+        with pytest.raises(ValueError):
+            FrameCoalescer(print, fps=0)
+
+
+class TestScrollback:
+    """Test the virtualized line buffer."""
+
+    def test_partial_lines(self):
+        lines = Scrollback()
+        assert len(lines) == 0
+        lines.append("hel")
+        lines.append("lo\nwor")
+        assert len(lines) == 2 and lines.partial == "wor"
+        lines.append("ld\n")
+        assert lines.window(0, 10) == ["hello", "world", ""]
+        assert len(lines) == 2
+        lines.write_line("> next")
+        assert lines.window(2, 1) == ["> next"]
+
+    def test_wrapping(self):
+        lines = Scrollback(width=10)
+        lines.append("the game is afoot elementary")
+        assert lines.window(0, 5) == ["the game ", "is afoot ", "elementary"]
+        lines.append("xxxxxxxxxxxxxxx")
+        assert all(len(row) <= 10 for row in lines.window(0, 10))
+
+    def test_max_lines_trims_in_chunks(self):
+        lines = Scrollback(max_lines=100)
+        for i in range(1000):
+            lines.write_line(str(i))
+        assert 100 <= len(lines) <= 113
+        assert lines.window(len(lines) - 1, 1) == ["999"]
+        assert lines.dropped + len(lines) == 1000
+
+    def test_window_cost_independent_of_length(self):
+        lines = Scrollback()
+        lines.append("row\n" * 200_000)
+        start = time.perf_counter()
+        for top in range(0, 200_000, 1000):
+            assert len(lines.window(top, 40)) == 40
+        assert time.perf_counter() - start < 0.05
+
+
+class TestTerminal221bApp:
+    """Test the Textual app with offline agents."""
+
+    @pytest.mark.asyncio
+    async def test_streams_into_panes(self):
+        agents = {"a": FakeAgent(output_tokens=300), "b": FakeAgent(output_tokens=40, tokens_per_second=2000)}
+        app = Terminal221bApp(agents, fps=30)
+        async with app.run_test(size=(100, 30)) as pilot:
+            app.submit("hello")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            for name, agent in agents.items():
+                transcript = app.panes[name].transcript
+                text = "".join(transcript.scrollback.window(1, len(transcript.scrollback)))
+                assert text.strip() == "".join(agent.tokens_for("hello")).strip()
+                assert transcript.virtual_size.height == len(transcript.scrollback)
+            assert app.coalescer.stats.frames < app.coalescer.stats.chunks
+
+    @pytest.mark.asyncio
+    async def test_large_transcript_renders_visible_rows_only(self):
+        app = Terminal221bApp({"a": FakeAgent()})
+        async with app.run_test(size=(80, 24)) as pilot:
+            transcript = app.panes["a"].transcript
+            transcript.write("line\n" * 100_000)
+            await pilot.pause()
+            assert transcript.scroll_offset.y == transcript.max_scroll_y > 0
+            start = time.perf_counter()
+            for y in range(transcript.size.height):
+                transcript.render_line(y)
+            assert time.perf_counter() - start < 0.05
+            assert transcript.render_line(0).text.rstrip() == "line"
+
+    @pytest.mark.asyncio
+    async def test_agent_errors_shown_in_pane(self):
+        app = Terminal221bApp({"a": FakeAgent(error_rate=1.0)})
+        async with app.run_test() as pilot:
+            app.submit("x")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            rows = app.panes["a"].transcript.scrollback.window(0, 10)
+            assert any("[error] Injected provider error" in row for row in rows)
+
+
+    @pytest.mark.asyncio
+    async def test_each_pane_run_is_charged(self):
+        runs = []
+
+        def can_run():
+            if len(runs) == 3:
+                return False, "Daily limit reached (3/3 runs)."
+            runs.append(1)
+            return True, ""
+
+        app = Terminal221bApp({"a": FakeAgent(), "b": FakeAgent()}, can_run=can_run)
+        async with app.run_test() as pilot:
+            app.submit("one")
+            app.submit("two")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert len(runs) == 3
+            rows = app.panes["b"].transcript.scrollback.window(0, 100)
+            assert any("[limit] Daily limit reached" in row for row in rows)
+
+
+class TestTuiCommand:
+    """Test `terminal221b tui` argument handling."""
+
+    def test_free_tier_pane_limit(self, monkeypatch):
+        monkeypatch.delenv("LICENSE_KEY", raising=False)
+        result = CliRunner().invoke(cli, ["tui", "-a", "analyst", "-a", "writer"], obj={})
+        assert result.exit_code == 1
+        assert "allows 1 agent pane" in result.output
+
+    def test_missing_agent_implementation(self, monkeypatch):
+        monkeypatch.delenv("LICENSE_KEY", raising=False)
+        result = CliRunner().invoke(cli, ["tui"], obj={})
+        assert result.exit_code == 0
+        assert "not implemented yet" in result.output
+
+    def test_demo_is_not_charged(self, monkeypatch):
+        from src.tui import Terminal221bApp as App
+        from utils.license import LicenseManager
+
+        launched = []
+        monkeypatch.setattr(LicenseManager, "can_run", lambda self: pytest.fail("demo charged a run"))
+        monkeypatch.setattr(App, "run", lambda self: launched.append(self))
+        result = CliRunner().invoke(cli, ["tui", "--demo"], obj={})
+        assert result.exit_code == 0, result.output
+        assert launched[0].can_run is None
@@ -0,0 +1,201 @@
+"""
+Terminal221b Usage Ledger
+
+Durable, multi-process-safe daily run counter backing LicenseManager.can_run().
+Usage lives in a SQLite database in WAL mode with one row per (account, day),
+so every worker on the machine draws from the same daily budget.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, day)
+) WITHOUT ROWID
+"""
+
+
+def default_ledger_path() -> Path:
+    """Get the ledger location (``TERMINAL221B_LEDGER`` or ``~/.terminal221b/usage.db``)."""
+    override = os.environ.get("TERMINAL221B_LEDGER")
+    if override:
+        return Path(override)
+    return Path.home() / ".terminal221b" / "usage.db"
+
+
+class UsageLedger:
+    """Per-day run counter shared by every process that opens the same file.
+
+    Each check-and-increment runs in a ``BEGIN IMMEDIATE`` transaction, so two
+    processes can never both take the last run of the day. With
+    ``lease_size > 1`` the ledger reserves runs in blocks and hands them out
+    from memory, trading one fsync per run for one per block; unused runs are
+    returned on ``close()``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        lease_size: int = 1,
+        synchronous: str = "NORMAL",
+        timeout: float = 5.0,
+        today: Callable[[], date] = date.today,
+    ):
+        """Open (or create) the ledger.
+
+        Args:
+            path: Database file, or ``":memory:"`` for a process-local ledger
+            lease_size: Runs reserved per database write (1 disables batching)
+            synchronous: SQLite ``synchronous`` pragma (``NORMAL`` is safe in WAL mode)
+            timeout: Seconds to wait for another process holding the write lock
+            today: Clock used to pick the day bucket
+        """
+        if lease_size < 1:
+            raise ValueError("lease_size must be at least 1")
+        self.path = str(path)
+        self.lease_size = lease_size
+        self.synchronous = synchronous
+        self.timeout = timeout
+        self._today = today
+        self._lock = threading.Lock()
+        self._leases: Dict[Tuple[str, str], int] = {}
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        atexit.register(self.close)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork; reopen in the child.
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+            self._leases.clear()
+            self._seen.clear()
+        return self._conn
+
+    def _reserve(self, conn: sqlite3.Connection, account: str, day: str, limit: int, want: int) -> Tuple[int, int]:
+        """Atomically reserve up to ``want`` runs; return (granted, runs recorded)."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT runs FROM usage WHERE account = ? AND day = ?", (account, day)
+            ).fetchone()
+            used = row[0] if row else 0
+            granted = want if limit < 0 else max(0, min(want, limit - used))
+            if granted:
+                conn.execute(
+                    "INSERT INTO usage (account, day, runs) VALUES (?, ?, ?) "
+                    "ON CONFLICT (account, day) DO UPDATE SET runs = runs + excluded.runs",
+                    (account, day, granted),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return granted, used + granted
+
+    def reserve(self, account: str, limit: int, count: int = 1) -> Tuple[int, int]:
+        """Reserve up to ``count`` runs for today.
+
+        Args:
+            account: Usage bucket (e.g. the license tier)
+            limit: Maximum runs per day, or -1 for unlimited
+            count: Runs wanted
+
+        Returns:
+            Tuple of (runs granted, runs used today including this reservation)
+        """
+        day = self._today().isoformat()
+        key = (account, day)
+        with self._lock:
+            conn = self._connection()
+            leased = self._leases.get(key, 0)
+            from_lease = min(leased, count)
+            granted = from_lease
+            leased -= from_lease
+            if count > from_lease:
+                want = max(count - from_lease, self.lease_size)
+                reserved, self._seen[key] = self._reserve(conn, account, day, limit, want)
+                extra = min(reserved, count - from_lease)
+                granted += extra
+                leased += reserved - extra
+            self._leases[key] = leased
+            return granted, self._seen.get(key, 0) - leased
+
+    def try_acquire(self, account: str, limit: int) -> Tuple[bool, int]:
+        """Check-and-increment one run for today.
+
+        Returns:
+            Tuple of (allowed, runs used today)
+        """
+        granted, used = self.reserve(account, limit, 1)
+        return granted == 1, used
+
+    def release(self, account: str, count: int) -> None:
+        """Give back ``count`` reserved-but-unused runs for today.
+
+        They join this process's lease, so later reservations reuse them and
+        ``flush()`` returns any remainder to the shared ledger.
+        """
+        key = (account, self._today().isoformat())
+        with self._lock:
+            self._leases[key] = self._leases.get(key, 0) + count
+
+    def runs_today(self, account: str) -> int:
+        """Get runs used today for an account (excluding this process's unused lease)."""
+        day = self._today().isoformat()
+        with self._lock:
+            conn = self._connection()
+            return self._recorded(conn, account, day) - self._leases.get((account, day), 0)
+
+    @staticmethod
+    def _recorded(conn: sqlite3.Connection, account: str, day: str) -> int:
+        row = conn.execute(
+            "SELECT runs FROM usage WHERE account = ? AND day = ?", (account, day)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def flush(self) -> None:
+        """Return unused leased runs to the shared ledger."""
+        with self._lock:
+            if self._conn is None or self._pid != os.getpid():
+                return
+            pending = [(n, acct, day) for (acct, day), n in self._leases.items() if n]
+            if pending:
+                self._conn.executemany(
+                    "UPDATE usage SET runs = MAX(0, runs - ?) WHERE account = ? AND day = ?",
+                    pending,
+                )
+            self._leases.clear()
+            self._seen.clear()
+
+    def close(self) -> None:
+        """Flush leases and close the database connection."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "UsageLedger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
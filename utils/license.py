@@ -8,9 +8,15 @@ Tiers: Free, Pro, Enterprise
 import os
 import time
 from dataclasses import dataclass
-from enum import Enum
-from typing import Optional, Tuple
 from datetime import datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from utils import metrics
+
+if TYPE_CHECKING:
+    from utils.ledger import UsageLedger
+    from utils.license_token import LicenseClaims, LicenseVerifier
 
 
 class LicenseTier(Enum):
@@ -55,13 +61,25 @@ TIER_LIMITS = {
 
 
 class LicenseManager:
-    """Manages license validation and usage tracking."""
+    """Manages license validation and usage tracking.
     
-    def __init__(self):
+    Usage is counted in memory unless a UsageLedger is supplied, in which
+    case the daily limit is shared by every process using the same ledger.
+    """
+    
+    def __init__(
+        self,
+        ledger: Optional["UsageLedger"] = None,
+        verifier: Optional["LicenseVerifier"] = None,
+    ):
         self.tier = LicenseTier.FREE
         self.key: Optional[str] = None
         self.daily_runs = 0
         self.last_reset = datetime.now()
+        self.ledger = ledger
+        self.verifier = verifier
+        self.claims: Optional["LicenseClaims"] = None
+        self.refresh_thread = None  # background license refresh, if one was started
         self._initialize()
     
     def _initialize(self):
@@ -71,22 +89,50 @@ class LicenseManager:
         if not self.key:
             self.tier = LicenseTier.FREE
             self._print_free_tier_message()
-        elif self._validate_key(self.key):
-            if self.key.startswith("ENT_"):
-                self.tier = LicenseTier.ENTERPRISE
-                print("✅ Enterprise License activated - Unlimited usage")
-            else:
-                self.tier = LicenseTier.PRO
-                print("✅ Pro License activated - 100 runs/day, 3 agents")
+            return
+        tier = self._tier_for_key(self.key)
+        if tier == LicenseTier.ENTERPRISE:
+            self.tier = tier
+            print("✅ Enterprise License activated - Unlimited usage")
+        elif tier == LicenseTier.PRO:
+            self.tier = tier
+            print("✅ Pro License activated - 100 runs/day, 3 agents")
         else:
             self.tier = LicenseTier.FREE
             print("⚠️  Invalid license key. Falling back to Free Tier.")
             self._print_free_tier_message()
     
+    def _tier_for_key(self, key: str) -> Optional[LicenseTier]:
+        """Tier granted by a license key, or None if it is invalid."""
+        from utils.license_token import is_signed_token
+        
+        if not is_signed_token(key):
+            if not self._validate_key(key):
+                return None
+            return LicenseTier.ENTERPRISE if key.startswith("ENT_") else LicenseTier.PRO
+        return self._tier_for_token(key)
+    
+    def _tier_for_token(self, token: str) -> Optional[LicenseTier]:
+        """Verify a signed token offline and schedule a background refresh."""
+        from utils.license_token import LicenseError, LicenseVerifier
+        
+        if self.verifier is None:
+            self.verifier = LicenseVerifier()
+        try:
+            self.claims = self.verifier.check(token)
+            tier = LicenseTier(self.claims.tier)
+        except (LicenseError, ValueError):
+            self.claims = None
+            return None
+        if tier == LicenseTier.FREE:
+            return None
+        self.refresh_thread = self.verifier.refresh_in_background(token)
+        return tier
+    
     def _validate_key(self, key: str) -> bool:
         """
-        Validate license key format.
-        TODO: Connect to Gumroad/LemonSqueezy API for real validation.
+        Validate a legacy (unsigned) license key's format.
+        Signed tokens are checked by utils.license_token instead.
         """
         if key.startswith("PRO_") and len(key) >= 20:
             return True
@@ -96,6 +142,19 @@ class LicenseManager:
     
     def can_run(self) -> Tuple[bool, str]:
         """Check if user can perform another run."""
+        if not metrics.enabled():
+            return self._can_run()
+        start = time.perf_counter()
+        try:
+            return self._can_run()
+        finally:
+            metrics.observe("license_can_run_seconds", time.perf_counter() - start, tier=self.tier.value)
+    
+    def _can_run(self) -> Tuple[bool, str]:
+        """Check-and-increment a run against the tier's daily limit."""
+        if self.ledger is not None:
+            return self._can_run_ledger()
+        
         # Reset daily counter if new day
         if datetime.now() - self.last_reset > timedelta(days=1):
             self.daily_runs = 0
@@ -115,6 +174,40 @@ class LicenseManager:
         self.daily_runs += 1
         return True, ""
     
+    def _can_run_ledger(self) -> Tuple[bool, str]:
+        """Atomic check-and-increment against the shared usage ledger."""
+        limits = TIER_LIMITS[self.tier]
+        allowed, self.daily_runs = self.ledger.try_acquire(self.tier.value, limits.max_runs_per_day)
+        if not allowed:
+            return False, f"Daily limit reached ({self.daily_runs}/{limits.max_runs_per_day} runs). Upgrade at https://bakerstreetproject221B.store/pricing"
+        return True, ""
+    
+    def reserve_runs(self, count: int) -> int:
+        """Charge up to ``count`` runs in one go; return how many were granted.
+
+        Used by batch mode so a large input costs one license check per block
+        instead of one per prompt.
+        """
+        limits = TIER_LIMITS[self.tier]
+        if self.ledger is not None:
+            granted, self.daily_runs = self.ledger.reserve(self.tier.value, limits.max_runs_per_day, count)
+            return granted
+        if datetime.now() - self.last_reset > timedelta(days=1):
+            self.daily_runs = 0
+            self.last_reset = datetime.now()
+        if limits.max_runs_per_day == -1:
+            granted = count
+        else:
+            granted = max(0, min(count, limits.max_runs_per_day - self.daily_runs))
+        self.daily_runs += granted
+        return granted
+    
+    def release_runs(self, count: int) -> None:
+        """Return runs reserved with reserve_runs() that were not used."""
+        if self.ledger is not None:
+            self.ledger.release(self.tier.value, count)
+        self.daily_runs = max(0, self.daily_runs - count)
+    
     def get_limits(self) -> LicenseLimits:
         """Get current tier limits."""
         return TIER_LIMITS[self.tier]
@@ -0,0 +1,458 @@
+"""
+Terminal221b Signed License Tokens
+
+A license token is a small JSON claim set signed with ed25519 by the
+license server:
+
+    t221b1.<base64url claims>.<base64url signature>
+
+Tokens are verified locally against the license server's public keys
+(TRUSTED_KEYS, or TERMINAL221B_LICENSE_KEYS to rotate or self-host), so
+activating a license never needs the network. Every check verifies the
+signature; the on-disk cache (TERMINAL221B_LICENSE_CACHE, default
+~/.terminal221b/license.json) is user-writable, so it only records the
+newest token the server issued for a key, whether the server revoked
+it, and when it was refreshed.
+
+Revocations and renewals come from an online refresh that runs on a
+daemon thread and never delays startup. A short-lived command may exit
+while it is in flight, so exit waits up to REFRESH_EXIT_WAIT seconds for
+it, and the attempt is recorded up front so a failing refresh is retried
+once per interval rather than on every start. The endpoint is any callable
+taking the token and returning the server's JSON reply, so tests and
+self-hosted setups can plug in their own. The default POSTs to
+TERMINAL221B_LICENSE_URL.
+
+Signatures are checked with the optional ``cryptography`` package when
+it is installed (pip install terminal221b[license]). Otherwise a pure
+Python RFC 8032 implementation is used (a few milliseconds per check).
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+TOKEN_PREFIX = "t221b1."
+
+# Production ed25519 public keys of the bakerstreetproject221B.store license
+# server (hex). The first signs new tokens; older keys stay listed until every
+# token they signed has expired. TERMINAL221B_LICENSE_KEYS (comma-separated
+# hex) replaces this list, for key rotation ahead of a release or a
+# self-hosted license server.
+TRUSTED_KEYS = (
+    "4b7f6498db93197bad2a86785fc8e53d00e6450ce35b4b8a8b7fe076e5b7c8a8",
+)
+
+DEFAULT_REFRESH_URL = "https://bakerstreetproject221B.store/api/license/refresh"
+REFRESH_INTERVAL = 24 * 3600  # seconds between online refreshes
+REFRESH_EXIT_WAIT = 3.0  # seconds interpreter exit waits for an in-flight refresh
+
+# Takes a token; returns {"token": "<renewed token>"} or {"revoked": true}
+RefreshEndpoint = Callable[[str], Dict[str, Any]]
+
+
+class LicenseError(ValueError):
+    """Raised for malformed, forged or expired license tokens."""
+
+
+@dataclass
+class LicenseClaims:
+    """Verified contents of a license token."""
+
+    tier: str
+    subject: str = ""
+    issued_at: int = 0
+    expires_at: Optional[int] = None  # unix seconds, None for perpetual
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+
+def is_signed_token(key: str) -> bool:
+    return key.startswith(TOKEN_PREFIX)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def trusted_keys() -> List[str]:
+    """Public keys tokens are checked against (TERMINAL221B_LICENSE_KEYS overrides)."""
+    override = os.environ.get("TERMINAL221B_LICENSE_KEYS")
+    if override:
+        return [key.strip() for key in override.split(",") if key.strip()]
+    return list(TRUSTED_KEYS)
+
+
+def default_cache_path() -> Path:
+    """Verification cache location (TERMINAL221B_LICENSE_CACHE overrides)."""
+    override = os.environ.get("TERMINAL221B_LICENSE_CACHE")
+    if override:
+        return Path(override)
+    return Path.home() / ".terminal221b" / "license.json"
+
+
+# --- ed25519 (RFC 8032) -------------------------------------------------------
+
+_P = 2 ** 255 - 19
+_L = 2 ** 252 + 27742317777372353535851937790883648493
+_D = -121665 * pow(121666, _P - 2, _P) % _P
+_SQRT_M1 = pow(2, (_P - 1) // 4, _P)
+
+
+def _recover_x(y: int, sign: int) -> Optional[int]:
+    xx = (y * y - 1) * pow(_D * y * y + 1, _P - 2, _P) % _P
+    x = pow(xx, (_P + 3) // 8, _P)
+    if (x * x - xx) % _P:
+        x = x * _SQRT_M1 % _P
+    if (x * x - xx) % _P or (x == 0 and sign):
+        return None
+    return _P - x if x & 1 != sign else x
+
+
+_BASE_Y = 4 * pow(5, _P - 2, _P) % _P
+_BASE_X = _recover_x(_BASE_Y, 0)
+_BASE = (_BASE_X, _BASE_Y, 1, _BASE_X * _BASE_Y % _P)
+
+
+def _add(p, q):
+    """Point addition in extended coordinates (also valid for doubling)."""
+    a = (p[1] - p[0]) * (q[1] - q[0]) % _P
+    b = (p[1] + p[0]) * (q[1] + q[0]) % _P
+    c = 2 * p[3] * q[3] * _D % _P
+    d = 2 * p[2] * q[2] % _P
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return (e * f % _P, g * h % _P, f * g % _P, e * h % _P)
+
+
+def _mul(scalar: int, point):
+    result = (0, 1, 1, 0)
+    while scalar:
+        if scalar & 1:
+            result = _add(result, point)
+        point = _add(point, point)
+        scalar >>= 1
+    return result
+
+
+def _encode_point(point) -> bytes:
+    inv = pow(point[2], _P - 2, _P)
+    x, y = point[0] * inv % _P, point[1] * inv % _P
+    return (y | (x & 1) << 255).to_bytes(32, "little")
+
+
+def _decode_point(data: bytes):
+    y = int.from_bytes(data, "little")
+    sign, y = y >> 255, y & ((1 << 255) - 1)
+    if y >= _P:
+        return None
+    x = _recover_x(y, sign)
+    return None if x is None else (x, y, 1, x * y % _P)
+
+
+def _hash_int(*parts: bytes) -> int:
+    return int.from_bytes(hashlib.sha512(b"".join(parts)).digest(), "little")
+
+
+def _expand_seed(seed: bytes):
+    digest = hashlib.sha512(seed).digest()
+    scalar = int.from_bytes(digest[:32], "little") & ((1 << 254) - 8) | (1 << 254)
+    return scalar, digest[32:]
+
+
+def _py_public_key(seed: bytes) -> bytes:
+    return _encode_point(_mul(_expand_seed(seed)[0], _BASE))
+
+
+def _py_sign(seed: bytes, message: bytes) -> bytes:
+    scalar, prefix = _expand_seed(seed)
+    public = _encode_point(_mul(scalar, _BASE))
+    r = _hash_int(prefix, message) % _L
+    encoded_r = _encode_point(_mul(r, _BASE))
+    s = (r + _hash_int(encoded_r, public, message) % _L * scalar) % _L
+    return encoded_r + s.to_bytes(32, "little")
+
+
+def _py_verify(public: bytes, message: bytes, signature: bytes) -> bool:
+    if len(public) != 32 or len(signature) != 64:
+        return False
+    a, r = _decode_point(public), _decode_point(signature[:32])
+    s = int.from_bytes(signature[32:], "little")
+    if a is None or r is None or s >= _L:
+        return False
+    k = _hash_int(signature[:32], public, message) % _L
+    left, right = _mul(s, _BASE), _add(r, _mul(k, a))
+    return (left[0] * right[2] - right[0] * left[2]) % _P == 0 and (
+        left[1] * right[2] - right[1] * left[2]
+    ) % _P == 0
+
+
+def _crypto():
+    """The cryptography ed25519 module, or None if it is not installed."""
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+    except ImportError:
+        return None
+    return ed25519
+
+
+def verify_signature(public: bytes, message: bytes, signature: bytes) -> bool:
+    """Check an ed25519 signature."""
+    ed25519 = _crypto()
+    if ed25519 is None:
+        return _py_verify(public, message, signature)
+    from cryptography.exceptions import InvalidSignature
+
+    try:
+        ed25519.Ed25519PublicKey.from_public_bytes(public).verify(signature, message)
+    except (InvalidSignature, ValueError):
+        return False
+    return True
+
+
+def public_key_for(seed: bytes) -> bytes:
+    """ed25519 public key for a 32-byte private seed."""
+    ed25519 = _crypto()
+    if ed25519 is None:
+        return _py_public_key(seed)
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    key = ed25519.Ed25519PrivateKey.from_private_bytes(seed).public_key()
+    return key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+
+def sign_token(claims: LicenseClaims, seed: bytes) -> str:
+    """Issue a token for ``claims`` (license server and test tooling)."""
+    body = _b64encode(json.dumps(asdict(claims), separators=(",", ":"), sort_keys=True).encode())
+    message = (TOKEN_PREFIX + body).encode("ascii")
+    ed25519 = _crypto()
+    if ed25519 is None:
+        signature = _py_sign(seed, message)
+    else:
+        signature = ed25519.Ed25519PrivateKey.from_private_bytes(seed).sign(message)
+    return f"{TOKEN_PREFIX}{body}.{_b64encode(signature)}"
+
+
+# --- Verification cache and refresh -------------------------------------------
+
+
+class LicenseCache:
+    """On-disk refresh state per license key, keyed by a hash of the key."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else default_cache_path()
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        return self.load().get(self.key_for(token))
+
+    def put(self, token: str, entry: Dict[str, Any]) -> None:
+        entries = self.load()
+        entries[self.key_for(token)] = entry
+        self._save(entries)
+
+    def discard(self, token: str) -> None:
+        entries = self.load()
+        if entries.pop(self.key_for(token), None) is not None:
+            self._save(entries)
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".license-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+
+def http_endpoint(url: Optional[str] = None, timeout: float = 10.0) -> RefreshEndpoint:
+    """Refresh endpoint that POSTs ``{"token": ...}`` as JSON to ``url``."""
+    url = url or os.environ.get("TERMINAL221B_LICENSE_URL", DEFAULT_REFRESH_URL)
+
+    def refresh(token: str) -> Dict[str, Any]:
+        import urllib.request
+
+        request = urllib.request.Request(
+            url,
+            data=json.dumps({"token": token}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+
+    return refresh
+
+
+class LicenseVerifier:
+    """Verifies license tokens offline, with a disk cache and background refresh.
+
+    Usage:
+        verifier = LicenseVerifier()
+        claims = verifier.check(os.environ["LICENSE_KEY"])
+        verifier.refresh_in_background(os.environ["LICENSE_KEY"])
+    """
+
+    def __init__(
+        self,
+        public_keys: Optional[Iterable[Union[str, bytes]]] = None,
+        cache: Optional[LicenseCache] = None,
+        endpoint: Optional[RefreshEndpoint] = None,
+        refresh_interval: float = REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize verifier.
+
+        Args:
+            public_keys: Trusted ed25519 public keys, hex or raw bytes (default: ``trusted_keys()``)
+            cache: Verification cache (default: ``default_cache_path()``)
+            endpoint: Online refresh endpoint (default: ``http_endpoint()``)
+            refresh_interval: Seconds between online refreshes
+            clock: Wall clock in unix seconds
+        """
+        if public_keys is None:
+            public_keys = trusted_keys()
+        self.public_keys = [bytes.fromhex(k) if isinstance(k, str) else bytes(k) for k in public_keys]
+        self.cache = cache or LicenseCache()
+        self.endpoint = endpoint
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+
+    def verify(self, token: str) -> LicenseClaims:
+        """Check a token's signature and expiry (no cache).
+
+        Raises:
+            LicenseError: If the token is malformed, not signed by a trusted key, or expired
+        """
+        if not is_signed_token(token):
+            raise LicenseError("Not a signed license token")
+        try:
+            body, signature = token[len(TOKEN_PREFIX):].split(".")
+            raw_signature = _b64decode(signature)
+            data = json.loads(_b64decode(body))
+            claims = LicenseClaims(**data)
+        except (ValueError, TypeError, binascii.Error) as e:
+            raise LicenseError(f"Malformed license token ({e})") from None
+        message = (TOKEN_PREFIX + body).encode("ascii")
+        if not any(verify_signature(key, message, raw_signature) for key in self.public_keys):
+            raise LicenseError("License token signature is invalid")
+        if claims.expired(self._clock()):
+            raise LicenseError("License token has expired")
+        return claims
+
+    def check(self, token: str) -> LicenseClaims:
+        """Claims for ``token``, or for the newest token the server renewed it to.
+
+        The signature is checked on every call. The user-writable cache only
+        says which token is current and when it was last refreshed; it is
+        never trusted for the claims themselves.
+
+        Raises:
+            LicenseError: If the token does not verify
+        """
+        entry = self.cache.get(token)
+        if isinstance(entry, dict) and entry.get("revoked"):
+            raise LicenseError("License token has been revoked")
+        current = entry.get("token") if isinstance(entry, dict) else None
+        try:
+            claims = self.verify(current if isinstance(current, str) else token)
+        except LicenseError:
+            if entry is not None:
+                self.cache.discard(token)
+            raise
+        if not isinstance(entry, dict):
+            self.cache.put(token, {"token": token, "refreshed_at": 0})
+        return claims
+
+    def refresh_due(self, token: str) -> bool:
+        entry = self.cache.get(token)
+        if entry is None:
+            return False
+        last = max(entry.get("refreshed_at", 0), entry.get("attempted_at", 0))
+        return self._clock() - last >= self.refresh_interval
+
+    def refresh(self, token: str) -> Optional[LicenseClaims]:
+        """Ask the endpoint about ``token`` and update the cache.
+
+        Network errors keep the current state; a revocation is recorded so
+        ``check`` rejects the key from then on, and a renewed token becomes
+        the one ``check`` verifies.
+
+        Returns:
+            The refreshed claims, or None if revoked or the endpoint failed
+        """
+        endpoint = self.endpoint or http_endpoint()
+        try:
+            reply = endpoint(token)
+        except Exception:
+            return None  # offline: the cached verification stands until it expires
+        if reply.get("revoked"):
+            # Remembered on disk: the signature alone would still verify offline
+            self.cache.put(token, {"revoked": True, "refreshed_at": self._clock()})
+            return None
+        renewed = reply.get("token") or token
+        try:
+            claims = self.verify(renewed)
+        except LicenseError:
+            return None
+        self.cache.put(token, {"token": renewed, "refreshed_at": self._clock()})
+        return claims
+
+    def refresh_in_background(self, token: str):
+        """Start ``refresh`` on a daemon thread if one is due.
+
+        Returns:
+            The started thread, or None if no refresh was due
+        """
+        if not self.refresh_due(token):
+            return None
+        import threading
+
+        entry = self.cache.get(token)
+        if entry is not None:
+            self.cache.put(token, {**entry, "attempted_at": self._clock()})
+        thread = threading.Thread(target=self.refresh, args=(token,), name="license-refresh", daemon=True)
+        thread.start()
+        _track_refresh(thread)
+        return thread
+
+
+_refresh_threads: List[Any] = []  # refreshes exit should wait for
+
+
+def _track_refresh(thread) -> None:
+    import atexit
+
+    atexit.unregister(_wait_for_refreshes)  # keep a single registration
+    atexit.register(_wait_for_refreshes)
+    _refresh_threads[:] = [t for t in _refresh_threads if t.is_alive()]
+    _refresh_threads.append(thread)
+
+
+def _wait_for_refreshes(timeout: float = REFRESH_EXIT_WAIT) -> None:
+    """Give in-flight refreshes a bounded chance to finish before exit."""
+    deadline = time.monotonic() + timeout
+    for thread in _refresh_threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    _refresh_threads.clear()
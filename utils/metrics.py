@@ -0,0 +1,299 @@
+"""
+Terminal221b Metrics
+
+Low-overhead histograms for hot paths (agent execution, licensing, CLI
+startup). Recording is off unless TERMINAL221B_METRICS=1; when off, each
+instrumented call costs one flag check. Histograms use fixed buckets, so
+observing a value is a bisect and an increment, never a log line.
+
+Enabled processes merge their histograms into a JSON snapshot on exit
+(TERMINAL221B_METRICS_FILE, default ~/.terminal221b/metrics.json), which
+`terminal221b stats` reads and can export as Prometheus/OpenMetrics text.
+"""
+
+import atexit
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(
+    m * 10.0 ** e for e in range(-6, 2) for m in (1, 2.5, 5)
+)  # 1µs .. 50s
+SIZE_BUCKETS: Tuple[float, ...] = tuple(
+    m * 10.0 ** e for e in range(0, 7) for m in (1, 2.5, 5)
+)  # 1 .. 5M
+
+# Known metrics and their buckets; unknown names use LATENCY_BUCKETS
+METRICS: Dict[str, Tuple[float, ...]] = {
+    "agent_latency_seconds": LATENCY_BUCKETS,
+    "agent_ttft_seconds": LATENCY_BUCKETS,
+    "agent_queue_wait_seconds": LATENCY_BUCKETS,
+    "agent_tokens_used": SIZE_BUCKETS,
+    "agent_tokens_per_second": SIZE_BUCKETS,
+    "license_can_run_seconds": LATENCY_BUCKETS,
+    "cli_startup_seconds": LATENCY_BUCKETS,
+    "speculative_tokens_wasted": SIZE_BUCKETS,
+    "speculative_tokens_saved": SIZE_BUCKETS,
+    "scheduler_queue_depth": SIZE_BUCKETS,
+    "scheduler_wait_seconds": LATENCY_BUCKETS,
+    "prompt_prefill_tokens_saved": SIZE_BUCKETS,
+    "rpc_batch_size": SIZE_BUCKETS,
+    "rpc_round_trip_seconds": LATENCY_BUCKETS,
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum, min and max."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile as the upper bound of its bucket (clamped to max)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def merge(self, other: "Histogram") -> None:
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "bounds": list(self.bounds),
+            "counts": self.counts,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        hist = cls(data["bounds"])
+        hist.counts = list(data["counts"])
+        hist.count = data["count"]
+        hist.sum = data["sum"]
+        hist.min = data["min"] if data["min"] is not None else math.inf
+        hist.max = data["max"] if data["max"] is not None else -math.inf
+        return hist
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and labels."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self.default_labels: Dict[str, str] = {}
+
+    def _key(self, name: str, labels: Dict[str, object]) -> Tuple[str, LabelKey]:
+        merged = dict(self.default_labels)
+        merged.update({k: str(v) for k, v in labels.items() if v is not None})
+        return name, tuple(sorted(merged.items()))
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = self._key(name, labels)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram(METRICS.get(name, LATENCY_BUCKETS))
+        return hist
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self.histogram(name, **labels).observe(value)
+
+    def clear(self) -> None:
+        self.histograms.clear()
+
+    def snapshot(self) -> List[dict]:
+        return [
+            {"name": name, "labels": dict(labels), **hist.to_dict()}
+            for (name, labels), hist in sorted(self.histograms.items())
+        ]
+
+    def merge_snapshot(self, snapshot: List[dict]) -> None:
+        for entry in snapshot:
+            key = (entry["name"], tuple(sorted(entry["labels"].items())))
+            incoming = Histogram.from_dict(entry)
+            existing = self.histograms.get(key)
+            if existing is None:
+                self.histograms[key] = incoming
+            else:
+                existing.merge(incoming)
+
+    def to_prometheus(self, prefix: str = "terminal221b_") -> str:
+        """Render histograms in Prometheus/OpenMetrics text format."""
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), hist in sorted(self.histograms.items()):
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, n in zip(list(hist.bounds) + [math.inf], hist.counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                lines.append(f'{metric}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            label_part = f"{{{base}}}" if base else ""
+            lines.append(f"{metric}_count{label_part} {hist.count}")
+            lines.append(f"{metric}_sum{label_part} {hist.sum}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+_enabled = os.environ.get("TERMINAL221B_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+
+def enabled() -> bool:
+    """Whether metrics are being recorded."""
+    return _enabled
+
+
+def enable(flag: bool = True) -> None:
+    """Turn recording on or off for this process."""
+    global _enabled
+    _enabled = flag
+
+
+def set_default_labels(**labels) -> None:
+    """Labels added to every observation (e.g. the license tier)."""
+    registry.default_labels.update({k: str(v) for k, v in labels.items()})
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record a value if metrics are enabled."""
+    if _enabled:
+        registry.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels) -> Iterator[None]:
+    """Record the duration of a block if metrics are enabled."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, **labels)
+
+
+def snapshot_path() -> Path:
+    """Location of the persisted snapshot."""
+    override = os.environ.get("TERMINAL221B_METRICS_FILE")
+    if override:
+        return Path(override)
+    return Path.home() / ".terminal221b" / "metrics.json"
+
+
+def load_snapshot(path: Optional[Path] = None) -> MetricsRegistry:
+    """Load a persisted snapshot into a new registry."""
+    loaded = MetricsRegistry()
+    path = path or snapshot_path()
+    try:
+        loaded.merge_snapshot(json.loads(path.read_text(encoding="utf-8")))
+    except (FileNotFoundError, ValueError):
+        pass
+    return loaded
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    import tempfile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        import fcntl
+    except ImportError:  # Windows: best effort
+        yield
+        return
+    with open(str(path) + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def save_snapshot(path: Optional[Path] = None) -> None:
+    """Merge this process's histograms into the persisted snapshot."""
+    if not registry.histograms:
+        return
+    path = path or snapshot_path()
+    with _locked(path):
+        merged = load_snapshot(path)
+        merged.merge_snapshot(registry.snapshot())
+        _atomic_write(path, json.dumps(merged.snapshot()))
+    registry.clear()
+
+
+def write_prometheus(path: Path, source: Optional[MetricsRegistry] = None) -> None:
+    """Write a Prometheus text-file collector export."""
+    _atomic_write(Path(path), (source or registry).to_prometheus())
+
+
+def _save_on_exit() -> None:
+    if _enabled:
+        try:
+            save_snapshot()
+        except OSError:
+            pass
+
+
+atexit.register(_save_on_exit)
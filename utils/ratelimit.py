@@ -0,0 +1,250 @@
+"""
+Terminal221b Rate Limiting
+
+Asyncio token buckets that smooth run and token bursts per license tier.
+Callers await capacity instead of failing hard; the daily run ceiling in
+LicenseManager.can_run() still applies on top. The serve daemon and
+`terminal221b run` take a run slot and charge streamed tokens through
+``get_rate_limiter(tier)``.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from utils.license import TIER_LIMITS, LicenseLimits, LicenseTier
+
+
+class TokenBudgetExceededError(RuntimeError):
+    """Raised when a run would consume more than max_tokens_per_run."""
+
+
+@dataclass
+class RateLimits:
+    runs_per_minute: float  # -1 for unlimited
+    run_burst: int
+    tokens_per_second: float  # -1 for unlimited
+    token_burst: int
+
+
+# Tier rate configurations
+TIER_RATE_LIMITS = {
+    LicenseTier.FREE: RateLimits(
+        runs_per_minute=1,
+        run_burst=2,
+        tokens_per_second=50,
+        token_burst=1000,
+    ),
+    LicenseTier.PRO: RateLimits(
+        runs_per_minute=30,
+        run_burst=10,
+        tokens_per_second=500,
+        token_burst=10000,
+    ),
+    LicenseTier.ENTERPRISE: RateLimits(
+        runs_per_minute=-1,  # Unlimited
+        run_burst=-1,
+        tokens_per_second=-1,  # Unlimited
+        token_burst=-1,
+    ),
+}
+
+
+class TokenBucket:
+    """Token bucket with a FIFO of waiters and a single wake-up timer.
+
+    Waiters never poll: one timer is armed for the moment the head of the
+    queue can be served, so an acquire costs O(1) no matter how many
+    coroutines are queued behind it.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """Create a bucket that starts full.
+
+        Args:
+            rate: Tokens added per second, or -1 for unlimited
+            capacity: Maximum burst size
+            clock: Monotonic clock in seconds
+
+        Raises:
+            ValueError: If ``rate`` is 0 (the bucket would never refill)
+        """
+        if rate == 0:
+            raise ValueError("rate must be positive, or negative for unlimited")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate < 0
+
+    @property
+    def waiting(self) -> int:
+        """Number of queued acquires (including cancelled ones not yet skipped)."""
+        return len(self._waiters)
+
+    def available(self) -> float:
+        """Get tokens currently in the bucket."""
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1) -> bool:
+        """Take tokens without waiting; never jumps ahead of queued waiters."""
+        if self.unlimited:
+            return True
+        self._refill()
+        if not self._waiters and self._tokens >= amount:
+            self._tokens -= amount
+            return True
+        return False
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until ``amount`` tokens are available and take them.
+
+        Raises:
+            ValueError: If ``amount`` exceeds the bucket capacity
+        """
+        if self.unlimited:
+            return
+        if amount > self.capacity:
+            raise ValueError(f"Cannot acquire {amount} tokens from a bucket of {self.capacity}")
+        if self.try_acquire(amount):
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append((amount, future))
+        if self._timer is None:
+            self._schedule(loop)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted and cancelled in the same tick: hand the tokens back
+                self._tokens = min(self.capacity, self._tokens + amount)
+                self._wake()
+            raise
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        amount = self._waiters[0][0]
+        delay = max(0.0, (amount - self._tokens) / self.rate)
+        self._timer = loop.call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._refill()
+        while self._waiters:
+            amount, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if amount > self._tokens:
+                break
+            self._waiters.popleft()
+            self._tokens -= amount
+            future.set_result(None)
+        if self._waiters:
+            self._schedule(asyncio.get_running_loop())
+
+
+class RunBudget:
+    """Token accounting for a single run, enforcing max_tokens_per_run."""
+
+    def __init__(self, limiter: "TierRateLimiter"):
+        self._limiter = limiter
+        self.tokens_used = 0
+
+    @property
+    def remaining(self) -> int:
+        """Tokens left in this run, or -1 for unlimited."""
+        limit = self._limiter.limits.max_tokens_per_run
+        return -1 if limit < 0 else limit - self.tokens_used
+
+    async def consume(self, tokens: int) -> None:
+        """Charge tokens to this run, waiting for tier token capacity.
+
+        Raises:
+            TokenBudgetExceededError: If the run would exceed max_tokens_per_run
+        """
+        limit = self._limiter.limits.max_tokens_per_run
+        if limit >= 0 and self.tokens_used + tokens > limit:
+            raise TokenBudgetExceededError(
+                f"Run would use {self.tokens_used + tokens} tokens "
+                f"(limit {limit} per run on {self._limiter.tier.value} tier)"
+            )
+        bucket = self._limiter.tokens
+        remaining = tokens
+        while remaining > 0:
+            chunk = remaining if bucket.unlimited else min(remaining, bucket.capacity)
+            await bucket.acquire(chunk)
+            remaining -= chunk
+        self.tokens_used += tokens
+
+
+class _RunContext:
+    def __init__(self, limiter: "TierRateLimiter"):
+        self._limiter = limiter
+
+    async def __aenter__(self) -> RunBudget:
+        await self._limiter.runs.acquire()
+        return RunBudget(self._limiter)
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class TierRateLimiter:
+    """Run and token buckets for one license tier.
+
+    Usage:
+        async with limiter.run() as budget:
+            async for chunk in agent.stream(prompt):
+                await budget.consume(1)
+    """
+
+    def __init__(
+        self,
+        tier: LicenseTier,
+        rates: Optional[RateLimits] = None,
+        limits: Optional[LicenseLimits] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.tier = tier
+        self.rates = rates or TIER_RATE_LIMITS[tier]
+        self.limits = limits or TIER_LIMITS[tier]
+        run_rate = self.rates.runs_per_minute / 60 if self.rates.runs_per_minute >= 0 else -1
+        self.runs = TokenBucket(run_rate, self.rates.run_burst, clock)
+        self.tokens = TokenBucket(self.rates.tokens_per_second, self.rates.token_burst, clock)
+
+    def run(self) -> _RunContext:
+        """Wait for a run slot and get a per-run token budget."""
+        return _RunContext(self)
+
+    async def acquire_run(self) -> None:
+        """Wait for a run slot."""
+        await self.runs.acquire()
+
+
+_limiters: Dict[LicenseTier, TierRateLimiter] = {}
+
+
+def get_rate_limiter(tier: LicenseTier) -> TierRateLimiter:
+    """Get or create the shared rate limiter for a tier."""
+    limiter = _limiters.get(tier)
+    if limiter is None:
+        limiter = _limiters[tier] = TierRateLimiter(tier)
+    return limiter
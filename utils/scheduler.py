@@ -0,0 +1,219 @@
+"""
+Terminal221b Admission Scheduler
+
+Decides which queued agent run gets the next worker slot on a shared
+worker. Every tier has its own FIFO. Tiers are served by weighted fair
+queueing (stride scheduling): each admission advances the tier's virtual
+pass by 1/weight, and the backlogged tier with the smallest pass goes
+next, ties going to the higher tier. Enterprise and Pro work therefore
+overtakes Free work under load, yet Free still gets its weighted share
+and is never starved.
+
+Admission also accounts for tokens. A run whose estimate exceeds its
+tier's max_tokens_per_run is rejected outright. Runs that would push the
+tokens in flight past the worker's capacity are deferred until earlier
+runs finish.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+from utils import metrics
+from utils.license import TIER_LIMITS, LicenseLimits, LicenseTier
+from utils.metrics import Histogram
+from utils.ratelimit import TokenBudgetExceededError
+
+# Share of admissions each backlogged tier gets relative to the others.
+# Tiers with priority support weigh more; Free keeps a nonzero share.
+TIER_WEIGHTS: Dict[LicenseTier, float] = {
+    LicenseTier.ENTERPRISE: 8,
+    LicenseTier.PRO: 4,
+    LicenseTier.FREE: 1,
+}
+
+# Tie-break order when virtual passes are equal (lower goes first)
+_RANK = {LicenseTier.ENTERPRISE: 0, LicenseTier.PRO: 1, LicenseTier.FREE: 2}
+
+
+@dataclass
+class Ticket:
+    """A granted admission; hand it back to ``release()`` when the run ends."""
+
+    tier: LicenseTier
+    tokens: int
+    waited: float
+
+
+class _Admission:
+    def __init__(self, scheduler: "AdmissionScheduler", tier: LicenseTier, tokens: int):
+        self._scheduler = scheduler
+        self._tier = tier
+        self._tokens = tokens
+        self._ticket: Optional[Ticket] = None
+
+    async def __aenter__(self) -> Ticket:
+        self._ticket = await self._scheduler.acquire(self._tier, self._tokens)
+        return self._ticket
+
+    async def __aexit__(self, *exc) -> None:
+        self._scheduler.release(self._ticket)
+
+
+class AdmissionScheduler:
+    """Per-tier weighted fair queues in front of agent execution.
+
+    Usage:
+        scheduler = AdmissionScheduler(max_concurrent=4, token_capacity=20000)
+        async with scheduler.admit(manager.tier, tokens=context.max_tokens):
+            result = await agent.execute(prompt)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        token_capacity: int = -1,
+        weights: Optional[Dict[LicenseTier, float]] = None,
+        limits: Optional[Dict[LicenseTier, LicenseLimits]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize scheduler.
+
+        Args:
+            max_concurrent: Runs admitted at once (worker slots)
+            token_capacity: Estimated tokens allowed in flight at once, or -1 for unlimited
+            weights: Fair-share weight per tier (default: TIER_WEIGHTS)
+            limits: Per-tier limits for token admission (default: TIER_LIMITS)
+            clock: Monotonic clock in seconds, used for wait times
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.token_capacity = token_capacity
+        self.weights = dict(weights or TIER_WEIGHTS)
+        self.limits = dict(limits or TIER_LIMITS)
+        self._clock = clock
+        self._queues: Dict[LicenseTier, Deque[tuple]] = {tier: deque() for tier in LicenseTier}
+        self._pass: Dict[LicenseTier, float] = {tier: 0.0 for tier in LicenseTier}
+        self._vtime = 0.0
+        self.active = 0
+        self.tokens_in_flight = 0
+        self.admitted: Dict[LicenseTier, int] = {tier: 0 for tier in LicenseTier}
+        self.rejected: Dict[LicenseTier, int] = {tier: 0 for tier in LicenseTier}
+        self.wait_times: Dict[LicenseTier, Histogram] = {tier: Histogram() for tier in LicenseTier}
+
+    def depth(self, tier: Optional[LicenseTier] = None) -> int:
+        """Queued runs for a tier, or all tiers (including cancelled ones not yet skipped)."""
+        if tier is not None:
+            return len(self._queues[tier])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def admit(self, tier: LicenseTier, tokens: int = 0) -> _Admission:
+        """Wait for admission for the duration of an ``async with`` block."""
+        return _Admission(self, tier, tokens)
+
+    def check_tokens(self, tier: LicenseTier, tokens: int) -> None:
+        """Reject a token estimate that could never be admitted.
+
+        Raises:
+            TokenBudgetExceededError: If ``tokens`` exceeds the tier's max_tokens_per_run
+            ValueError: If ``tokens`` could never fit in ``token_capacity``
+        """
+        limit = self.limits[tier].max_tokens_per_run
+        if limit >= 0 and tokens > limit:
+            self.rejected[tier] += 1
+            raise TokenBudgetExceededError(
+                f"Run would use {tokens} tokens (limit {limit} per run on {tier.value} tier)"
+            )
+        if 0 <= self.token_capacity < tokens:
+            self.rejected[tier] += 1
+            raise ValueError(f"Cannot admit {tokens} tokens on a worker with capacity {self.token_capacity}")
+
+    def _fits(self, tokens: int) -> bool:
+        return self.active < self.max_concurrent and (
+            self.token_capacity < 0 or self.tokens_in_flight + tokens <= self.token_capacity
+        )
+
+    async def acquire(self, tier: LicenseTier, tokens: int = 0) -> Ticket:
+        """Wait for a worker slot with room for ``tokens``.
+
+        Raises:
+            TokenBudgetExceededError: If ``tokens`` exceeds the tier's max_tokens_per_run
+            ValueError: If ``tokens`` could never fit in ``token_capacity``
+        """
+        self.check_tokens(tier, tokens)
+        queue = self._queues[tier]
+        if not self.depth() and self._fits(tokens):
+            self._pass[tier] = max(self._pass[tier], self._vtime)
+            return self._grant(tier, tokens, self._clock())
+
+        if not queue:
+            # A tier returning from idle must not bank credit for the time it was away
+            self._pass[tier] = max(self._pass[tier], self._vtime)
+        future = asyncio.get_running_loop().create_future()
+        queue.append((tokens, future, self._clock()))
+        metrics.observe("scheduler_queue_depth", len(queue), tier=tier.value)
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted and cancelled in the same tick: give the slot back
+                self.release(future.result())
+            else:
+                self._dispatch()  # a deferred head may have been blocking others
+            raise
+
+    def release(self, ticket: Optional[Ticket]) -> None:
+        """Return a ticket's slot and tokens and admit whoever is next."""
+        if ticket is None:
+            return
+        self.active -= 1
+        self.tokens_in_flight -= ticket.tokens
+        self._dispatch()
+
+    def _next_tier(self) -> Optional[LicenseTier]:
+        best = None
+        for tier, queue in self._queues.items():
+            while queue and queue[0][1].done():
+                queue.popleft()  # cancelled while queued
+            if queue and (best is None or (self._pass[tier], _RANK[tier]) < (self._pass[best], _RANK[best])):
+                best = tier
+        return best
+
+    def _dispatch(self) -> None:
+        while self.active < self.max_concurrent:
+            tier = self._next_tier()
+            if tier is None:
+                return
+            tokens, future, enqueued = self._queues[tier][0]
+            if not self._fits(tokens):
+                return  # defer until running work hands tokens back
+            self._queues[tier].popleft()
+            future.set_result(self._grant(tier, tokens, enqueued))
+
+    def _grant(self, tier: LicenseTier, tokens: int, enqueued: float) -> Ticket:
+        self._vtime = self._pass[tier]
+        self._pass[tier] += 1 / self.weights[tier]
+        self.active += 1
+        self.tokens_in_flight += tokens
+        self.admitted[tier] += 1
+        waited = self._clock() - enqueued
+        self.wait_times[tier].observe(waited)
+        metrics.observe("scheduler_wait_seconds", waited, tier=tier.value)
+        return Ticket(tier, tokens, waited)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, admissions, rejections and wait percentiles per tier."""
+        return {
+            tier.value: {
+                "depth": self.depth(tier),
+                "admitted": self.admitted[tier],
+                "rejected": self.rejected[tier],
+                "wait_p50": self.wait_times[tier].percentile(50),
+                "wait_p99": self.wait_times[tier].percentile(99),
+            }
+            for tier in LicenseTier
+        }